@@ -4,6 +4,7 @@ from flask_migrate import Migrate
 from dotenv import load_dotenv
 from flask_jwt_extended import JWTManager
 
+from .commands import register_commands
 from .config import Config
 from .extensions import db
 from .routes.health import bp as health_bp
@@ -34,4 +35,6 @@ def create_app():
     app.register_blueprint(ai_bp)
     app.register_blueprint(auth_bp)
 
+    register_commands(app)
+
     return app
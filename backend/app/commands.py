@@ -0,0 +1,67 @@
+import click
+from flask import Flask
+
+from .config import Config
+from .extensions import db
+from .services.case_code import backfill_case_code_counters
+from .services.case_import import DEFAULT_BATCH_SIZE, import_cases
+from .services.case_stats import reconcile_case_stats
+from .services.ocr_jobs import default_worker_id, run_worker
+
+
+@click.command("import-cases")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True, help="Jumlah case per batch INSERT.")
+@click.option("--dry-run", is_flag=True, help="Validasi saja tanpa menulis ke database.")
+def import_cases_command(path, batch_size, dry_run):
+    """Import bulk case dari file xlsx/csv template IER."""
+    with open(path, "rb") as fh:
+        report = import_cases(fh, path, batch_size=batch_size, dry_run=dry_run)
+
+    click.echo(
+        f"{'[dry-run] ' if dry_run else ''}{report['rows']} baris dibaca: "
+        f"+{report['imported_cases']} case, +{report['imported_persons']} person, "
+        f"{report['error_count']} error"
+    )
+    for err in report["errors"]:
+        click.echo(f"- baris {err['row']}: {err['error']}")
+
+
+@click.command("backfill-case-codes")
+def backfill_case_codes_command():
+    """Sinkronkan t_case_code_counter dengan case code yang sudah ada."""
+    updated = backfill_case_code_counters(db.session)
+    click.echo(f"{updated} counter harian diperbarui.")
+
+
+@click.command("reconcile-case-stats")
+@click.option("--check", is_flag=True, help="Hanya laporkan drift tanpa menulis ulang t_case_stats.")
+def reconcile_case_stats_command(check):
+    """Bangun ulang t_case_stats dari t_case dan laporkan drift."""
+    drift = reconcile_case_stats(db.session, fix=not check)
+    if not drift:
+        click.echo("t_case_stats sudah sesuai dengan t_case.")
+        return
+    click.echo(f"{len(drift)} baris drift{' (tidak diperbaiki)' if check else ' diperbaiki'}:")
+    for d in drift:
+        click.echo(f"- {d['dimension']}[{d['key_id']}]: tersimpan {d['stored']}, seharusnya {d['actual']}")
+
+
+@click.command("ocr-worker")
+@click.option("--poll-interval", type=float, default=None, help="Jeda polling saat antrian kosong (detik).")
+@click.option("--once", is_flag=True, help="Proses antrian sampai kosong lalu berhenti.")
+@click.option("--worker-id", default=None, help="Nama worker di t_ocr_job.worker (default host:pid).")
+def ocr_worker_command(poll_interval, once, worker_id):
+    """Worker antrian OCR berita acara (t_ocr_job). Jalankan sebanyak yang dibutuhkan."""
+    worker_id = worker_id or default_worker_id()
+    poll_interval = Config.ocr_worker_poll_interval() if poll_interval is None else poll_interval
+    click.echo(f"OCR worker {worker_id} mulai (poll {poll_interval:g}s)")
+    processed = run_worker(worker_id, poll_interval, once=once)
+    click.echo(f"{processed} job diproses.")
+
+
+def register_commands(app: Flask):
+    app.cli.add_command(import_cases_command)
+    app.cli.add_command(backfill_case_codes_command)
+    app.cli.add_command(reconcile_case_stats_command)
+    app.cli.add_command(ocr_worker_command)
@@ -7,6 +7,181 @@ class Config:
     def database_url() -> str:
         return os.environ.get("DATABASE_URL", "").strip()
 
+    @staticmethod
+    def env_int(name: str, default: int) -> int:
+        try:
+            return int(os.environ.get(name, "").strip() or default)
+        except ValueError:
+            return default
+
+    @staticmethod
+    def env_float(name: str, default: float) -> float:
+        try:
+            return float(os.environ.get(name, "").strip() or default)
+        except ValueError:
+            return default
+
+    @staticmethod
+    def env_bool(name: str, default: bool) -> bool:
+        v = os.environ.get(name, "").strip().lower()
+        if not v:
+            return default
+        return v in ("1", "true", "yes", "on")
+
+    @staticmethod
+    def analytics_cache_ttl() -> float:
+        return Config.env_float("ANALYTICS_CACHE_TTL", 300.0)
+
+    @staticmethod
+    def pdf_cache_dir() -> str:
+        # Kosong = <instance_path>/pdf_cache
+        return os.environ.get("PDF_CACHE_DIR", "").strip()
+
+    @staticmethod
+    def pdf_cache_max_bytes() -> int:
+        return Config.env_int("PDF_CACHE_MAX_MB", 512) * 1024 * 1024
+
+    @staticmethod
+    def pdf_render_workers() -> int:
+        # 0 = render langsung di thread request (tanpa process pool)
+        return Config.env_int("PDF_RENDER_WORKERS", min(2, os.cpu_count() or 1))
+
+    @staticmethod
+    def pdf_render_queue_size() -> int:
+        return Config.env_int("PDF_RENDER_QUEUE", 8)
+
+    @staticmethod
+    def pdf_render_timeout() -> float:
+        return Config.env_float("PDF_RENDER_TIMEOUT", 60.0)
+
+    @staticmethod
+    def pdf_render_retry_after() -> int:
+        return Config.env_int("PDF_RENDER_RETRY_AFTER", 5)
+
+    @staticmethod
+    def pdf_export_concurrency() -> int:
+        # Job render yang boleh berjalan bersamaan untuk satu request export
+        return max(1, Config.env_int("PDF_EXPORT_CONCURRENCY", Config.pdf_render_workers() or 1))
+
+    @staticmethod
+    def pdf_export_max_documents() -> int:
+        return Config.env_int("PDF_EXPORT_MAX", 500)
+
+    @staticmethod
+    def llm_url() -> str:
+        return os.environ.get("LLM_URL", "").strip() or "http://pe.spil.co.id/kobold/v1/chat/completions"
+
+    @staticmethod
+    def llm_timeout(operation: str, default: float) -> float:
+        # mis. LLM_TIMEOUT_OCR=180, LLM_TIMEOUT_PREFILL_CASE=15
+        return Config.env_float(f"LLM_TIMEOUT_{operation.upper()}", default)
+
+    @staticmethod
+    def llm_cache_ttl() -> float:
+        # Detik; 0 = cache LLM/OCR dimatikan
+        return Config.env_float("LLM_CACHE_TTL", 7 * 24 * 3600.0)
+
+    @staticmethod
+    def llm_cache_max_entries() -> int:
+        return Config.env_int("LLM_CACHE_MAX_ENTRIES", 10000)
+
+    @staticmethod
+    def ocr_job_max_attempts() -> int:
+        return Config.env_int("OCR_JOB_MAX_ATTEMPTS", 3)
+
+    @staticmethod
+    def ocr_job_retry_delay() -> float:
+        return Config.env_float("OCR_JOB_RETRY_DELAY", 30.0)
+
+    @staticmethod
+    def ocr_job_heartbeat_interval() -> float:
+        # Worker memperbarui heartbeat_at job yang sedang diproses setiap N detik
+        return max(1.0, Config.env_float("OCR_JOB_HEARTBEAT_INTERVAL", 30.0))
+
+    @staticmethod
+    def ocr_job_stale_after() -> float:
+        # Job 'running' tanpa heartbeat selama ini dianggap ditinggal worker yang mati.
+        # Diukur dari heartbeat terakhir, jadi tidak bergantung pada lamanya OCR; minimal 3x interval.
+        return max(Config.env_float("OCR_JOB_STALE_AFTER", 600.0), 3 * Config.ocr_job_heartbeat_interval())
+
+    @staticmethod
+    def ocr_job_retention_days() -> int:
+        return Config.env_int("OCR_JOB_RETENTION_DAYS", 7)
+
+    @staticmethod
+    def ocr_worker_poll_interval() -> float:
+        return Config.env_float("OCR_WORKER_POLL_INTERVAL", 1.0)
+
+    @staticmethod
+    def ocr_pdf_dpi() -> int:
+        return Config.env_int("OCR_PDF_DPI", 150)
+
+    @staticmethod
+    def ocr_pdf_grayscale() -> bool:
+        return Config.env_bool("OCR_PDF_GRAYSCALE", True)
+
+    @staticmethod
+    def ocr_pdf_thread_count() -> int:
+        return max(1, Config.env_int("OCR_PDF_THREADS", 2))
+
+    @staticmethod
+    def ocr_text_layer_min_chars() -> int:
+        # Minimal karakter per halaman agar text layer PDF dipakai tanpa OCR; 0 = selalu OCR
+        return Config.env_int("OCR_TEXT_LAYER_MIN_CHARS", 50)
+
+    @staticmethod
+    def ocr_batch_pages() -> int:
+        # Jumlah gambar per request OCR ke LLM
+        return max(1, Config.env_int("OCR_BATCH_PAGES", 4))
+
+    @staticmethod
+    def ocr_concurrency() -> int:
+        return max(1, Config.env_int("OCR_CONCURRENCY", 3))
+
+    @staticmethod
+    def ocr_batch_retries() -> int:
+        # Retry per batch OCR (dipakai sebagai max_retries LLMClient, bukan di atasnya). Terburuk per batch:
+        # (1 + N) x (3 s connect + LLM_TIMEOUT_OCR 120 s) + backoff = +-4 menit dengan default;
+        # job yang gagal diulang lagi maks OCR_JOB_MAX_ATTEMPTS kali oleh antrian
+        return max(0, Config.env_int("OCR_BATCH_RETRIES", 1))
+
+    @staticmethod
+    def ocr_max_long_edge() -> int:
+        # Sisi terpanjang gambar (px) sebelum dikirim ke OCR; 0 = tidak di-resize
+        return max(0, Config.env_int("OCR_MAX_LONG_EDGE", 2000))
+
+    @staticmethod
+    def ocr_jpeg_quality() -> int:
+        return min(95, max(30, Config.env_int("OCR_JPEG_QUALITY", 80)))
+
+    @staticmethod
+    def ocr_dedupe_pages() -> bool:
+        return Config.env_bool("OCR_DEDUPE_PAGES", True)
+
+    @staticmethod
+    def llm_compact_prompts() -> bool:
+        # LLM mengembalikan nama master (bukan ID); ID dicari lokal oleh services/master_resolver.py
+        return Config.env_bool("LLM_COMPACT_PROMPTS", False)
+
+    @staticmethod
+    def master_match_threshold() -> float:
+        # Skor minimal (0..1) fuzzy match nama master
+        return min(1.0, max(0.0, Config.env_float("MASTER_MATCH_THRESHOLD", 0.82)))
+
+    @staticmethod
+    def person_rules_enabled() -> bool:
+        # Ekstraksi nominal/persentase/tanggal approval/jenis karyawan prefill-person tanpa LLM
+        return Config.env_bool("PERSON_RULES", True)
+
+    @staticmethod
+    def llm_batch_concurrency() -> int:
+        # Item batch prefill yang diproses bersamaan (jaga di bawah LLM_POOL_SIZE)
+        return max(1, Config.env_int("LLM_BATCH_CONCURRENCY", 4))
+
+    @staticmethod
+    def llm_batch_max_items() -> int:
+        return max(1, Config.env_int("LLM_BATCH_MAX_ITEMS", 50))
+
     @staticmethod
     def validate():
         if not Config.database_url():
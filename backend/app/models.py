@@ -1,4 +1,5 @@
 from datetime import datetime
+import uuid
 from .extensions import db
 from werkzeug.security import generate_password_hash, check_password_hash
 
@@ -22,6 +23,14 @@ class StatusPengajuan(MasterBase):
 class DivisiCase(MasterBase):
     __tablename__ = "m_divisi_case"
 
+class MasterVersion(db.Model):
+    __tablename__ = "m_master_version"
+
+    # Satu baris (id=1); version dinaikkan setiap master data berubah supaya
+    # cache master di semua worker tahu kapan harus dimuat ulang.
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
 class Case(db.Model):
     __tablename__ = "t_case"
 
@@ -32,15 +41,18 @@ class Case(db.Model):
 
     created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
 
+    # Diperbarui setiap create/update case maupun person-nya (dasar ETag/Last-Modified)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False, index=True)
+
     # 2) Divisi Case (dropdown)
-    divisi_case_id = db.Column(db.Integer, db.ForeignKey("m_divisi_case.id"), nullable=True)
+    divisi_case_id = db.Column(db.Integer, db.ForeignKey("m_divisi_case.id"), nullable=True, index=True)
     divisi_case = db.relationship("DivisiCase")
 
     # 3) Tanggal Lapor
     tanggal_lapor = db.Column(db.Date, nullable=True)
 
     # 4) Tanggal Kejadian
-    tanggal_kejadian = db.Column(db.Date, nullable=True)
+    tanggal_kejadian = db.Column(db.Date, nullable=True, index=True)
 
     # 5) Lokasi Kejadian
     lokasi_kejadian = db.Column(db.String(255), nullable=True)
@@ -105,7 +117,7 @@ class Case(db.Model):
     status_proses = db.relationship("StatusProses")
 
     # 24) Status Pengajuan (dropdown)
-    status_pengajuan_id = db.Column(db.Integer, db.ForeignKey("m_status_pengajuan.id"), nullable=True)
+    status_pengajuan_id = db.Column(db.Integer, db.ForeignKey("m_status_pengajuan.id"), nullable=True, index=True)
     status_pengajuan = db.relationship("StatusPengajuan")
 
     # 25) Notes
@@ -149,9 +161,80 @@ class CasePerson(db.Model):
     approval_gm_hcca = db.Column(db.Date, nullable=True)
     approval_gm_fad = db.Column(db.Date, nullable=True)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
 
     case = db.relationship("Case", back_populates="persons")
 
+class CaseCodeCounter(db.Model):
+    __tablename__ = "t_case_code_counter"
+
+    # base = tanggal case code (dd/mm/yyyy), last_seq = nomor urut terakhir yang sudah dialokasikan
+    base = db.Column(db.String(10), primary_key=True)
+    last_seq = db.Column(db.Integer, nullable=False, default=0)
+
+class CaseStat(db.Model):
+    __tablename__ = "t_case_stats"
+
+    # Ringkasan jumlah case per dimensi (status_pengajuan / divisi_case / jenis_case / total).
+    # key_id = id master, 0 untuk case yang kolomnya NULL (dan untuk dimensi total).
+    dimension = db.Column(db.String(32), primary_key=True)
+    key_id = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.BigInteger, nullable=False, default=0)
+
+class LLMCacheEntry(db.Model):
+    __tablename__ = "t_llm_cache"
+
+    # key = sha256(operasi + input + versi master + parameter model); value = hasil JSON.
+    # Waktu dalam UTC naive, hanya dibandingkan dengan datetime.utcnow() di services/llm_cache.py
+    key = db.Column(db.String(64), primary_key=True)
+    operation = db.Column(db.String(32), nullable=False, index=True)
+    value = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    last_hit_at = db.Column(db.DateTime, nullable=True)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+
+class OcrJob(db.Model):
+    __tablename__ = "t_ocr_job"
+
+    # Antrian OCR berita acara. Worker (flask ocr-worker) mengambil job dengan
+    # SELECT ... FOR UPDATE SKIP LOCKED; status: queued -> running -> done | failed.
+    id = db.Column(db.Integer, primary_key=True)
+    # ID yang dipakai klien (URL polling); id integer berurutan tidak pernah keluar dari backend
+    public_id = db.Column(db.String(32), nullable=False, unique=True, default=lambda: uuid.uuid4().hex)
+    # Username (identity JWT) pengunggah; hanya pemilik yang boleh membaca hasil OCR
+    owner = db.Column(db.String(64), nullable=True)
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    created_at = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+    # Job baru langsung siap; retry ditunda dengan menggeser run_after
+    run_after = db.Column(db.DateTime, server_default=db.func.now(), nullable=False)
+    started_at = db.Column(db.DateTime, nullable=True)
+    # Diperbarui worker selama job berjalan; job 'running' tanpa heartbeat dianggap macet
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(64), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    text = db.Column(db.Text, nullable=True)
+    result = db.Column(db.Text, nullable=True)  # JSON suggestion case
+
+    files = db.relationship(
+        "OcrJobFile", cascade="all, delete-orphan", passive_deletes=True, order_by="OcrJobFile.position"
+    )
+
+    __table_args__ = (db.Index("ix_t_ocr_job_status_run_after", "status", "run_after"),)
+
+class OcrJobFile(db.Model):
+    __tablename__ = "t_ocr_job_file"
+
+    # File upload disimpan di DB supaya worker tidak butuh filesystem bersama; dihapus setelah job selesai
+    id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey("t_ocr_job.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    mimetype = db.Column(db.String(100), nullable=False)
+    content = db.Column(db.LargeBinary, nullable=False)
+
 class User(db.Model):
     __tablename__ = "m_user"
     
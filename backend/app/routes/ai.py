@@ -1,387 +1,78 @@
 from __future__ import annotations
 
-import base64
-import json
-import logging
-from datetime import datetime
-from io import BytesIO
-from typing import Any
-
-import requests
-from flask import Blueprint, jsonify, request
-from ..extensions import db
-from ..models import DivisiCase, JenisCase, JenisKaryawanTerlapor, StatusProses, StatusPengajuan
+from flask import Blueprint, Response, jsonify, request, stream_with_context, url_for
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from ..config import Config
+from ..services.ai_prefill import (
+    build_case_suggestion,
+    build_decision_suggestion,
+    build_person_suggestion,
+    call_llm,
+    call_llm_suggestion,
+    case_request,
+    person_request,
+    suggestion_payload,
+)
+from ..services.llm_cache import llm_cache
+from ..services.llm_client import LLMError, get_llm_client
+from ..services.llm_stream import stream_fields
+from ..services.ocr import read_uploads
+from ..services.ocr_jobs import enqueue_ocr_job, find_job, job_status
+from ..services.person_rules import person_prefill, person_prefill_batch, person_sources, plan_person_prefill
 
 bp = Blueprint("ai", __name__, url_prefix="/api/ai")
 
+AI_UNAVAILABLE = "Layanan AI sedang tidak tersedia. Coba lagi nanti."
 
-LLM_URL = "http://pe.spil.co.id/kobold/v1/chat/completions"
-
-
-def call_llm(prompt: str) -> dict:
-    if not prompt:
-        return {}
-
-    master_data = get_divisi_jenis_case()
-    divisi_hint = "; ".join(f"{row['id']}={row['name']}" for row in master_data["divisi_case"])
-    jenis_hint = "; ".join(f"{row['id']}={row['name']}" for row in master_data["jenis_case"])
-    status_proses_hint = "; ".join(f"{row['id']}={row['name']}" for row in master_data["status_proses"])
-    status_pengajuan_hint = "; ".join(f"{row['id']}={row['name']}" for row in master_data["status_pengajuan"])
-
-    instruction = f"""
-    TUGAS:
-    Ekstrak informasi dari teks kasus dan hasilkan OUTPUT JSON SAJA.
-
-    ATURAN OUTPUT:
-    - Output HARUS berupa JSON valid
-    - Jangan sertakan teks, komentar, atau markdown apa pun
-    - Jika data tidak ditemukan, gunakan null (bukan string)
-
-    FORMAT JSON WAJIB:
-    {{
-    "divisi_case_id": number | null,
-    "jenis_case_id": number | null,
-    "tanggal_lapor": "YYYY-MM-DD" | null,
-    "tanggal_kejadian": "YYYY-MM-DD" | null,
-    "lokasi_kejadian": string | null,
-    "judul_ier": string | null,
-    "tanggal_proses_ier": "YYYY-MM-DD" | null,
-    "kerugian": number | null,
-    "kronologi": string | null,
-    "status_proses_id": number | null,
-    "status_pengajuan_id": number | null,
-    "persons": [
-      {{
-        "nama": string | null,
-        "divisi": string | null,
-        "departemen": string | null,
-        "jenis_karyawan_terlapor_id": number | null
-      }}
-    ]
-    }}
-
-    KONSTRAINT ID:
-    - divisi_case_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:
-    {divisi_hint}
-
-    - jenis_case_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:
-    {jenis_hint}
-
-    - status_proses_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:
-    {status_proses_hint}
-
-    - status_pengajuan_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:
-    {status_pengajuan_hint}
-
-    ATURAN KRONOLOGI:
-    - Tulis ulang kronologi dengan bahasa formal, jelas, dan ringkas dengan poin-poin ke bawah jadi 1 enter, 2 enter, 3 enter dan seterusnya untuk tiap poin
-    - Fokus pada urutan kejadian, aktor, dan dampak
-    - Jangan menyalin kalimat mentah dari teks
-    - Jangan menambahkan asumsi baru
-
-    ATURAN STATUS:
-    - Jika ada indikasi status proses/pengajuan, cocokkan ke master status di atas.
-
-    ATURAN JUDUL IER:
-    - judul_ier HARUS berupa ringkasan singkat dari isi kronologi
-    - Panjang maksimal 10–12 kata
-    - Tidak mengandung detail teknis berlebihan (tanggal lengkap, nominal rinci)
-    - Mewakili inti peristiwa utama
-
-    ATURAN TERLAPOR:
-    - Isi array "persons" jika ada nama terlapor, divisi, departemen, atau jenis karyawan terlapor.
-    - Jika divisi/jenis karyawan terlapor cocok dengan master, isi ID-nya; jika tidak pasti, set null.
-
-    TEKS KASUS:
-    {prompt}
-    """
-
-    payload = {
-        "Content-Type": "application/json",
-        "messages": [{"role": "user", "content": instruction}],
-        "temperature": 0,
-    }
-
-    try:
-        response = requests.post(LLM_URL, json=payload, timeout=10)
-    except Exception as exc:  
-        logging.warning("LLM request failed: %s", exc)
-        return {}
-
-    if response.status_code != 200:
-        logging.info(
-            "LLM request failed with status code %s, response: %s",
-            response.status_code,
-            response.text,
-        )
-        return {}
-
-    content = response.json()["choices"][0]["message"]["content"]
-    parsed = extract_json(content)
-    return parsed if isinstance(parsed, dict) else {}
-
-
-def build_case_suggestion(llm_result: dict) -> dict:
-    return {
-        "divisi_case_id": llm_result.get("divisi_case_id"),
-        "jenis_case_id": llm_result.get("jenis_case_id"),
-        "tanggal_lapor": llm_result.get("tanggal_lapor"),
-        "tanggal_kejadian": llm_result.get("tanggal_kejadian"),
-        "lokasi_kejadian": llm_result.get("lokasi_kejadian"),
-        "judul_ier": llm_result.get("judul_ier"),
-        "tanggal_proses_ier": llm_result.get("tanggal_proses_ier"),
-        "kerugian": llm_result.get("kerugian"),
-        "kronologi": llm_result.get("kronologi"),
-        "status_proses_id": llm_result.get("status_proses_id"),
-        "status_pengajuan_id": llm_result.get("status_pengajuan_id"),
-        "persons": llm_result.get("persons") or [],
-    }
-
-
-def preprocessing_ai_date(raw: Any) -> str | None:
-    if raw is None:
-        return None
-    s = str(raw).strip()
-    if not s:
-        return None
-
-    try:
-        if len(s) == 10 and s[2] == "-" and s[5] == "-":
-            dt = datetime.strptime(s, "%d-%m-%Y")
-            return dt.strftime("%d-%m-%Y")
-    except Exception:
-        pass
-
-    try:
-        if len(s) == 10 and s[4] == "-" and s[7] == "-":
-            dt = datetime.strptime(s, "%Y-%m-%d")
-            return dt.strftime("%d-%m-%Y")
-    except Exception:
-        pass
-
-    for sep in (" ", "/", "-"):
-        parts = s.replace(",", " ").replace("/", sep).replace("-", sep).split(sep)
-        if len(parts) == 3 and parts[0].isdigit() and parts[2].isdigit():
-            try:
-                day = int(parts[0])
-                year = int(parts[2])
-                month_part = parts[1].strip().lower()
-                MONTHS = {
-                    "januari": 1, "februari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6,
-                    "juli": 7, "agustus": 8, "september": 9, "oktober": 10, "november": 11, "desember": 12,
-                    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "mei": 5, "jun": 6, "jul": 7,
-                    "aug": 8, "sep": 9, "oct": 10, "okt": 10, "nov": 11, "dec": 12, "des": 12,
-                }
-                if month_part.isdigit():
-                    month = int(month_part)
-                else:
-                    month = MONTHS.get(month_part)
-                if month:
-                    dt = datetime(year, month, day)
-                    return dt.strftime("%d-%m-%Y")
-            except Exception:
-                continue
-
-    return None
-
-
-def call_llm_person(prompt: str) -> dict:
-    if not prompt:
-        return {}
-
-    master_data = get_jenis_karyawan_terlapor()
-    jenis_karyawan_hint = "; ".join(f"{row['id']}={row['name']}" for row in master_data["jenis_karyawan_terlapor"])
-
-    instruction = f"""
-    TUGAS:
-    Ekstrak informasi dari teks keputusan dan hasilkan OUTPUT JSON SAJA.
-
-    ATURAN OUTPUT:
-    - Output HARUS berupa JSON valid
-    - Jangan sertakan teks, komentar, atau markdown apa pun
-    - Jika data tidak ditemukan, gunakan null (bukan string)
-
-    FORMAT JSON WAJIB:
-    {{
-    "jenis_karyawan_terlapor_id": number | null,
-    "nominal_beban_karyawan": number | null,
-    "persentase_beban_karyawan": number | null,
-    "keputusan_ier": string | null,   // TULIS ULANG formal & ringkas, sebut tindakan + alasan/dasar
-    "keputusan_final": string | null, // TULIS ULANG formal & ringkas, sebut tindakan + alasan/dasar
-    "approval_gm_hcca": "DD-MM-YYYY" | null, // format dd-mm-yyyy
-    "approval_gm_fad": "DD-MM-YYYY" | null   // format dd-mm-yyyy
-    }}
-
-    ATURAN KHUSUS:
-    - Jika ada frasa persetujuan/approval HC&CA atau FAD beserta tanggal (format bebas, mis. "19 desember 2025"), konversi ke "YYYY-MM-DD" dan isi kolomnya.
-    - Jika ada persetujuan tanpa tanggal, set kolom approval terkait ke null.
-    - Tanggal boleh pakai nama bulan Indonesia/Inggris; normalisasi ke YYYY-MM-DD.
-    - Jika nominal disebut (mis. "9 juta"), konversi ke angka penuh (9000000).
-    - Contoh gaya keputusan formal:
-      "Menetapkan pemutusan hubungan kerja karena pelanggaran prosedur yang menimbulkan kerugian perusahaan."
-      "Menetapkan pemutusan hubungan kerja efektif setelah persetujuan GM HC&CA dan GM FAD."
-
-    TEKS KEPUTUSAN:
-    {prompt}
-    """
-
-    payload = {
-        "Content-Type": "application/json",
-        "messages": [{"role": "user", "content": instruction}],
-        "temperature": 0,
-    }
-
-    try:
-        response = requests.post(LLM_URL, json=payload, timeout=10)
-    except Exception as exc:  
-        logging.warning("LLM request failed: %s", exc)
-        return {}
-
-    if response.status_code != 200:
-        logging.info(
-            "LLM request failed with status code %s, response: %s",
-            response.status_code,
-            response.text,
-        )
-        return {}
-
-    content = response.json()["choices"][0]["message"]["content"]
-    parsed = extract_json(content)
-    return parsed if isinstance(parsed, dict) else {}
-
-
-def extract_json(raw_content: str) -> Any:
-    text = raw_content.strip()
-
-    if "```" in text:
-        for block in text.split("```"):
-            candidate = block.strip()
-            if not candidate:
-                continue
-            if candidate.lower().startswith("json"):
-                candidate = candidate[4:].strip()
-            if candidate.startswith("{") and candidate.endswith("}"):
-                return safe_json_loads(candidate)
-
-    start = text.find("{")
-    end = text.rfind("}")
-    if start != -1 and end != -1 and end > start:
-        return safe_json_loads(text[start : end + 1])
-
-    logging.warning("LLM response not valid JSON: %s", text)
-    return {}
-
-
-def safe_json_loads(content: str) -> Any:
-    try:
-        return json.loads(content)
-    except json.JSONDecodeError:
-        logging.warning("LLM response not valid JSON: %s", content)
-        return {}
-
-
-def get_divisi_jenis_case() -> dict:
-    divisi_rows = db.session.query(DivisiCase).order_by(DivisiCase.id.asc()).all()
-    jenis_rows = db.session.query(JenisCase).order_by(JenisCase.id.asc()).all()
-    status_proses_rows = db.session.query(StatusProses).order_by(StatusProses.id.asc()).all()
-    status_pengajuan_rows = db.session.query(StatusPengajuan).order_by(StatusPengajuan.id.asc()).all()
-    return {
-        "divisi_case": [{"id": r.id, "name": r.name} for r in divisi_rows],
-        "jenis_case": [{"id": r.id, "name": r.name} for r in jenis_rows],
-        "status_proses": [{"id": r.id, "name": r.name} for r in status_proses_rows],
-        "status_pengajuan": [{"id": r.id, "name": r.name} for r in status_pengajuan_rows],
-    }
-
-
-def get_jenis_karyawan_terlapor() -> dict:
-    jenis_rows = db.session.query(JenisKaryawanTerlapor).order_by(JenisKaryawanTerlapor.id.asc()).all()
-    return {
-        "jenis_karyawan_terlapor": [{"id": r.id, "name": r.name} for r in jenis_rows],
-    }
-
-def _ocr_with_llm_multi(image_payloads: list[tuple[str, str]]) -> str:
-    if not image_payloads:
-        return ""
-
-    prompt = (
-        "Perform Optical Character Recognition (OCR) on ALL images provided. "
-        "Extract all visible text, ensuring accuracy and maintaining the original reading order (left-to-right, top-to-bottom) per image. "
-        "Gabungkan hasil semua gambar secara berurutan. "
-        "Ignore any non-textual elements or graphics. "
-        "Provide ONLY the extracted text, without any introductory phrases, explanations, or additional commentary."
+
+def _wants_stream(body: dict) -> bool:
+    # Opt-in: {"stream": true} di body atau header Accept: text/event-stream
+    # Body tidak diubah: "stream" tidak ikut ke payload LLM (prompt hanya membaca field tertentu)
+    return body.get("stream") is True or "text/event-stream" in request.headers.get("Accept", "")
+
+
+def _sse_response(operation, payload, build, echo, cache_key=None, initial=None, describe=None):
+    """Relay hasil LLM per field lewat Server-Sent Events (lihat services/llm_stream.py)."""
+    cached = llm_cache.lookup(cache_key) if cache_key else None
+    tokens = None
+    if payload is None:
+        cached = {}
+    elif cached is None:
+        try:
+            tokens = get_llm_client().stream_chat(operation, payload)
+        except LLMError:
+            # Belum ada byte terkirim: masih bisa jawab 503 biasa
+            return jsonify({"error": AI_UNAVAILABLE}), 503
+
+    events = stream_fields(
+        operation, tokens, build, echo, cache_key=cache_key, cached=cached, initial=initial, describe=describe
+    )
+    return Response(
+        stream_with_context(events),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
 
-    content_blocks = [{"type": "text", "text": prompt}]
-    for base64_image, mime in image_payloads:
-        content_blocks.append({
-            "type": "image_url",
-            "image_url": {"url": f"data:{mime};base64,{base64_image}"}
-        })
-
-    payload = {
-        "messages": [{
-            "role": "user",
-            "content": content_blocks
-        }],
-        "mode": "instruct",
-        "temperature": 0,
-    }
-
-    responses = requests.post(LLM_URL, json=payload)
-
-    if responses.status_code == 200:
-        llm_response = responses.json()
-        content_str = llm_response['choices'][0]['message']['content']
-        return content_str
-    else:
-        logging.info(f"Kobold LLM request failed with status code: {responses.status_code}, response: {responses.text}")
-        return ""
-
-
-def llm_extract_text(file_list) -> str:
-    base64_images: list[tuple[str, str]] = []
-    for file_storage in file_list:
-        raw_bytes = file_storage.read()
-        filename = (file_storage.filename or "").lower()
-        mimetype = (file_storage.mimetype or "").lower()
-        is_pdf = filename.endswith(".pdf") or "pdf" in mimetype
-
-        if is_pdf:
-            try:
-                from pdf2image import convert_from_bytes
-            except Exception as exc: 
-                logging.warning("pdf2image not available, cannot convert PDF to image: %s", exc)
-                continue
-
-            try:
-                images = convert_from_bytes(raw_bytes)
-                for img in images:
-                    buffer = BytesIO()
-                    img.save(buffer, format="JPEG")
-                    base64_images.append((base64.b64encode(buffer.getvalue()).decode("utf-8"), "image/jpeg"))
-            except Exception as exc:  
-                logging.warning("Failed to convert PDF to images: %s", exc)
-                continue
-        else:
-            mime = mimetype if mimetype else "image/jpeg"
-            base64_images.append((base64.b64encode(raw_bytes).decode("utf-8"), mime))
-
-    return _ocr_with_llm_multi(base64_images)
 
 @bp.post("/prefill-case")
 def prefill_case():
     body = request.get_json(silent=True) or {}
     prompt = body.get("prompt", "")
 
+    if _wants_stream(body):
+        payload, key = case_request(prompt) if prompt else (None, None)
+        return _sse_response("prefill_case", payload, build_case_suggestion, {"prompt": prompt}, key)
+
     llm_result = call_llm(prompt)
     if prompt and not llm_result:
-        return jsonify({"error": "Layanan AI sedang tidak tersedia. Coba lagi nanti."}), 503
+        return jsonify({"error": AI_UNAVAILABLE}), 503
     suggestion = build_case_suggestion(llm_result)
 
     return jsonify({"prompt": prompt, "data": suggestion})
 
 
 @bp.post("/upload-berita-acara")
+@jwt_required()
 def upload_berita_acara():
     files = request.files.getlist("file")
     if not files:
@@ -392,107 +83,82 @@ def upload_berita_acara():
         if not (filename.endswith(".pdf") or filename.endswith(".jpg") or filename.endswith(".jpeg") or filename.endswith(".png")):
             return jsonify({"error": "Format file tidak didukung. Unggah PDF atau gambar (jpg/png)."}), 400
 
-    text = llm_extract_text(files)
-    if text == "":
-        return jsonify({"error": "Tidak ada teks terbaca dari berkas yang diunggah. Pastikan file jelas dibaca (PDF akan diubah ke gambar sebelum OCR)."}), 400
+    # OCR + prefill dikerjakan worker (flask ocr-worker); klien polling GET /ocr-jobs/<job_id>
+    job = enqueue_ocr_job(read_uploads(files), owner=get_jwt_identity())
+    response = jsonify(job_status(job))
+    response.status_code = 202
+    response.headers["Location"] = url_for("ai.get_ocr_job", job_id=job.public_id)
+    return response
 
-    llm_result = call_llm(text)
-    if text and not llm_result:
-        return jsonify({"error": "Layanan AI sedang tidak tersedia. Coba lagi nanti."}), 503
-    suggestion = build_case_suggestion(llm_result)
-    return jsonify({"text": text, "data": suggestion})
+
+@bp.get("/ocr-jobs/<job_id>")
+@jwt_required()
+def get_ocr_job(job_id):
+    # Teks OCR berita acara hanya untuk pengunggahnya
+    job = find_job(job_id, get_jwt_identity())
+    if job is None:
+        return jsonify({"error": "Job OCR tidak ditemukan."}), 404
+    return jsonify(job_status(job))
 
 
 @bp.post("/prefill-person")
 def prefill_person():
     body = request.get_json(silent=True) or {}
     prompt = body.get("prompt", "")
+    # rewrite=false: keputusan tidak ditulis ulang, LLM tidak dipanggil sama sekali
+    rewrite = body.get("rewrite", True) is not False
 
-    llm_result = call_llm_person(prompt)
-    if prompt and not llm_result:
-        return jsonify({"error": "Layanan AI sedang tidak tersedia. Coba lagi nanti."}), 503
-    suggestion = {
-        "jenis_karyawan_terlapor_id": llm_result.get("jenis_karyawan_terlapor_id"),
-        "nominal_beban_karyawan": llm_result.get("nominal_beban_karyawan"),
-        "persentase_beban_karyawan": llm_result.get("persentase_beban_karyawan"),
-        "keputusan_ier": llm_result.get("keputusan_ier"),
-        "keputusan_final": llm_result.get("keputusan_final"),
-        "approval_gm_hcca": preprocessing_ai_date(llm_result.get("approval_gm_hcca")),
-        "approval_gm_fad": preprocessing_ai_date(llm_result.get("approval_gm_fad")),
-    }
+    if _wants_stream(body):
+        rules, llm_fields = plan_person_prefill(prompt, rewrite) if prompt else ({}, [])
+        payload, key = person_request(prompt, fields=llm_fields) if llm_fields else (None, None)
 
-    return jsonify({"prompt": prompt, "data": suggestion})
+        def describe(llm_result):
+            data = build_person_suggestion({**llm_result, **rules})
+            return {"sources": person_sources(rules, llm_fields, data)}
 
-def call_llm_suggestion(data: dict) -> dict:
-    kronologi = data.get("kronologi", "-")
-    kerugian = data.get("kerugian", "0")
-    jenis_case = data.get("jenis_case", "-")
-    
-    instruction = f"""
-    PERAN:
-    Anda adalah spesialis Hubungan Industrial (Industrial Relations). Tugas Anda adalah memberikan rekomendasi keputusan sanksi dan pencegahan berdasarkan fakta kasus.
-
-    DATA KASUS:
-    - Jenis Pelanggaran: {jenis_case}
-    - Total Kerugian: Rp {kerugian}
-    - Kronologi Kejadian: {kronologi}
-
-    TUGAS:
-    Analisis data di atas dan berikan output JSON SAJA dengan format berikut:
-
-    FORMAT JSON WAJIB:
-    {{
-    "saran_keputusan": "Sebutkan jenis sanksi (misal: SP1/SP2/SP3/PHK/Pembinaan) dalam 1 kalimat formal.",
-    "alasan": ["Poin alasan 1", "Poin alasan 2", "Poin alasan 3"],  // minimal 2 alasan, singkat dan terhubung ke fakta
-    "saran_pencegahan": "Saran perbaikan prosedur atau sistem agar tidak terulang."
-    }}
-
-    ATURAN:
-    - Gunakan bahasa Indonesia yang formal.
-    - Alasan harus berupa bullet list (array of strings), merujuk ke jenis pelanggaran/kronologi/kerugian.
-    - Output HARUS JSON valid.
-    - Jangan sertakan markdown atau komentar lain.
-    """
-
-    payload = {
-        "Content-Type": "application/json",
-        "messages": [{"role": "user", "content": instruction}],
-        "temperature": 0.3, # Sedikit kreatif untuk saran, tapi tetap terarah
-    }
-
-    try:
-        response = requests.post(LLM_URL, json=payload, timeout=20)
-    except Exception as exc:  
-        logging.warning("LLM suggestion request failed: %s", exc)
-        return {}
-
-    if response.status_code != 200:
-        logging.info(
-            "LLM request failed with status code %s, response: %s",
-            response.status_code,
-            response.text,
+        return _sse_response(
+            "prefill_person", payload, build_person_suggestion, {"prompt": prompt}, key,
+            initial=rules, describe=describe,
         )
-        return {}
 
-    content = response.json()["choices"][0]["message"]["content"]
-    parsed = extract_json(content)
-    return parsed if isinstance(parsed, dict) else {}
+    result = person_prefill(prompt, rewrite)
+    if result is None:
+        return jsonify({"error": AI_UNAVAILABLE}), 503
+    suggestion, sources = result
+
+    return jsonify({"prompt": prompt, "data": suggestion, "sources": sources})
+
+
+@bp.post("/prefill-person/batch")
+def prefill_person_batch():
+    body = request.get_json(silent=True) or {}
+    prompts = body.get("prompts")
+    if not isinstance(prompts, list) or not prompts:
+        return jsonify({"error": "prompts wajib berupa array teks keputusan."}), 400
+    max_items = Config.llm_batch_max_items()
+    if len(prompts) > max_items:
+        return jsonify({"error": "Terlalu banyak item dalam satu batch.", "detail": f"Maksimal {max_items} item."}), 400
+
+    rewrite = body.get("rewrite", True) is not False
+    results = person_prefill_batch(prompts, rewrite, Config.llm_batch_concurrency())
+    failed = sum(1 for r in results if "error" in r)
+    return jsonify({"results": results, "ok": len(results) - failed, "failed": failed})
 
 
 @bp.post("/suggest-decision")
 def suggest_decision():
     # Ambil data dari body request (dikirim dari frontend)
     body = request.get_json(silent=True) or {}
-    
+
+    if _wants_stream(body):
+        # Saran tidak di-cache (temperature > 0), jadi langsung relay dari LLM
+        return _sse_response("suggest_decision", suggestion_payload(body), build_decision_suggestion, {"input": body})
+
     # Panggil fungsi AI baru
     llm_result = call_llm_suggestion(body)
     if body and not llm_result:
-        return jsonify({"error": "Layanan AI sedang tidak tersedia. Coba lagi nanti."}), 503
-    
-    suggestion = {
-        "saran_keputusan": llm_result.get("saran_keputusan"),
-        "saran_pencegahan": llm_result.get("saran_pencegahan"),
-        "alasan": llm_result.get("alasan") or []
-    }
+        return jsonify({"error": AI_UNAVAILABLE}), 503
+
+    suggestion = build_decision_suggestion(llm_result)
 
     return jsonify({"input": body, "data": suggestion})
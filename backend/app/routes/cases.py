@@ -1,159 +1,52 @@
 from __future__ import annotations
 
-import os
+import base64
+import hashlib
+import json
 from datetime import datetime, date
 from operator import index
 from zoneinfo import ZoneInfo
-from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Any, Optional, Dict
+from decimal import Decimal, InvalidOperation
+from typing import Any, Optional, Dict, List, Tuple
 
 # Import library Flask dan utilitas
-from flask import Blueprint, jsonify, request, render_template, make_response, current_app
-from sqlalchemy import text
+from flask import Blueprint, Response, jsonify, request, make_response, stream_with_context
+from sqlalchemy import and_, func, or_, select, text
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import joinedload, subqueryload
+from sqlalchemy.orm import contains_eager, joinedload, subqueryload
 from flask_jwt_extended import jwt_required
 
-# Import library PDF
-from io import BytesIO
-from weasyprint import HTML
-
+from ..config import Config
 from ..extensions import db
-from ..models import Case, CasePerson, StatusPengajuan
+from ..models import Case, CasePerson, DivisiCase, JenisCase, JenisKaryawanTerlapor, StatusPengajuan, StatusProses
 from ..services.case_code import next_case_code
+from ..services.analytics import ANALYTICS_DIMENSIONS, get_loss_analytics, invalidate_case_analytics
+from ..services.case_import import DEFAULT_BATCH_SIZE as IMPORT_BATCH_SIZE, import_cases
+from ..services.case_stats import case_stat_keys, record_case_change
+from ..services.ier_export import iter_rendered_documents, iter_zip_entries, merge_pdfs, stream_zip
+from ..services.ier_pdf import get_ier_pdf, ier_document_fields, ier_document_key
+from ..services.pdf_render import RenderQueueFull, RenderTimeout
+from ..services.master_cache import current_master_version, get_master_snapshot
+from ..services.parsing import (
+    ValidationError,
+    clean_text_value as _clean_text_value,
+    none_if_empty as _none_if_empty,
+    parse_date,
+    parse_decimal_money,
+)
+from ..services.serializer import Serializer, serializer_for
 from app.services.dashboard import get_case_stats
 
 bp = Blueprint("cases", __name__, url_prefix="/api/cases")
 
-DATE_INPUT_FORMATS = (
-    "%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d",
-    "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y",
-    "%m/%d/%Y", "%m-%d-%Y", "%m.%d.%Y",
-    "%Y%m%d", "%d%m%Y",
-)
-
 JAKARTA = ZoneInfo("Asia/Jakarta")
 
-class ValidationError(Exception):
-    pass
-
-def _none_if_empty(v: Any) -> Any:
-    if v is None:
-        return None
-    if isinstance(v, str) and v.strip() == "":
-        return None
-    return v
-
-def _strip_time_component(raw: str) -> str:
-    for sep in ("T", " "):
-        if sep in raw:
-            return raw.split(sep, 1)[0]
-    return raw
-
-def parse_date(v: Any) -> Optional[date]:
-    v = _none_if_empty(v)
-    if v is None:
-        return None
-    if isinstance(v, date) and not isinstance(v, datetime):
-        return v
-    if isinstance(v, datetime):
-        return v.date()
-    if isinstance(v, str):
-        base = _strip_time_component(v.strip())
-        if not base:
-            return None
-        normalized = base.replace(".", "/")
-        candidates = {normalized, normalized.replace("/", "-")}
-        digits_only = "".join(ch for ch in normalized if ch.isdigit())
-        if len(digits_only) == 8:
-            candidates.add(digits_only)
-        for candidate in list(candidates):
-            for fmt in DATE_INPUT_FORMATS:
-                try:
-                    return datetime.strptime(candidate, fmt).date()
-                except ValueError:
-                    continue
-    raise ValueError(f"Invalid date: {v!r}")
-
-def parse_decimal_money(v: Any, scale: str = "0.01") -> Optional[Decimal]:
-    v = _none_if_empty(v)
-    if v is None:
-        return None
-    try:
-        if isinstance(v, Decimal):
-            d = v
-        elif isinstance(v, int):
-            d = Decimal(v)
-        elif isinstance(v, float):
-            d = Decimal(str(v))
-        elif isinstance(v, str):
-            s = v.strip().replace(" ", "")
-            if "," in s:
-                s = s.replace(".", "")
-                s = s.replace(",", ".")
-            else:
-                if "." in s:
-                    parts = s.split(".")
-                    if all(p.isdigit() and len(p) == 3 for p in parts[1:]):
-                        s = s.replace(".", "")
-            d = Decimal(s)
-        else:
-            d = Decimal(str(v))
-        return d.quantize(Decimal(scale), rounding=ROUND_HALF_UP)
-    except (InvalidOperation, ValueError) as e:
-        raise ValueError(f"Invalid money value: {v!r}") from e
-
-def _format_date_ddmmyyyy(d: date) -> str:
-    return d.strftime("%d-%m-%Y")
-
-def _format_datetime_ddmmyyyy(dt: datetime) -> str:
-    local = dt
-    if dt.tzinfo is not None:
-        local = dt.astimezone(JAKARTA)
-    else:
-        local = dt.replace(tzinfo=JAKARTA)
-    return local.strftime("%d-%m-%Y %H:%M:%S")
-
-def _json_safe(v: Any) -> Any:
-    if isinstance(v, datetime):
-        return _format_datetime_ddmmyyyy(v)
-    if isinstance(v, date):
-        return _format_date_ddmmyyyy(v)
-    if isinstance(v, Decimal):
-        if v == v.to_integral():
-            return int(v)
-        return float(v)
-    return v
-
-def row_to_dict(r: Any) -> Dict[str, Any]:
-    d = dict(r._mapping)
-    return {k: _json_safe(v) for k, v in d.items()}
-
-def model_to_dict(model_instance: Any, relationships: Dict[str, Any] = {}) -> Dict[str, Any]:
-    d = {}
-    for column in model_instance.__table__.columns:
-        value = getattr(model_instance, column.name)
-        d[column.name] = _json_safe(value)
-    for rel_name, rel_data in relationships.items():
-        rel_value = getattr(model_instance, rel_name)
-        if rel_value:
-            if isinstance(rel_value, list):
-                d[rel_name] = [model_to_dict(item, rel_data.get("relationships", {})) for item in rel_value]
-            else:
-                d[rel_name] = model_to_dict(rel_value, rel_data.get("relationships", {}))
-    return d
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+EXPORT_BATCH_SIZE = 500
 
 TEXT_FIELDS = ["lokasi_kejadian", "judul_ier", "kronologi", "notes", "cara_mencegah", "hrbp"]
 
-def _clean_text_value(v: Any) -> Optional[str]:
-    v = _none_if_empty(v)
-    if v is None:
-        return None
-    if not isinstance(v, str):
-        v = str(v)
-    v = v.strip()
-    return v or None
-
 def _parse_int_id(v: Any, label: str, required: bool = False) -> Optional[int]:
     v = _none_if_empty(v)
     if v is None:
@@ -226,27 +119,362 @@ def _build_person_attributes(person_payload: Dict[str, Any], index: int) -> Dict
     }
     return attrs
 
+def _parse_bool_arg(v: Any) -> bool:
+    if v is None:
+        return False
+    return str(v).strip().lower() in ("1", "true", "yes", "y", "on")
+
+def _parse_limit(v: Any) -> int:
+    v = _none_if_empty(v)
+    if v is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(v)
+    except (TypeError, ValueError):
+        raise ValidationError("limit harus berupa angka.")
+    if limit <= 0:
+        raise ValidationError("limit harus berupa angka positif.")
+    return min(limit, MAX_PAGE_SIZE)
+
+def _encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode_cursor(v: Any) -> Optional[list]:
+    v = _none_if_empty(v)
+    if v is None:
+        return None
+    try:
+        raw = str(v).strip()
+        raw += "=" * (-len(raw) % 4)
+        values = json.loads(base64.urlsafe_b64decode(raw.encode("ascii")))
+    except (ValueError, TypeError):
+        raise ValidationError("Cursor 'after' tidak valid.")
+    if not isinstance(values, list) or not values:
+        raise ValidationError("Cursor 'after' tidak valid.")
+    return values
+
+SORT_FIELDS = {
+    "id": Case.id,
+    "created_at": Case.created_at,
+    "tanggal_lapor": Case.tanggal_lapor,
+    "tanggal_kejadian": Case.tanggal_kejadian,
+    "tanggal_proses_ier": Case.tanggal_proses_ier,
+    "kerugian": Case.kerugian,
+}
+
+def _escape_like(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+CASE_FILTER_ARGS = ("lokasi", "divisi_case_id", "status_pengajuan_id", "tanggal_kejadian_from", "tanggal_kejadian_to")
+
+def _case_filters_from_args(args: Any) -> List[Any]:
+    """Terjemahkan query string filter Dashboard ke klausa WHERE atas t_case."""
+    conditions: List[Any] = []
+    lokasi = _clean_text_value(args.get("lokasi"))
+    if lokasi:
+        conditions.append(Case.lokasi_kejadian.ilike(f"%{_escape_like(lokasi)}%", escape="\\"))
+    divisi_case_id = _parse_int_id(args.get("divisi_case_id"), "Divisi Case")
+    if divisi_case_id is not None:
+        conditions.append(Case.divisi_case_id == divisi_case_id)
+    status_pengajuan_id = _parse_int_id(args.get("status_pengajuan_id"), "Status Pengajuan")
+    if status_pengajuan_id is not None:
+        conditions.append(Case.status_pengajuan_id == status_pengajuan_id)
+    start = _parse_date_field(args, "tanggal_kejadian_from", "Tanggal Kejadian (dari)")
+    if start is not None:
+        conditions.append(Case.tanggal_kejadian >= start)
+    end = _parse_date_field(args, "tanggal_kejadian_to", "Tanggal Kejadian (sampai)")
+    if end is not None:
+        conditions.append(Case.tanggal_kejadian <= end)
+    return conditions
+
+def _parse_sort(v: Any) -> Tuple[str, bool]:
+    """Format: ?sort=<field> (ASC) atau ?sort=-<field> (DESC). Default -id."""
+    v = _clean_text_value(v)
+    if v is None:
+        return "id", True
+    descending = v.startswith("-")
+    field = v.lstrip("+-")
+    if field not in SORT_FIELDS:
+        raise ValidationError(f"sort tidak dikenal. Pilihan: {', '.join(SORT_FIELDS)}.")
+    return field, descending
+
+def _sort_clauses(field: str, descending: bool) -> List[Any]:
+    if field == "id":
+        return [Case.id.desc() if descending else Case.id.asc()]
+    col = SORT_FIELDS[field]
+    # id sebagai tie-breaker supaya urutan total dan keyset stabil
+    if descending:
+        return [col.desc().nulls_last(), Case.id.desc()]
+    return [col.asc().nulls_last(), Case.id.asc()]
+
+def _cursor_scalar(v: Any) -> Any:
+    if isinstance(v, (date, datetime)):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return str(v)
+    return v
+
+def _cursor_for(case: Any, field: str) -> str:
+    if field == "id":
+        return _encode_cursor([case.id])
+    return _encode_cursor([field, _cursor_scalar(getattr(case, field)), case.id])
+
+def _parse_cursor_value(col: Any, raw: Any) -> Any:
+    col_type = col.type
+    if isinstance(col_type, db.DateTime):
+        return datetime.fromisoformat(raw)
+    if isinstance(col_type, db.Date):
+        return date.fromisoformat(raw)
+    if isinstance(col_type, db.Numeric):
+        return Decimal(raw)
+    return raw
+
+def _keyset_condition(field: str, descending: bool, cursor: list) -> Any:
+    try:
+        last_id = int(cursor[-1])
+        if field == "id":
+            return Case.id < last_id if descending else Case.id > last_id
+        if len(cursor) != 3 or cursor[0] != field:
+            raise ValidationError("Cursor 'after' tidak cocok dengan sort yang diminta.")
+        col = SORT_FIELDS[field]
+        id_after = Case.id < last_id if descending else Case.id > last_id
+        if cursor[1] is None:
+            # NULLS LAST: setelah baris NULL hanya tersisa baris NULL lain
+            return and_(col.is_(None), id_after)
+        value = _parse_cursor_value(col, cursor[1])
+    except (TypeError, ValueError, InvalidOperation):
+        raise ValidationError("Cursor 'after' tidak valid.")
+    beyond = col < value if descending else col > value
+    return or_(beyond, and_(col == value, id_after), col.is_(None))
+
+def _case_list_select() -> Any:
+    """Proyeksi kolom t_case + nama master lewat outer join (satu query, tanpa lazy load)."""
+    return (
+        select(
+            *Case.__table__.columns,
+            DivisiCase.name.label("divisi_case_name"),
+            JenisCase.name.label("jenis_case_name"),
+            StatusProses.name.label("status_proses_name"),
+            StatusPengajuan.name.label("status_pengajuan_name"),
+        )
+        .select_from(Case)
+        .outerjoin(DivisiCase, Case.divisi_case_id == DivisiCase.id)
+        .outerjoin(JenisCase, Case.jenis_case_id == JenisCase.id)
+        .outerjoin(StatusProses, Case.status_proses_id == StatusProses.id)
+        .outerjoin(StatusPengajuan, Case.status_pengajuan_id == StatusPengajuan.id)
+    )
+
+CASE_LIST_SERIALIZER = Serializer(_case_list_select().selected_columns)
+PERSON_SERIALIZER = serializer_for(CasePerson)
+CASE_SERIALIZER = serializer_for(Case)
+CASE_MASTER_RELATIONSHIPS = {
+    "divisi_case": serializer_for(DivisiCase),
+    "jenis_case": serializer_for(JenisCase),
+    "status_proses": serializer_for(StatusProses),
+    "status_pengajuan": serializer_for(StatusPengajuan),
+}
+JENIS_KARYAWAN_SERIALIZER = serializer_for(JenisKaryawanTerlapor)
+
+def _case_with_persons(case: Any) -> Dict[str, Any]:
+    case_dict = CASE_SERIALIZER.instance(case)
+    case_dict["persons"] = PERSON_SERIALIZER.many(case.persons)
+    return case_dict
+
+def _fetch_persons_by_case(case_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Ambil persons untuk banyak case sekaligus dengan satu query IN."""
+    grouped: Dict[int, List[Dict[str, Any]]] = {case_id: [] for case_id in case_ids}
+    if not case_ids:
+        return grouped
+    rows = db.session.execute(
+        select(CasePerson.__table__)
+        .where(CasePerson.case_id.in_(case_ids))
+        .order_by(CasePerson.case_id, CasePerson.person_seq)
+    )
+    for r in rows:
+        grouped[r.case_id].append(PERSON_SERIALIZER.row(r))
+    return grouped
+
+def _now_jakarta() -> datetime:
+    # Kolom waktu disimpan naive dalam waktu Jakarta (sama seperti created_at)
+    return datetime.now(JAKARTA).replace(tzinfo=None)
+
+def _http_datetime(dt: Optional[datetime]) -> Optional[datetime]:
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=JAKARTA)
+    return dt.astimezone(ZoneInfo("UTC")).replace(microsecond=0)
+
+def _make_etag(*parts: Any) -> str:
+    raw = "|".join(str(p) for p in parts)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _not_modified(etag: str, last_modified: Optional[datetime], use_if_modified_since: bool = False) -> Optional[Response]:
+    """Balas 304 tanpa serialisasi apa pun kalau validator klien masih cocok."""
+    fresh = False
+    if request.if_none_match:
+        fresh = request.if_none_match.contains(etag)
+    elif use_if_modified_since and request.if_modified_since and last_modified is not None:
+        fresh = last_modified <= request.if_modified_since
+    if not fresh:
+        return None
+    response = Response(status=304)
+    _set_validators(response, etag, last_modified)
+    return response
+
+def _set_validators(response: Response, etag: str, last_modified: Optional[datetime]) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # Data di balik JWT: boleh disimpan klien, tapi wajib revalidasi setiap kali
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
 # ---------- routes ----------
 
 @bp.get("")
 @jwt_required()
 def list_cases():
+    # Keyset pagination: ?limit=<n>&after=<next_cursor>&with_total=1
+    # Filter: ?lokasi=&divisi_case_id=&status_pengajuan_id=&tanggal_kejadian_from=&tanggal_kejadian_to=
+    # Sort: ?sort=-tanggal_kejadian (lihat SORT_FIELDS)
     try:
-        cases = db.session.query(Case).options(joinedload(Case.persons)).order_by(Case.id.desc()).all()
+        limit = _parse_limit(request.args.get("limit"))
+        cursor = _decode_cursor(request.args.get("after"))
+        with_total = _parse_bool_arg(request.args.get("with_total"))
+        sort_field, descending = _parse_sort(request.args.get("sort"))
+        conditions = _case_filters_from_args(request.args)
+
+        # Jumlah statement konstan: 1 query case (+ nama master), 1 query persons (+ count kalau diminta)
+        stmt = _case_list_select().where(*conditions)
+        if cursor is not None:
+            stmt = stmt.where(_keyset_condition(sort_field, descending, cursor))
+        # Ambil 1 baris ekstra untuk tahu apakah masih ada halaman berikutnya
+        stmt = stmt.order_by(*_sort_clauses(sort_field, descending)).limit(limit + 1)
+        cases = db.session.execute(stmt).all()
+        has_more = len(cases) > limit
+        cases = cases[:limit]
+        total = db.session.scalar(select(func.count(Case.id)).where(*conditions)) if with_total else None
+
+        # Validator dari halaman itu sendiri: id + updated_at baris yang dikembalikan.
+        # Edit terlapor ikut menaikkan updated_at case; case baru/terhapus mengubah daftar id.
+        max_updated = max((c.updated_at for c in cases), default=None)
+        last_modified = _http_datetime(max_updated)
+        etag = _make_etag(
+            "cases",
+            request.query_string.decode("utf-8", "replace"),
+            ",".join(f"{c.id}:{c.updated_at.isoformat()}" for c in cases),
+            has_more,
+            total,
+            current_master_version(),
+        )
+        not_modified = _not_modified(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        persons_by_case = _fetch_persons_by_case([c.id for c in cases])
         results = []
         for case in cases:
-            case_dict = model_to_dict(case)
-            case_dict["divisi_case_name"] = case.divisi_case.name if case.divisi_case else None
-            case_dict["jenis_case_name"] = case.jenis_case.name if case.jenis_case else None
-            case_dict["status_proses_name"] = case.status_proses.name if case.status_proses else None
-            case_dict["status_pengajuan_name"] = case.status_pengajuan.name if case.status_pengajuan else None
-            case_dict["persons"] = [model_to_dict(p) for p in case.persons]
+            case_dict = CASE_LIST_SERIALIZER.row(case)
+            case_dict["persons"] = persons_by_case[case.id]
             results.append(case_dict)
-        return jsonify({"value": results, "Count": len(results)})
+
+        body: Dict[str, Any] = {
+            "value": results,
+            "Count": len(results),
+            "next_cursor": _cursor_for(cases[-1], sort_field) if has_more else None,
+        }
+        if with_total:
+            body["total"] = total
+        return _set_validators(jsonify(body), etag, last_modified)
+    except ValidationError as exc:
+        return jsonify({"error": "Validation error", "detail": str(exc)}), 400
     except Exception as e:
         print(f"Error in list_cases: {e}") 
         return jsonify({"error": "Server error", "detail": str(e)}), 500
 
+@bp.get("/export.ndjson")
+@jwt_required()
+def export_cases_ndjson():
+    # Satu case (beserta persons) per baris. Filter sama dengan list_cases, urut id ASC.
+    try:
+        conditions = _case_filters_from_args(request.args)
+    except ValidationError as exc:
+        return jsonify({"error": "Validation error", "detail": str(exc)}), 400
+
+    stmt = (
+        _case_list_select()
+        .where(*conditions)
+        .order_by(Case.id.asc())
+        # Server-side cursor: baris diambil per batch, bukan dimuat semua ke memori
+        .execution_options(stream_results=True, yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    def generate():
+        result = db.session.execute(stmt)
+        try:
+            for batch in result.partitions():
+                persons_by_case = _fetch_persons_by_case([c.id for c in batch])
+                lines = []
+                for case in batch:
+                    case_dict = CASE_LIST_SERIALIZER.row(case)
+                    case_dict["persons"] = persons_by_case[case.id]
+                    lines.append(json.dumps(case_dict, ensure_ascii=False, default=str))
+                yield "\n".join(lines) + "\n"
+        finally:
+            result.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=cases.ndjson"},
+    )
+
+@bp.post("/import")
+@jwt_required()
+def import_cases_file():
+    # multipart/form-data: file=<.xlsx|.csv>, opsional ?dry_run=1 untuk validasi saja
+    upload = request.files.get("file")
+    if upload is None or not upload.filename:
+        return jsonify({"error": "Validation error", "detail": "File import wajib diunggah."}), 400
+    try:
+        report = import_cases(
+            upload.stream,
+            upload.filename,
+            batch_size=IMPORT_BATCH_SIZE,
+            dry_run=_parse_bool_arg(request.args.get("dry_run")),
+        )
+        return jsonify(report), 200
+    except ValidationError as exc:
+        return jsonify({"error": "Validation error", "detail": str(exc)}), 400
+    except IntegrityError as e:
+        msg = str(getattr(e, "orig", e))
+        return jsonify({"error": "Integrity error", "detail": msg}), 409
+    except Exception as e:
+        print(f"Error importing cases: {e}")
+        return jsonify({"error": "Server error", "detail": str(e)}), 500
+
+@bp.get("/analytics")
+@jwt_required()
+def case_analytics():
+    # ?group_by=month,divisi_case,jenis_case (default month) + filter yang sama dengan list_cases
+    try:
+        raw_group_by = _clean_text_value(request.args.get("group_by")) or "month"
+        group_by = [g.strip() for g in raw_group_by.split(",") if g.strip()]
+        unknown = [g for g in group_by if g not in ANALYTICS_DIMENSIONS]
+        if unknown:
+            raise ValidationError(f"group_by tidak dikenal: {', '.join(unknown)}. Pilihan: {', '.join(ANALYTICS_DIMENSIONS)}.")
+        group_by = [g for g in ANALYTICS_DIMENSIONS if g in group_by]
+        conditions = _case_filters_from_args(request.args)
+        cache_key = (tuple(group_by), tuple((k, request.args.get(k, "")) for k in CASE_FILTER_ARGS))
+        return jsonify(get_loss_analytics(group_by, conditions, cache_key))
+    except ValidationError as exc:
+        return jsonify({"error": "Validation error", "detail": str(exc)}), 400
+    except Exception as e:
+        print(f"Error in case_analytics: {e}")
+        return jsonify({"error": "Server error", "detail": str(e)}), 500
+
 @bp.route('/stats', methods=['GET'])
 @jwt_required()
 def case_stats():
@@ -257,6 +485,15 @@ def case_stats():
 @jwt_required()
 def get_case(case_id):
     try:
+        updated_at = db.session.scalar(select(Case.updated_at).where(Case.id == case_id))
+        if updated_at is None:
+            return jsonify({"error": "Not found", "detail": f"Case dengan ID {case_id} tidak ditemukan."}), 404
+        last_modified = _http_datetime(updated_at)
+        etag = _make_etag("case", case_id, updated_at, current_master_version())
+        not_modified = _not_modified(etag, last_modified, use_if_modified_since=True)
+        if not_modified is not None:
+            return not_modified
+
         case = (
             db.session.query(Case)
             .options(
@@ -271,12 +508,20 @@ def get_case(case_id):
         )
         if not case:
             return jsonify({"error": "Not found", "detail": f"Case dengan ID {case_id} tidak ditemukan."}), 404
-        relationships = {
-            "divisi_case": {}, "jenis_case": {}, "status_proses": {}, "status_pengajuan": {},
-            "persons": { "relationships": { "jenis_karyawan_terlapor": {} } }
-        }
-        case_dict = model_to_dict(case, relationships)
-        return jsonify(case_dict), 200
+        case_dict = CASE_SERIALIZER.instance(case)
+        for rel_name, rel_serializer in CASE_MASTER_RELATIONSHIPS.items():
+            related = getattr(case, rel_name)
+            if related:
+                case_dict[rel_name] = rel_serializer.instance(related)
+        if case.persons:
+            persons = []
+            for p in case.persons:
+                person_dict = PERSON_SERIALIZER.instance(p)
+                if p.jenis_karyawan_terlapor:
+                    person_dict["jenis_karyawan_terlapor"] = JENIS_KARYAWAN_SERIALIZER.instance(p.jenis_karyawan_terlapor)
+                persons.append(person_dict)
+            case_dict["persons"] = persons
+        return _set_validators(jsonify(case_dict), etag, last_modified), 200
     except Exception as e:
         return jsonify({"error": "Server error", "detail": str(e)}), 500
 
@@ -287,10 +532,10 @@ def create_case():
     try:
         attributes = _build_case_attributes(payload)
         if attributes.get("status_pengajuan_id") is None:
-            open_status = db.session.query(StatusPengajuan).filter_by(name="Open").first()
-            if not open_status:
+            open_status_id = get_master_snapshot().id_for("status-pengajuan", "Open")
+            if not open_status_id:
                 raise ValidationError("Status Pengajuan 'Open' belum tersedia di master data.")
-            attributes["status_pengajuan_id"] = open_status.id
+            attributes["status_pengajuan_id"] = open_status_id
         people_payload = payload.get("persons", [])
         validated_persons_attrs = []
         for i, person_data in enumerate(people_payload):
@@ -299,28 +544,31 @@ def create_case():
             person_attrs = _build_person_attributes(person_data, i)
             validated_persons_attrs.append(person_attrs)
 
+        now = _now_jakarta()
         case = Case(
             case_code=next_case_code(db.session),
-            created_at=datetime.now(JAKARTA).replace(tzinfo=None),
+            created_at=now,
+            updated_at=now,
             **attributes,
         )
         db.session.add(case)
         db.session.flush() 
+        record_case_change(db.session, after=case)
 
         for seq, person_attrs in enumerate(validated_persons_attrs, start=1):
             person = CasePerson(
                 case_id=case.id,
                 person_seq=seq,
                 person_code=f"{case.case_code}/{seq}",
+                updated_at=now,
                 **person_attrs,
             )
             db.session.add(person)
 
         db.session.commit() 
+        invalidate_case_analytics()
         db.session.refresh(case) 
-        case_dict = model_to_dict(case) 
-        case_dict["persons"] = [model_to_dict(p) for p in case.persons]
-        return jsonify(case_dict), 201
+        return jsonify(_case_with_persons(case)), 201
     except ValidationError as exc:
         db.session.rollback()
         return jsonify({"error": "Validation error", "detail": str(exc)}), 400
@@ -342,6 +590,7 @@ def update_case(case_id):
     if not case:
         return jsonify({"error": "Not found", "detail": f"Case dengan ID {case_id} tidak ditemukan."}), 404
     try:
+        stat_keys_before = case_stat_keys(case)
         if "kerugian" in payload:
             case.kerugian = _parse_decimal_field(payload, "kerugian", "Kerugian")
         if "status_proses_id" in payload:
@@ -354,11 +603,12 @@ def update_case(case_id):
             case.cara_mencegah = _clean_text_value(payload.get("cara_mencegah"))
         if "hrbp" in payload:
             case.hrbp = _clean_text_value(payload.get("hrbp"))
+        case.updated_at = _now_jakarta()
+        record_case_change(db.session, before=stat_keys_before, after=case)
         db.session.commit()
+        invalidate_case_analytics()
         db.session.refresh(case)
-        case_dict = model_to_dict(case)
-        case_dict["persons"] = [model_to_dict(p) for p in case.persons]
-        return jsonify(case_dict), 200
+        return jsonify(_case_with_persons(case)), 200
     except ValidationError as exc:
         db.session.rollback()
         return jsonify({"error": "Validation error", "detail": str(exc)}), 400
@@ -388,9 +638,12 @@ def update_person(person_id):
             person.approval_gm_hcca = _parse_date_field(payload, "approval_gm_hcca", "Approval GM HC&CA")
         if "approval_gm_fad" in payload:
             person.approval_gm_fad = _parse_date_field(payload, "approval_gm_fad", "Approval GM FAD")
+        # Sentuh juga case induknya supaya ETag list/detail case ikut berubah
+        person.updated_at = person.case.updated_at = _now_jakarta()
         db.session.commit()
+        invalidate_case_analytics()
         db.session.refresh(person)
-        return jsonify(model_to_dict(person)), 200
+        return jsonify(PERSON_SERIALIZER.instance(person)), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({"error": "Server error", "detail": str(e)}), 500
@@ -406,8 +659,10 @@ def delete_case(case_id):
         CasePerson.query.filter_by(case_id=case_id).delete()
         
         # Baru hapus parent (case)
+        record_case_change(db.session, before=case)
         db.session.delete(case)
         db.session.commit()
+        invalidate_case_analytics()
         return jsonify({"status": "success", "id": case_id}), 200
     except Exception as e:
         db.session.rollback()
@@ -415,10 +670,77 @@ def delete_case(case_id):
         return jsonify({"error": "Server error", "detail": str(e)}), 500
 
 # Route Download IER PDF
+def _parse_id_list(v: Any, label: str) -> List[int]:
+    v = _clean_text_value(v)
+    if v is None:
+        return []
+    try:
+        return [int(part) for part in v.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationError(f"{label} harus berupa daftar angka dipisah koma.")
+
+@bp.get("/ier-export")
+@jwt_required()
+def export_ier_documents():
+    # Form IER banyak person sekaligus. Sumber (pilih satu): ?case_id=<id> | ?person_ids=1,2,3 |
+    # filter yang sama dengan list_cases. ?format=zip (default, di-stream) | pdf (digabung jadi satu)
+    output_format = (_clean_text_value(request.args.get("format")) or "zip").lower()
+    try:
+        if output_format not in ("zip", "pdf"):
+            raise ValidationError("format harus zip atau pdf.")
+        case_id = _parse_int_id(request.args.get("case_id"), "Case")
+        person_ids = _parse_id_list(request.args.get("person_ids"), "person_ids")
+        if case_id is not None:
+            conditions = [CasePerson.case_id == case_id]
+        elif person_ids:
+            conditions = [CasePerson.id.in_(person_ids)]
+        else:
+            conditions = _case_filters_from_args(request.args)
+    except ValidationError as exc:
+        return jsonify({"error": "Validation error", "detail": str(exc)}), 400
+
+    max_documents = Config.pdf_export_max_documents()
+    persons = (
+        db.session.query(CasePerson)
+        .join(CasePerson.case)
+        .options(contains_eager(CasePerson.case))
+        .filter(*conditions)
+        .order_by(CasePerson.case_id.asc(), CasePerson.id.asc())
+        .limit(max_documents + 1)
+        .all()
+    )
+    if not persons:
+        return jsonify({"error": "Not Found", "detail": "Tidak ada person yang cocok untuk diexport"}), 404
+    if len(persons) > max_documents:
+        return jsonify({
+            "error": "Validation error",
+            "detail": f"Maksimal {max_documents} dokumen per export, persempit filter.",
+        }), 400
+
+    # Lepas dari ORM sebelum streaming: generator tidak menyentuh DB lagi
+    documents = [ier_document_fields(p) for p in persons]
+    db.session.close()
+    rendered = iter_rendered_documents(documents, Config.pdf_export_concurrency())
+    export_name = f"IER_{_now_jakarta().strftime('%Y%m%d-%H%M%S')}"
+
+    if output_format == "pdf":
+        pdf_data, errors = merge_pdfs(rendered)
+        if errors:
+            return jsonify({"error": "PDF Generation Error", "detail": errors}), 500
+        response = make_response(pdf_data)
+        response.headers["Content-Type"] = "application/pdf"
+        response.headers["Content-Disposition"] = f"attachment; filename={export_name}.pdf"
+        return response
+
+    return Response(
+        stream_with_context(stream_zip(iter_zip_entries(rendered))),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={export_name}.zip"},
+    )
+
 @bp.get("/persons/<int:person_id>/download-ier")
 @jwt_required()
 def download_ier_pdf(person_id):
-    # 1. Query Data
     person = db.session.query(CasePerson).options(
         joinedload(CasePerson.case)
     ).filter(CasePerson.id == person_id).first()
@@ -426,68 +748,31 @@ def download_ier_pdf(person_id):
     if not person:
         return jsonify({"error": "Not Found", "detail": "Data person tidak ditemukan"}), 404
 
-    case_data = person.case
-
-    # 2. Helper format tanggal dan text
-    def fmt_date(d):
-        return d.strftime("%d-%m-%Y") if d else ""
-    
-    def nl2br(s):
-        if not s: return ""
-        return s.replace("\n", "<br/>")
-
-    # 3. Format data untuk template
-    if case_data.tanggal_proses_ier:
-        case_data.tanggal_proses_ier_str = fmt_date(case_data.tanggal_proses_ier)
-    
-    case_data.kronologi_html = nl2br(case_data.kronologi)
-    person.keputusan_ier_html = nl2br(person.keputusan_ier)
-    person.keputusan_final_html = nl2br(person.keputusan_final)
-
-    # 4. Path Gambar Absolut untuk Logo
-    # Path: backend/app/static/images/spil.png
-    try:
-        filename = 'spil.png' 
-        # current_app.root_path mengarah ke folder 'backend/app'
-        image_folder = os.path.join(current_app.root_path, 'static', 'images')
-        image_path = os.path.join(image_folder, filename)
-        
-        logo_uri = ""
-        if os.path.exists(image_path):
-            # WeasyPrint butuh format URI (file://...)
-            if os.name == 'nt': # Windows
-                # Replace backslash dengan slash, tambahkan file:///
-                logo_uri = 'file:///' + image_path.replace('\\', '/')
-            else: # Linux/Mac
-                logo_uri = 'file://' + image_path
-        else:
-            print(f"Warning: Gambar logo tidak ditemukan di {image_path}")
-
-    except Exception as e:
-        print(f"Error menyiapkan path gambar: {e}")
-        logo_uri = ""
+    # Key = hash(versi template + field yang dipakai template): edit case/person -> key baru
+    fields = ier_document_fields(person)
+    key = ier_document_key(fields)
+    etag = _make_etag("ier", key)
+    not_modified = _not_modified(etag, None)
+    if not_modified is not None:
+        return not_modified
 
-    # 5. Render HTML
     try:
-        html_string = render_template(
-            "ier_form.html",
-            person=person,
-            case=case_data,
-            logo_uri=logo_uri # Kirim URI gambar ke template
-        )
-
-        # 6. Convert ke PDF via WeasyPrint
-        pdf_data = HTML(string=html_string).write_pdf()
-
-        # 7. Return Response
-        response = make_response(pdf_data)
-        response.headers['Content-Type'] = 'application/pdf'
-        
-        safe_filename = person.person_code.replace("/", "-")
-        response.headers['Content-Disposition'] = f'inline; filename=IER_{safe_filename}.pdf'
-        
+        pdf_data = get_ier_pdf(fields, key)
+    except RenderQueueFull:
+        response = jsonify({"error": "Service Unavailable", "detail": "Antrian pembuatan PDF sedang penuh, coba lagi sebentar lagi"})
+        response.status_code = 503
+        response.headers["Retry-After"] = str(Config.pdf_render_retry_after())
         return response
-
+    except RenderTimeout as e:
+        return jsonify({"error": "PDF Generation Timeout", "detail": str(e)}), 504
     except Exception as e:
         print(f"Error generating PDF: {e}")
         return jsonify({"error": "PDF Generation Error", "detail": str(e)}), 500
+
+    response = make_response(pdf_data)
+    response.headers['Content-Type'] = 'application/pdf'
+
+    safe_filename = person.person_code.replace("/", "-")
+    response.headers['Content-Disposition'] = f'inline; filename=IER_{safe_filename}.pdf'
+
+    return _set_validators(response, etag, None)
@@ -1,6 +1,9 @@
 from flask import Blueprint, jsonify
 from sqlalchemy import text
 from ..extensions import db
+from ..services.image_prep import image_stats
+from ..services.llm_cache import llm_cache
+from ..services.llm_client import get_llm_client
 
 bp = Blueprint("health", __name__)
 
@@ -14,4 +17,12 @@ def db_health():
         result = db.session.execute(text("SELECT 1")).scalar()
         return jsonify({"db": "ok", "result": int(result)})
     except Exception as e:
-        return jsonify({"db": "error", "error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"db": "error", "error": str(e)}), 500
+
+@bp.get("/llm-health")
+def llm_health():
+    # Status circuit breaker + latensi/error per operasi LLM dan statistik cache/gambar OCR di worker ini
+    stats = get_llm_client().stats()
+    stats["cache"] = llm_cache.stats()
+    stats["ocr_images"] = image_stats.as_dict()
+    return jsonify(stats)
@@ -2,25 +2,12 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from ..extensions import db
-from ..models import (
-    JenisCase,
-    JenisKaryawanTerlapor,
-    StatusProses,
-    StatusPengajuan,
-    DivisiCase,
-    Case,
-    CasePerson,
-)
+from ..models import Case, CasePerson
+from ..services.master_cache import MASTER_MODELS, bump_master_version, get_master_snapshot
 
 bp = Blueprint("master", __name__, url_prefix="/api/master")
 
-MODEL_MAP = {
-    "jenis-case": JenisCase,
-    "jenis-karyawan-terlapor": JenisKaryawanTerlapor,
-    "status-proses": StatusProses,
-    "status-pengajuan": StatusPengajuan,
-    "divisi-case": DivisiCase,
-}
+MODEL_MAP = MASTER_MODELS
 
 def _get_model(kind: str):
     model = MODEL_MAP.get(kind)
@@ -32,8 +19,7 @@ def _get_model(kind: str):
 def list_master(kind):
     model, err = _get_model(kind)
     if err: return err
-    rows = db.session.query(model).order_by(model.id.asc()).all()
-    return jsonify([{"id": r.id, "name": r.name} for r in rows])
+    return jsonify(get_master_snapshot().rows[kind])
 
 @bp.post("/<kind>")
 def create_master(kind):
@@ -51,6 +37,7 @@ def create_master(kind):
 
     row = model(name=name)
     db.session.add(row)
+    bump_master_version()
     db.session.commit()
     return jsonify({"id": row.id, "name": row.name}), 201
 
@@ -79,6 +66,7 @@ def update_master(kind: str, item_id: int):
         return jsonify({"error": "conflict", "detail": "Nama sudah ada."}), 409
 
     row.name = name
+    bump_master_version()
     db.session.commit()
     return jsonify({"id": row.id, "name": row.name}), 200
 
@@ -126,6 +114,7 @@ def delete_master(kind: str, item_id: int):
 
     try:
         db.session.delete(row)
+        bump_master_version()
         db.session.commit()
         return jsonify({"status": "deleted", "id": item_id}), 200
     except IntegrityError as exc:
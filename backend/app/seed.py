@@ -1,4 +1,5 @@
 from .extensions import db
+from .services.master_cache import bump_master_version
 from .models import (
     JenisCase,
     JenisKaryawanTerlapor,
@@ -46,5 +47,7 @@ def seed_all():
             db.session.add(model(name=name))
             added += 1
         report[model.__tablename__] = added
+    # Selalu bump: juga memastikan baris m_master_version ada
+    bump_master_version()
     db.session.commit()
     return report
@@ -0,0 +1,422 @@
+from __future__ import annotations
+
+import json
+import logging
+from datetime import datetime
+from typing import Any, Iterable
+
+from ..config import Config
+from .llm_cache import llm_cache
+from .llm_client import LLMError, get_llm_client
+from .master_cache import MasterSnapshot, get_master_snapshot
+
+
+def call_llm(prompt: str) -> dict:
+    if not prompt:
+        return {}
+
+    payload, key = case_request(prompt)
+    return llm_cache.get_or_compute("prefill_case", key, lambda: _chat_json("prefill_case", payload))
+
+
+def case_request(prompt: str, masters: MasterSnapshot | None = None, compact: bool | None = None) -> tuple[dict, str]:
+    """Payload LLM prefill kasus dan cache key-nya.
+
+    compact (LLM_COMPACT_PROMPTS): daftar master tidak ikut di prompt; LLM menulis nama,
+    lalu build_case_suggestion memetakannya ke ID lewat master_resolver.
+    """
+    compact = Config.llm_compact_prompts() if compact is None else compact
+    if not compact:
+        masters = masters or get_master_snapshot()
+
+    if compact:
+        master_fields = {
+            "divisi_case": "string | null",
+            "jenis_case": "string | null",
+            "status_proses": "string | null",
+            "status_pengajuan": "string | null",
+            "jenis_karyawan_terlapor": "string | null",
+        }
+        master_rules = (
+            "ATURAN KATEGORI:\n"
+            "    - divisi_case, jenis_case, status_proses, status_pengajuan dan jenis_karyawan_terlapor diisi NAMA singkat\n"
+            '      sesuai istilah di teks (mis. "OPS", "Salah Muat", "Ongoing", "Outsource"); jika tidak disebut, null.\n\n'
+        )
+        status_rules = ""
+    else:
+        master_fields = {
+            "divisi_case_id": "number | null",
+            "jenis_case_id": "number | null",
+            "status_proses_id": "number | null",
+            "status_pengajuan_id": "number | null",
+            "jenis_karyawan_terlapor_id": "number | null",
+        }
+        master_rules = (
+            "KONSTRAINT ID:\n"
+            "    - divisi_case_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:\n"
+            f"    {masters.hints['divisi-case']}\n\n"
+            "    - jenis_case_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:\n"
+            f"    {masters.hints['jenis-case']}\n\n"
+            "    - status_proses_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:\n"
+            f"    {masters.hints['status-proses']}\n\n"
+            "    - status_pengajuan_id HARUS dipilih dari daftar berikut, jika tidak cocok gunakan null:\n"
+            f"    {masters.hints['status-pengajuan']}\n\n"
+        )
+        status_rules = (
+            "ATURAN STATUS:\n"
+            "    - Jika ada indikasi status proses/pengajuan, cocokkan ke master status di atas.\n\n    "
+        )
+    divisi_field, jenis_field, status_proses_field, status_pengajuan_field, karyawan_field = (
+        f'"{name}": {kind}' for name, kind in master_fields.items()
+    )
+
+    instruction = f"""
+    TUGAS:
+    Ekstrak informasi dari teks kasus dan hasilkan OUTPUT JSON SAJA.
+
+    ATURAN OUTPUT:
+    - Output HARUS berupa JSON valid
+    - Jangan sertakan teks, komentar, atau markdown apa pun
+    - Jika data tidak ditemukan, gunakan null (bukan string)
+
+    FORMAT JSON WAJIB:
+    {{
+    {divisi_field},
+    {jenis_field},
+    "tanggal_lapor": "YYYY-MM-DD" | null,
+    "tanggal_kejadian": "YYYY-MM-DD" | null,
+    "lokasi_kejadian": string | null,
+    "judul_ier": string | null,
+    "tanggal_proses_ier": "YYYY-MM-DD" | null,
+    "kerugian": number | null,
+    "kronologi": string | null,
+    {status_proses_field},
+    {status_pengajuan_field},
+    "persons": [
+      {{
+        "nama": string | null,
+        "divisi": string | null,
+        "departemen": string | null,
+        {karyawan_field}
+      }}
+    ]
+    }}
+
+    {master_rules}    ATURAN KRONOLOGI:
+    - Tulis ulang kronologi dengan bahasa formal, jelas, dan ringkas dengan poin-poin ke bawah jadi 1 enter, 2 enter, 3 enter dan seterusnya untuk tiap poin
+    - Fokus pada urutan kejadian, aktor, dan dampak
+    - Jangan menyalin kalimat mentah dari teks
+    - Jangan menambahkan asumsi baru
+
+    {status_rules}ATURAN JUDUL IER:
+    - judul_ier HARUS berupa ringkasan singkat dari isi kronologi
+    - Panjang maksimal 10–12 kata
+    - Tidak mengandung detail teknis berlebihan (tanggal lengkap, nominal rinci)
+    - Mewakili inti peristiwa utama
+
+    ATURAN TERLAPOR:
+    - Isi array "persons" jika ada nama terlapor, divisi, departemen, atau jenis karyawan terlapor.
+    - Jika divisi/jenis karyawan terlapor cocok dengan master, isi {"namanya" if compact else "ID-nya"}; jika tidak pasti, set null.
+
+    TEKS KASUS:
+    {prompt}
+    """
+
+    payload = {
+        "Content-Type": "application/json",
+        "messages": [{"role": "user", "content": instruction}],
+        "temperature": 0,
+    }
+
+    # Instruksi penuh memuat hint master; versi master ikut di key supaya perubahan master pasti miss.
+    # Prompt ringkas tidak bergantung master (nama dipetakan ulang setiap kali), jadi versinya tidak perlu.
+    version = None if compact else masters.version
+    return payload, llm_cache.make_key("prefill_case", payload, version, Config.llm_url())
+
+
+def _chat_json(operation: str, payload: dict) -> dict:
+    try:
+        content = get_llm_client().chat(operation, payload)
+    except LLMError as exc:
+        logging.warning("LLM request failed: %s", exc)
+        return {}
+
+    parsed = extract_json(content)
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def _master_id(llm_result: dict, field: str, kind: str) -> Any:
+    """`<field>_id` dari prompt penuh, atau nama `<field>` dari prompt ringkas yang dipetakan lokal."""
+    item_id = llm_result.get(f"{field}_id")
+    if item_id is not None or llm_result.get(field) is None:
+        return item_id
+    return get_master_snapshot().resolver.resolve_id(kind, llm_result[field])
+
+
+def _person_entry(person: Any) -> Any:
+    if not isinstance(person, dict) or "jenis_karyawan_terlapor" not in person:
+        return person
+    entry = {k: v for k, v in person.items() if k != "jenis_karyawan_terlapor"}
+    entry["jenis_karyawan_terlapor_id"] = _master_id(person, "jenis_karyawan_terlapor", "jenis-karyawan-terlapor")
+    return entry
+
+
+def build_case_suggestion(llm_result: dict) -> dict:
+    return {
+        "divisi_case_id": _master_id(llm_result, "divisi_case", "divisi-case"),
+        "jenis_case_id": _master_id(llm_result, "jenis_case", "jenis-case"),
+        "tanggal_lapor": llm_result.get("tanggal_lapor"),
+        "tanggal_kejadian": llm_result.get("tanggal_kejadian"),
+        "lokasi_kejadian": llm_result.get("lokasi_kejadian"),
+        "judul_ier": llm_result.get("judul_ier"),
+        "tanggal_proses_ier": llm_result.get("tanggal_proses_ier"),
+        "kerugian": llm_result.get("kerugian"),
+        "kronologi": llm_result.get("kronologi"),
+        "status_proses_id": _master_id(llm_result, "status_proses", "status-proses"),
+        "status_pengajuan_id": _master_id(llm_result, "status_pengajuan", "status-pengajuan"),
+        "persons": [_person_entry(p) for p in llm_result.get("persons") or []],
+    }
+
+
+MONTHS = {
+    "januari": 1, "februari": 2, "maret": 3, "april": 4, "mei": 5, "juni": 6,
+    "juli": 7, "agustus": 8, "september": 9, "oktober": 10, "november": 11, "desember": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "mei": 5, "jun": 6, "jul": 7,
+    "aug": 8, "sep": 9, "oct": 10, "okt": 10, "nov": 11, "dec": 12, "des": 12,
+}
+
+
+def preprocessing_ai_date(raw: Any) -> str | None:
+    if raw is None:
+        return None
+    s = str(raw).strip()
+    if not s:
+        return None
+
+    try:
+        if len(s) == 10 and s[2] == "-" and s[5] == "-":
+            dt = datetime.strptime(s, "%d-%m-%Y")
+            return dt.strftime("%d-%m-%Y")
+    except Exception:
+        pass
+
+    try:
+        if len(s) == 10 and s[4] == "-" and s[7] == "-":
+            dt = datetime.strptime(s, "%Y-%m-%d")
+            return dt.strftime("%d-%m-%Y")
+    except Exception:
+        pass
+
+    for sep in (" ", "/", "-"):
+        parts = s.replace(",", " ").replace("/", sep).replace("-", sep).split(sep)
+        if len(parts) == 3 and parts[0].isdigit() and parts[2].isdigit():
+            try:
+                day = int(parts[0])
+                year = int(parts[2])
+                month_part = parts[1].strip().lower()
+                if month_part.isdigit():
+                    month = int(month_part)
+                else:
+                    month = MONTHS.get(month_part)
+                if month:
+                    dt = datetime(year, month, day)
+                    return dt.strftime("%d-%m-%Y")
+            except Exception:
+                continue
+
+    return None
+
+
+def call_llm_person(prompt: str, fields: Iterable[str] | None = None) -> dict:
+    if not prompt:
+        return {}
+
+    payload, key = person_request(prompt, fields=fields)
+    return llm_cache.get_or_compute("prefill_person", key, lambda: _chat_json("prefill_person", payload))
+
+
+PERSON_FIELDS = (
+    "jenis_karyawan_terlapor_id",
+    "nominal_beban_karyawan",
+    "persentase_beban_karyawan",
+    "keputusan_ier",
+    "keputusan_final",
+    "approval_gm_hcca",
+    "approval_gm_fad",
+)
+REWRITE_FIELDS = ("keputusan_ier", "keputusan_final")
+
+# (format JSON, komentar, kolom "//") per field prefill-person. Kolom komentar disejajarkan
+# persis seperti prompt lama supaya prompt penuh (dan key cache-nya) tidak berubah.
+_PERSON_FORMAT = {
+    "nominal_beban_karyawan": ("number | null", "", 0),
+    "persentase_beban_karyawan": ("number | null", "", 0),
+    "keputusan_ier": ("string | null", "TULIS ULANG formal & ringkas, sebut tindakan + alasan/dasar", 34),
+    "keputusan_final": ("string | null", "TULIS ULANG formal & ringkas, sebut tindakan + alasan/dasar", 34),
+    "approval_gm_hcca": ('"DD-MM-YYYY" | null', "format dd-mm-yyyy", 41),
+    "approval_gm_fad": ('"DD-MM-YYYY" | null', "format dd-mm-yyyy", 41),
+}
+
+# (field yang membutuhkan aturan ini, baris aturan)
+_PERSON_RULES = (
+    (("approval_gm_hcca", "approval_gm_fad"), '- Jika ada frasa persetujuan/approval HC&CA atau FAD beserta tanggal (format bebas, mis. "19 desember 2025"), konversi ke "YYYY-MM-DD" dan isi kolomnya.'),
+    (("approval_gm_hcca", "approval_gm_fad"), "- Jika ada persetujuan tanpa tanggal, set kolom approval terkait ke null."),
+    (("approval_gm_hcca", "approval_gm_fad"), "- Tanggal boleh pakai nama bulan Indonesia/Inggris; normalisasi ke YYYY-MM-DD."),
+    (("nominal_beban_karyawan",), '- Jika nominal disebut (mis. "9 juta"), konversi ke angka penuh (9000000).'),
+    (REWRITE_FIELDS, (
+        "- Contoh gaya keputusan formal:\n"
+        '      "Menetapkan pemutusan hubungan kerja karena pelanggaran prosedur yang menimbulkan kerugian perusahaan."\n'
+        '      "Menetapkan pemutusan hubungan kerja efektif setelah persetujuan GM HC&CA dan GM FAD."'
+    )),
+)
+
+
+def person_request(prompt: str, compact: bool | None = None, fields: Iterable[str] | None = None) -> tuple[dict, str]:
+    """Payload LLM prefill terlapor; `fields` membatasi field yang diminta (default semua)."""
+    compact = Config.llm_compact_prompts() if compact is None else compact
+    masters = None if compact else get_master_snapshot()
+    wanted = [f for f in PERSON_FIELDS if fields is None or f in fields]
+
+    lines = []
+    for i, field in enumerate(wanted):
+        if field == "jenis_karyawan_terlapor_id":
+            line = '"jenis_karyawan_terlapor": string | null' if compact else '"jenis_karyawan_terlapor_id": number | null'
+            comment, column = "", 0
+        else:
+            kind, comment, column = _PERSON_FORMAT[field]
+            line = f'"{field}": {kind}'
+        line += "," if i < len(wanted) - 1 else ""
+        lines.append(f"{line:<{column - 1}} // {comment}" if comment else line)
+    format_block = "\n    ".join(lines)
+    rules_block = "\n    ".join(rule for needs, rule in _PERSON_RULES if any(f in wanted for f in needs))
+
+    instruction = f"""
+    TUGAS:
+    Ekstrak informasi dari teks keputusan dan hasilkan OUTPUT JSON SAJA.
+
+    ATURAN OUTPUT:
+    - Output HARUS berupa JSON valid
+    - Jangan sertakan teks, komentar, atau markdown apa pun
+    - Jika data tidak ditemukan, gunakan null (bukan string)
+
+    FORMAT JSON WAJIB:
+    {{
+    {format_block}
+    }}
+
+    ATURAN KHUSUS:
+    {rules_block}
+
+    TEKS KEPUTUSAN:
+    {prompt}
+    """
+
+    payload = {
+        "Content-Type": "application/json",
+        "messages": [{"role": "user", "content": instruction}],
+        "temperature": 0,
+    }
+
+    version = masters.version if masters else None
+    return payload, llm_cache.make_key("prefill_person", payload, version, Config.llm_url())
+
+
+def build_person_suggestion(llm_result: dict) -> dict:
+    return {
+        "jenis_karyawan_terlapor_id": _master_id(llm_result, "jenis_karyawan_terlapor", "jenis-karyawan-terlapor"),
+        "nominal_beban_karyawan": llm_result.get("nominal_beban_karyawan"),
+        "persentase_beban_karyawan": llm_result.get("persentase_beban_karyawan"),
+        "keputusan_ier": llm_result.get("keputusan_ier"),
+        "keputusan_final": llm_result.get("keputusan_final"),
+        "approval_gm_hcca": preprocessing_ai_date(llm_result.get("approval_gm_hcca")),
+        "approval_gm_fad": preprocessing_ai_date(llm_result.get("approval_gm_fad")),
+    }
+
+
+def extract_json(raw_content: str) -> Any:
+    text = raw_content.strip()
+
+    if "```" in text:
+        for block in text.split("```"):
+            candidate = block.strip()
+            if not candidate:
+                continue
+            if candidate.lower().startswith("json"):
+                candidate = candidate[4:].strip()
+            if candidate.startswith("{") and candidate.endswith("}"):
+                return safe_json_loads(candidate)
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end != -1 and end > start:
+        return safe_json_loads(text[start : end + 1])
+
+    logging.warning("LLM response not valid JSON: %s", text)
+    return {}
+
+
+def safe_json_loads(content: str) -> Any:
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        logging.warning("LLM response not valid JSON: %s", content)
+        return {}
+
+
+def call_llm_suggestion(data: dict) -> dict:
+    payload = suggestion_payload(data)
+    try:
+        content = get_llm_client().chat("suggest_decision", payload)
+    except LLMError as exc:
+        logging.warning("LLM suggestion request failed: %s", exc)
+        return {}
+
+    parsed = extract_json(content)
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def suggestion_payload(data: dict) -> dict:
+    kronologi = data.get("kronologi", "-")
+    kerugian = data.get("kerugian", "0")
+    jenis_case = data.get("jenis_case", "-")
+    
+    instruction = f"""
+    PERAN:
+    Anda adalah spesialis Hubungan Industrial (Industrial Relations). Tugas Anda adalah memberikan rekomendasi keputusan sanksi dan pencegahan berdasarkan fakta kasus.
+
+    DATA KASUS:
+    - Jenis Pelanggaran: {jenis_case}
+    - Total Kerugian: Rp {kerugian}
+    - Kronologi Kejadian: {kronologi}
+
+    TUGAS:
+    Analisis data di atas dan berikan output JSON SAJA dengan format berikut:
+
+    FORMAT JSON WAJIB:
+    {{
+    "saran_keputusan": "Sebutkan jenis sanksi (misal: SP1/SP2/SP3/PHK/Pembinaan) dalam 1 kalimat formal.",
+    "alasan": ["Poin alasan 1", "Poin alasan 2", "Poin alasan 3"],  // minimal 2 alasan, singkat dan terhubung ke fakta
+    "saran_pencegahan": "Saran perbaikan prosedur atau sistem agar tidak terulang."
+    }}
+
+    ATURAN:
+    - Gunakan bahasa Indonesia yang formal.
+    - Alasan harus berupa bullet list (array of strings), merujuk ke jenis pelanggaran/kronologi/kerugian.
+    - Output HARUS JSON valid.
+    - Jangan sertakan markdown atau komentar lain.
+    """
+
+    payload = {
+        "Content-Type": "application/json",
+        "messages": [{"role": "user", "content": instruction}],
+        "temperature": 0.3, # Sedikit kreatif untuk saran, tapi tetap terarah
+    }
+    return payload
+
+
+def build_decision_suggestion(llm_result: dict) -> dict:
+    return {
+        "saran_keputusan": llm_result.get("saran_keputusan"),
+        "saran_pencegahan": llm_result.get("saran_pencegahan"),
+        "alasan": llm_result.get("alasan") or [],
+    }
@@ -0,0 +1,105 @@
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import func, select
+
+from ..config import Config
+from ..extensions import db
+from ..models import Case, CasePerson, CaseStat, DivisiCase, JenisCase, MasterVersion
+from .case_stats import TOTAL_FROM_DIMENSION
+from .master_cache import MASTER_VERSION_ID
+from .serializer import decimal_to_json
+from .ttl_cache import TTLCache
+
+ANALYTICS_DIMENSIONS = ("month", "divisi_case", "jenis_case")
+
+# Hasil agregasi per kombinasi (group_by, filter, versi data). Versi data dibaca dari DB setiap
+# request, jadi penulisan case dari worker/proses mana pun langsung membuat entri lama tidak terpakai;
+# clear() hanya membebaskan memori di proses yang menulis.
+analytics_cache = TTLCache(maxsize=256)
+
+def invalidate_case_analytics() -> None:
+    analytics_cache.clear()
+
+def analytics_data_version() -> tuple:
+    """(updated_at case terbaru, jumlah case, versi master), satu query.
+
+    Create/update case dan update person menyentuh t_case.updated_at; delete mengubah jumlah case;
+    rename master mengubah nama divisi/jenis di hasil."""
+    row = db.session.execute(select(
+        select(func.max(Case.updated_at)).scalar_subquery(),
+        select(func.coalesce(func.sum(CaseStat.count), 0))
+        .where(CaseStat.dimension == TOTAL_FROM_DIMENSION)
+        .scalar_subquery(),
+        select(MasterVersion.version).where(MasterVersion.id == MASTER_VERSION_ID).scalar_subquery(),
+    )).one()
+    return tuple(row)
+
+def _per_case_subquery(conditions: Sequence[Any]):
+    # Tahap 1: satu baris per case (kerugian + total beban karyawan dari semua person),
+    # supaya kerugian tidak terhitung ganda saat case punya banyak person.
+    return (
+        select(
+            Case.id.label("case_id"),
+            func.date_trunc("month", Case.tanggal_kejadian).label("month"),
+            Case.divisi_case_id.label("divisi_case_id"),
+            Case.jenis_case_id.label("jenis_case_id"),
+            Case.kerugian.label("kerugian"),
+            func.coalesce(func.sum(CasePerson.nominal_beban_karyawan), 0).label("nominal_beban_karyawan"),
+        )
+        .select_from(Case)
+        .outerjoin(CasePerson, CasePerson.case_id == Case.id)
+        .where(*conditions)
+        .group_by(Case.id)
+        .subquery()
+    )
+
+def _money(v: Any) -> Any:
+    return decimal_to_json(v) if v is not None else 0
+
+def query_loss_analytics(group_by: Sequence[str], conditions: Sequence[Any]) -> List[Dict[str, Any]]:
+    per_case = _per_case_subquery(conditions)
+    columns: List[Any] = []
+    groups: List[Any] = []
+    joins: List[Any] = []
+    if "month" in group_by:
+        columns.append(per_case.c.month)
+        groups.append(per_case.c.month)
+    if "divisi_case" in group_by:
+        columns += [per_case.c.divisi_case_id, DivisiCase.name.label("divisi_case")]
+        groups += [per_case.c.divisi_case_id, DivisiCase.name]
+        joins.append((DivisiCase, DivisiCase.id == per_case.c.divisi_case_id))
+    if "jenis_case" in group_by:
+        columns += [per_case.c.jenis_case_id, JenisCase.name.label("jenis_case")]
+        groups += [per_case.c.jenis_case_id, JenisCase.name]
+        joins.append((JenisCase, JenisCase.id == per_case.c.jenis_case_id))
+
+    stmt = select(
+        *columns,
+        func.count().label("case_count"),
+        func.sum(per_case.c.kerugian).label("kerugian"),
+        func.sum(per_case.c.nominal_beban_karyawan).label("nominal_beban_karyawan"),
+    ).select_from(per_case)
+    for model, onclause in joins:
+        stmt = stmt.outerjoin(model, onclause)
+    if groups:
+        stmt = stmt.group_by(*groups).order_by(*groups)
+
+    results = []
+    for row in db.session.execute(stmt).mappings():
+        item = dict(row)
+        if "month" in item:
+            item["month"] = item["month"].strftime("%Y-%m") if item["month"] else None
+        item["case_count"] = int(item["case_count"])
+        item["kerugian"] = _money(item["kerugian"])
+        item["nominal_beban_karyawan"] = _money(item["nominal_beban_karyawan"])
+        results.append(item)
+    return results
+
+def get_loss_analytics(group_by: Sequence[str], conditions: Sequence[Any], cache_key: Any) -> Dict[str, Any]:
+    cache_key = (cache_key, analytics_data_version())
+    cached = analytics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    data = {"group_by": list(group_by), "rows": query_loss_analytics(group_by, conditions)}
+    analytics_cache.set(cache_key, data, ttl=Config.analytics_cache_ttl())
+    return data
@@ -1,37 +1,60 @@
 from datetime import datetime
+from typing import List
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import select, text
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
-from ..models import Case
+from ..models import CaseCodeCounter
 
 JAKARTA = ZoneInfo("Asia/Jakarta")
 
+# Hanya case code dengan format global dd/mm/yyyy/<seq> yang ikut dihitung
+CASE_CODE_PATTERN = r"^[0-9]{2}/[0-9]{2}/[0-9]{4}/[0-9]+$"
+
 def make_base(dt: datetime) -> str:
     # format dd/mm/yyyy
     return dt.strftime("%d/%m/%Y")
 
-def next_case_code(session) -> str:
-    now = datetime.now(JAKARTA)
-    base = make_base(now)
-
-    # lock per-base biar aman kalau 2 request barengan di hari yg sama
-    session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:k))"), {"k": base})
+def allocate_case_codes(session, count: int) -> List[str]:
+    """Alokasikan `count` case code berurutan untuk hari ini.
 
-    # cari semua ID yang base-nya sama (hari yang sama)
-    rows = session.execute(
-        select(Case.case_code).where(Case.case_code.like(f"{base}/%"))
-    ).scalars().all()
+    Satu statement INSERT ... ON CONFLICT DO UPDATE ... RETURNING pada baris
+    counter harian: O(1) berapapun jumlah case hari itu. Row lock pada baris
+    counter ditahan sampai transaksi selesai, jadi nomor yang dialokasikan tidak
+    pernah dobel dan akan "dikembalikan" kalau transaksinya rollback.
+    """
+    if count <= 0:
+        return []
 
-    max_seq = 0
-    for code in rows:
-        # format global: dd/mm/yyyy/<seq>
-        if not code.startswith(base + "/"):
-            continue
+    base = make_base(datetime.now(JAKARTA))
+    stmt = pg_insert(CaseCodeCounter).values(base=base, last_seq=count)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CaseCodeCounter.base],
+        set_={"last_seq": CaseCodeCounter.last_seq + count},
+    ).returning(CaseCodeCounter.last_seq)
+    last_seq = session.execute(stmt).scalar_one()
 
-        suffix = code[len(base) + 1 :]
-        seq_str = suffix.split("/", 1)[0]
-        if seq_str.isdigit():
-            max_seq = max(max_seq, int(seq_str))
+    first_seq = last_seq - count + 1
+    return [f"{base}/{seq}" for seq in range(first_seq, last_seq + 1)]
 
-    return f"{base}/{max_seq + 1}"
+def next_case_code(session) -> str:
+    return allocate_case_codes(session, 1)[0]
+
+BACKFILL_SQL = text(
+    """
+    INSERT INTO t_case_code_counter (base, last_seq)
+    SELECT substr(case_code, 1, 10), max(split_part(case_code, '/', 4)::int)
+    FROM t_case
+    WHERE case_code ~ :pattern
+    GROUP BY 1
+    ON CONFLICT (base) DO UPDATE
+    SET last_seq = GREATEST(t_case_code_counter.last_seq, EXCLUDED.last_seq)
+    """
+)
+
+def backfill_case_code_counters(session) -> int:
+    """Isi/naikkan counter dari case code yang sudah ada. Aman dijalankan ulang."""
+    result = session.execute(BACKFILL_SQL, {"pattern": CASE_CODE_PATTERN})
+    session.commit()
+    return result.rowcount
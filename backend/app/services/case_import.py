@@ -0,0 +1,353 @@
+from __future__ import annotations
+
+import csv
+import io
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import insert
+
+from ..extensions import db
+from ..models import Case, CasePerson
+from .analytics import invalidate_case_analytics
+from .case_code import allocate_case_codes
+from .case_stats import apply_case_stat_delta, case_stat_delta, case_stat_keys
+from .master_cache import get_master_snapshot
+from .parsing import ValidationError, clean_text_value, parse_date, parse_decimal_money
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+
+DEFAULT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+# Header kolom (ternormalisasi) -> (target, field). Mengikuti sheet "Parameter"
+# di database/UI Industrial Case Management System.xlsx.
+HEADER_MAP = {
+    "id case": ("ref", "ref"),
+    "id case per case": ("ref", "ref"),
+    "divisi case": ("master", "divisi_case_id"),
+    "tanggal lapor": ("case_date", "tanggal_lapor"),
+    "tanggal kejadian": ("case_date", "tanggal_kejadian"),
+    "lokasi kejadian": ("case_text", "lokasi_kejadian"),
+    "jenis case": ("master", "jenis_case_id"),
+    "judul ier": ("case_text", "judul_ier"),
+    "tanggal proses ier": ("case_date", "tanggal_proses_ier"),
+    "kerugian": ("case_money", "kerugian"),
+    "kerugian by case": ("case_money", "kerugian_by_case"),
+    "kronologi": ("case_text", "kronologi"),
+    "nama terlapor": ("person_text", "nama"),
+    "lokasi terlapor": ("person_text", "lokasi"),
+    "divisi terlapor": ("person_text", "divisi"),
+    "departemen terlapor": ("person_text", "departemen"),
+    "jenis karyawan terlapor": ("master", "jenis_karyawan_terlapor_id"),
+    "keputusan ier": ("person_text", "keputusan_ier"),
+    "keputusan final": ("person_text", "keputusan_final"),
+    "persentase beban karyawan": ("person_percent", "persentase_beban_karyawan"),
+    "nominal beban karyawan": ("person_money", "nominal_beban_karyawan"),
+    "approval gm hc ca": ("person_date", "approval_gm_hcca"),
+    "approval gm hcca": ("person_date", "approval_gm_hcca"),
+    "approval gm fad": ("person_date", "approval_gm_fad"),
+    "status process": ("master", "status_proses_id"),
+    "status proses": ("master", "status_proses_id"),
+    "status pengajuan": ("master", "status_pengajuan_id"),
+    "notes": ("case_text", "notes"),
+    "cara mencegah ke depannya": ("case_text", "cara_mencegah"),
+    "cara mencegah": ("case_text", "cara_mencegah"),
+    "hrbp": ("case_text", "hrbp"),
+}
+
+MASTER_FIELDS = {
+    "divisi_case_id": ("divisi-case", "Divisi Case"),
+    "jenis_case_id": ("jenis-case", "Jenis Case"),
+    "status_proses_id": ("status-proses", "Status Proses"),
+    "status_pengajuan_id": ("status-pengajuan", "Status Pengajuan"),
+    "jenis_karyawan_terlapor_id": ("jenis-karyawan-terlapor", "Jenis Karyawan Terlapor"),
+}
+
+PERSON_MASTER_FIELDS = {"jenis_karyawan_terlapor_id"}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+_CURRENCY_PREFIX = re.compile(r"^\s*(rp\.?|idr)\s*", re.IGNORECASE)
+
+def normalize_name(v: Any) -> str:
+    return _NON_ALNUM.sub(" ", str(v).lower()).strip()
+
+# ---------- pembacaan file ----------
+
+def _iter_xlsx(stream: Any) -> Iterator[List[Any]]:
+    try:
+        from openpyxl import load_workbook
+    except Exception as exc:
+        raise ValidationError("openpyxl belum terpasang, file xlsx tidak bisa dibaca.") from exc
+    # read_only: baris dibaca streaming, tidak seluruh workbook dimuat ke memori
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        sheet = wb.active
+        for name in wb.sheetnames:
+            first = next(wb[name].iter_rows(max_row=1, values_only=True), ())
+            if any(normalize_name(v) in ("divisi case", "jenis case") for v in first if v is not None):
+                sheet = wb[name]
+                break
+        for row in sheet.iter_rows(values_only=True):
+            yield list(row)
+    finally:
+        wb.close()
+
+def _iter_csv(stream: Any) -> Iterator[List[Any]]:
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    sample = text_stream.read(4096)
+    text_stream.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.reader(text_stream, dialect)
+
+def iter_rows(stream: Any, filename: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """Yield (nomor_baris, {header_ternormalisasi: nilai}) dari file xlsx/csv."""
+    lower = (filename or "").lower()
+    if lower.endswith(".xlsx") or lower.endswith(".xlsm"):
+        raw_rows = _iter_xlsx(stream)
+    elif lower.endswith(".csv"):
+        raw_rows = _iter_csv(stream)
+    else:
+        raise ValidationError("Format file tidak didukung. Unggah .xlsx atau .csv.")
+
+    headers: Optional[List[str]] = None
+    for row_number, raw in enumerate(raw_rows, start=1):
+        if headers is None:
+            headers = [normalize_name(v) if v is not None else "" for v in raw]
+            if not any(h in HEADER_MAP for h in headers):
+                raise ValidationError("Header kolom tidak dikenali. Gunakan nama kolom sesuai template IER.")
+            continue
+        if all(v is None or (isinstance(v, str) and not v.strip()) for v in raw):
+            continue
+        yield row_number, {h: v for h, v in zip(headers, raw) if h}
+
+# ---------- validasi baris ----------
+
+def _parse_money(value: Any, scale: str = "0.01") -> Any:
+    # Template Excel memakai format "Rp. 200.000"
+    if isinstance(value, str):
+        value = _CURRENCY_PREFIX.sub("", value)
+    return parse_decimal_money(value, scale=scale)
+
+class MasterLookup:
+    """Peta nama master (ternormalisasi) -> id, dibangun sekali per import dari cache master."""
+
+    def __init__(self):
+        masters = get_master_snapshot()
+        self._maps: Dict[str, Dict[str, int]] = {
+            field: {normalize_name(r["name"]): r["id"] for r in masters.rows[kind]}
+            for field, (kind, _label) in MASTER_FIELDS.items()
+        }
+
+    def find(self, field: str, name: str) -> Optional[int]:
+        return self._maps[field].get(normalize_name(name))
+
+    def resolve(self, field: str, value: Any) -> Optional[int]:
+        name = clean_text_value(value)
+        if name is None:
+            return None
+        found = self.find(field, name)
+        if found is None:
+            raise ValidationError(f"{MASTER_FIELDS[field][1]} '{name}' tidak ada di master data.")
+        return found
+
+def _group_key(ref: Any) -> Optional[str]:
+    # ID Case per individu dibedakan dengan sufiks huruf (26120225a, 26120225b, ...)
+    ref = clean_text_value(ref)
+    if ref is None:
+        return None
+    return ref.rstrip("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ").strip() or ref
+
+def parse_row(values: Dict[str, Any], masters: MasterLookup) -> Tuple[Optional[str], Dict[str, Any], Dict[str, Any]]:
+    case_attrs: Dict[str, Any] = {}
+    person_attrs: Dict[str, Any] = {}
+    ref = None
+    for header, value in values.items():
+        mapping = HEADER_MAP.get(header)
+        if not mapping:
+            continue
+        kind, field = mapping
+        try:
+            if kind == "ref":
+                ref = _group_key(value)
+            elif kind == "master":
+                target = person_attrs if field in PERSON_MASTER_FIELDS else case_attrs
+                target[field] = masters.resolve(field, value)
+            elif kind == "case_text":
+                case_attrs[field] = clean_text_value(value)
+            elif kind == "case_date":
+                case_attrs[field] = parse_date(value)
+            elif kind == "case_money":
+                case_attrs[field] = _parse_money(value)
+            elif kind == "person_text":
+                person_attrs[field] = clean_text_value(value)
+            elif kind == "person_date":
+                person_attrs[field] = parse_date(value)
+            elif kind == "person_money":
+                person_attrs[field] = _parse_money(value)
+            elif kind == "person_percent":
+                person_attrs[field] = _parse_money(value, scale="0.001")
+        except ValueError as exc:
+            raise ValidationError(f"Kolom '{header}' tidak valid: {value!r}.") from exc
+
+    if not any(v is not None for v in person_attrs.values()):
+        person_attrs = {}
+    elif not person_attrs.get("nama"):
+        raise ValidationError("Nama Terlapor wajib diisi bila data terlapor diisi.")
+    return ref, case_attrs, person_attrs
+
+def check_required_case(case_attrs: Dict[str, Any]) -> None:
+    # Hanya untuk baris pertama case; baris lanjutan grup boleh mengosongkan kolom case
+    if case_attrs.get("divisi_case_id") is None:
+        raise ValidationError("Divisi Case wajib diisi.")
+    if case_attrs.get("jenis_case_id") is None:
+        raise ValidationError("Jenis Case wajib diisi.")
+
+# ---------- import ----------
+
+def _uniform(params: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # executemany butuh key yang sama di setiap baris parameter
+    keys = set().union(*params)
+    return [{k: p.get(k) for k in keys} for p in params]
+
+class CaseImporter:
+    """Import bulk: baris divalidasi di memori lalu ditulis per batch.
+
+    Setiap batch mengalokasikan blok case code sekaligus dan menulis case serta
+    persons dengan INSERT multi-baris (executemany insertmanyvalues).
+
+    Semua batch satu transaksi, di-commit sekali di akhir: error DB di batch mana pun
+    membatalkan seluruh file, jadi upload ulang tidak menggandakan case. Konsekuensinya
+    lock counter case code dan baris t_case_stats ditahan sampai import selesai.
+    """
+
+    def __init__(self, session, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False):
+        self.session = session
+        self.batch_size = max(1, batch_size)
+        self.dry_run = dry_run
+        self.masters = MasterLookup()
+        self.default_status_pengajuan_id = self.masters.find("status_pengajuan_id", "Open")
+        self.report: Dict[str, Any] = {
+            "rows": 0,
+            "imported_cases": 0,
+            "imported_persons": 0,
+            "error_count": 0,
+            "errors": [],
+            "dry_run": dry_run,
+        }
+        # [(ref, case_attrs, [person_attrs, ...], [row_number, ...])]
+        self._pending: List[Tuple[Optional[str], Dict[str, Any], List[Dict[str, Any]], List[int]]] = []
+
+    def _error(self, row_number: int, message: str) -> None:
+        self.report["error_count"] += 1
+        if len(self.report["errors"]) < MAX_REPORTED_ERRORS:
+            self.report["errors"].append({"row": row_number, "error": message})
+
+    def add_row(self, row_number: int, values: Dict[str, Any]) -> None:
+        self.report["rows"] += 1
+        try:
+            ref, case_attrs, person_attrs = parse_row(values, self.masters)
+        except ValidationError as exc:
+            self._error(row_number, str(exc))
+            return
+        # Baris berurutan dengan ID Case yang sama digabung jadi satu case multi-terlapor
+        if ref is not None and self._pending and self._pending[-1][0] == ref:
+            _ref, group_attrs, persons, rows = self._pending[-1]
+            # Kolom case kosong (mis. sel merge) ikut baris pertama; nilai yang berbeda ditolak
+            conflicts = [
+                field for field, value in case_attrs.items()
+                if value is not None and group_attrs.get(field) is not None and group_attrs[field] != value
+            ]
+            if conflicts:
+                self._error(
+                    row_number,
+                    f"Data case berbeda dengan baris sebelumnya untuk ID Case '{ref}': {', '.join(conflicts)}.",
+                )
+                return
+            for field, value in case_attrs.items():
+                if value is not None:
+                    group_attrs[field] = value
+            if person_attrs:
+                persons.append(person_attrs)
+            rows.append(row_number)
+            return
+
+        try:
+            check_required_case(case_attrs)
+        except ValidationError as exc:
+            self._error(row_number, str(exc))
+            return
+        if case_attrs.get("status_pengajuan_id") is None and self.default_status_pengajuan_id is None:
+            self._error(row_number, "Status Pengajuan 'Open' belum tersedia di master data.")
+            return
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+        self._pending.append((ref, case_attrs, [person_attrs] if person_attrs else [], [row_number]))
+
+    def flush(self) -> None:
+        pending, self._pending = self._pending, []
+        if not pending:
+            return
+        if self.dry_run:
+            self.report["imported_cases"] += len(pending)
+            self.report["imported_persons"] += sum(len(p[2]) for p in pending)
+            return
+
+        for _ref, attrs, _persons, _rows in pending:
+            # Default diisi saat flush supaya baris lanjutan grup masih bisa mengisi Status Pengajuan
+            if attrs.get("status_pengajuan_id") is None:
+                attrs["status_pengajuan_id"] = self.default_status_pengajuan_id
+
+        created_at = datetime.now(JAKARTA).replace(tzinfo=None)
+        codes = allocate_case_codes(self.session, len(pending))
+        case_params = [
+            {"case_code": code, "created_at": created_at, "updated_at": created_at, **attrs}
+            for code, (_ref, attrs, _persons, _rows) in zip(codes, pending)
+        ]
+        case_ids = self.session.execute(
+            insert(Case).returning(Case.id, sort_by_parameter_order=True),
+            _uniform(case_params),
+        ).scalars().all()
+
+        person_params = []
+        for case_id, code, (_ref, _attrs, persons, _rows) in zip(case_ids, codes, pending):
+            for seq, person_attrs in enumerate(persons, start=1):
+                person_params.append({
+                    "case_id": case_id,
+                    "person_seq": seq,
+                    "person_code": f"{code}/{seq}",
+                    "updated_at": created_at,
+                    **person_attrs,
+                })
+        if person_params:
+            self.session.execute(insert(CasePerson), _uniform(person_params))
+
+        stat_delta = sum((case_stat_delta(None, case_stat_keys(p)) for p in case_params), Counter())
+        # Belum di-commit: lihat docstring kelas
+        apply_case_stat_delta(self.session, stat_delta)
+
+        self.report["imported_cases"] += len(case_params)
+        self.report["imported_persons"] += len(person_params)
+
+    def run(self, stream: Any, filename: str) -> Dict[str, Any]:
+        try:
+            for row_number, values in iter_rows(stream, filename):
+                self.add_row(row_number, values)
+            self.flush()
+            if not self.dry_run:
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        if not self.dry_run:
+            invalidate_case_analytics()
+        return self.report
+
+def import_cases(stream: Any, filename: str, batch_size: int = DEFAULT_BATCH_SIZE, dry_run: bool = False) -> Dict[str, Any]:
+    return CaseImporter(db.session, batch_size=batch_size, dry_run=dry_run).run(stream, filename)
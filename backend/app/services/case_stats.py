@@ -0,0 +1,95 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..models import Case, CaseStat
+
+# Dipelihara dalam transaksi penulisan case: create/update/delete meng-upsert baris dimensi
+# nilai case itu dan memegang lock barisnya sampai commit. Penulisan case yang berbagi nilai
+# dimensi (mis. semua case baru berstatus Open) tetap bergantian di baris itu; tidak ada baris
+# total yang disentuh setiap penulisan dan setiap batch import, total dihitung dari
+# jumlah baris TOTAL_FROM_DIMENSION.
+# dimensi ringkasan -> kolom t_case
+STAT_DIMENSIONS = {
+    "status_pengajuan": "status_pengajuan_id",
+    "divisi_case": "divisi_case_id",
+    "jenis_case": "jenis_case_id",
+}
+# Setiap case masuk tepat satu baris di setiap dimensi; total = jumlah baris dimensi ini
+TOTAL_FROM_DIMENSION = "status_pengajuan"
+NULL_KEY = 0
+
+def case_stat_keys(case: Any) -> Dict[str, int]:
+    """Ambil nilai dimensi dari instance Case atau dict atribut case."""
+    if isinstance(case, dict) and case.keys() == STAT_DIMENSIONS.keys():
+        return case  # sudah berupa hasil case_stat_keys
+    get = case.get if isinstance(case, dict) else (lambda k: getattr(case, k, None))
+    return {dim: get(col) or NULL_KEY for dim, col in STAT_DIMENSIONS.items()}
+
+def case_stat_delta(before: Optional[Dict[str, int]], after: Optional[Dict[str, int]]) -> Counter:
+    """Selisih hitungan untuk satu case: create (None -> keys), delete (keys -> None), atau update."""
+    delta: Counter = Counter()
+    for dim, key in (before or {}).items():
+        delta[(dim, key)] -= 1
+    for dim, key in (after or {}).items():
+        delta[(dim, key)] += 1
+    return delta
+
+def apply_case_stat_delta(session, delta: Counter) -> None:
+    """Terapkan delta ke t_case_stats dalam transaksi yang sama dengan perubahan case."""
+    # Urutan tetap supaya transaksi paralel mengunci baris dengan urutan yang sama (hindari deadlock)
+    for (dim, key), amount in sorted(delta.items()):
+        if amount == 0:
+            continue
+        stmt = pg_insert(CaseStat).values(dimension=dim, key_id=key, count=amount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CaseStat.dimension, CaseStat.key_id],
+            set_={"count": CaseStat.count + amount},
+        )
+        session.execute(stmt)
+
+def record_case_change(session, before: Any = None, after: Any = None) -> None:
+    apply_case_stat_delta(
+        session,
+        case_stat_delta(
+            case_stat_keys(before) if before is not None else None,
+            case_stat_keys(after) if after is not None else None,
+        ),
+    )
+
+def case_total(session) -> int:
+    return int(session.scalar(
+        select(func.coalesce(func.sum(CaseStat.count), 0)).where(CaseStat.dimension == TOTAL_FROM_DIMENSION)
+    ))
+
+def _actual_counts(session) -> Dict[tuple, int]:
+    counts: Dict[tuple, int] = {}
+    for dim, col_name in STAT_DIMENSIONS.items():
+        col = getattr(Case, col_name)
+        for key, n in session.execute(select(func.coalesce(col, NULL_KEY), func.count(Case.id)).group_by(col)):
+            counts[(dim, key)] = counts.get((dim, key), 0) + n
+    return counts
+
+def reconcile_case_stats(session, fix: bool = True) -> List[Dict[str, Any]]:
+    """Hitung ulang ringkasan dari t_case, laporkan drift, dan (opsional) tulis ulang tabelnya."""
+    if fix and session.get_bind().dialect.name == "postgresql":
+        # Tahan penulisan ke t_case selama rebuild supaya hasil hitung ulang konsisten
+        session.execute(text("LOCK TABLE t_case IN SHARE MODE"))
+    actual = _actual_counts(session)
+    stored = {(r.dimension, r.key_id): r.count for r in session.query(CaseStat).all()}
+
+    drift = []
+    for key in sorted(set(actual) | set(stored)):
+        expected, current = actual.get(key, 0), stored.get(key, 0)
+        if expected != current:
+            drift.append({"dimension": key[0], "key_id": key[1], "stored": current, "actual": expected})
+
+    if fix:
+        session.execute(delete(CaseStat))
+        session.add_all(
+            CaseStat(dimension=dim, key_id=key, count=n) for (dim, key), n in actual.items() if n
+        )
+        session.commit()
+    return drift
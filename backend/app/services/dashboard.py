@@ -1,20 +1,22 @@
-from sqlalchemy import func, select
+from sqlalchemy import and_, func, select
 from ..extensions import db
-from ..models import Case, StatusPengajuan
+from ..models import CaseStat, DivisiCase, JenisCase, StatusPengajuan
+from .case_stats import case_total
 
-def get_case_stats():
-    total = db.session.scalar(select(func.count(Case.id))) or 0
+def _counts_by_master(model, dimension: str) -> dict:
+    # Baca dari t_case_stats (dipelihara saat create/update/delete), bukan COUNT atas t_case
     stmt = (
-        select(StatusPengajuan.name, func.count(Case.id))
-        .select_from(StatusPengajuan)
-        .outerjoin(Case, StatusPengajuan.id == Case.status_pengajuan_id)
-        .group_by(StatusPengajuan.name)
+        select(model.name, func.coalesce(CaseStat.count, 0))
+        .select_from(model)
+        .outerjoin(CaseStat, and_(CaseStat.dimension == dimension, CaseStat.key_id == model.id))
+        .order_by(model.id)
     )
-    
-    rows = db.session.execute(stmt).all()
-    details = {row[0]: row[1] for row in rows}
+    return {row[0]: int(row[1]) for row in db.session.execute(stmt).all()}
 
+def get_case_stats():
     return {
-        "total": total,
-        "details": details
-    }
\ No newline at end of file
+        "total": case_total(db.session),
+        "details": _counts_by_master(StatusPengajuan, "status_pengajuan"),
+        "by_divisi_case": _counts_by_master(DivisiCase, "divisi_case"),
+        "by_jenis_case": _counts_by_master(JenisCase, "jenis_case"),
+    }
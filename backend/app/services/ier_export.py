@@ -0,0 +1,158 @@
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pypdf import PdfWriter
+
+from ..config import Config
+from .ier_pdf import get_pdf_cache, ier_document_key, render_ier_html
+from .pdf_render import RenderQueueFull, get_render_pool, render_pdf
+
+# (posisi di daftar input, fields dokumen, bytes PDF atau None, pesan error atau None)
+RenderedDocument = Tuple[int, Dict[str, Any], Optional[bytes], Optional[str]]
+
+# Jeda sebelum mencoba submit lagi saat pool penuh oleh request lain
+_QUEUE_FULL_BACKOFF = 0.2
+
+def iter_rendered_documents(documents: List[Dict[str, Any]], concurrency: int) -> Iterator[RenderedDocument]:
+    """Render banyak dokumen IER, di-yield sesuai urutan selesai (bukan urutan input).
+
+    Cache disk dipakai dulu; sisanya dikirim ke process pool dengan paling banyak
+    `concurrency` job sekaligus, jadi memori tetap terbatas dan pool tidak dimonopoli.
+    """
+    cache = get_pdf_cache()
+    pool = get_render_pool()
+    timeout = Config.pdf_render_timeout()
+    pending: Dict[Any, Tuple[int, Dict[str, Any], str]] = {}
+
+    def collect(return_when: str) -> Iterator[RenderedDocument]:
+        done, _ = wait(list(pending), timeout=timeout, return_when=return_when)
+        if not done:
+            # Tidak ada yang selesai dalam batas waktu: anggap semua yang tertunda gagal
+            done = list(pending)
+        for future in done:
+            index, fields, key = pending.pop(future)
+            if not future.done():
+                future.cancel()
+                yield index, fields, None, f"Render PDF melebihi {timeout:g} detik"
+                continue
+            try:
+                pdf_data = future.result()
+            except Exception as exc:
+                yield index, fields, None, str(exc) or type(exc).__name__
+                continue
+            cache.put(key, pdf_data)
+            yield index, fields, pdf_data, None
+
+    for index, fields in enumerate(documents):
+        key = ier_document_key(fields)
+        pdf_data = cache.get(key)
+        if pdf_data is not None:
+            yield index, fields, pdf_data, None
+            continue
+
+        try:
+            html = render_ier_html(fields)
+            if pool is None:
+                pdf_data = render_pdf(html)
+                cache.put(key, pdf_data)
+                yield index, fields, pdf_data, None
+                continue
+        except Exception as exc:
+            yield index, fields, None, str(exc) or type(exc).__name__
+            continue
+
+        while len(pending) >= concurrency:
+            yield from collect(FIRST_COMPLETED)
+
+        deadline = time.monotonic() + timeout
+        future = None
+        error = "Antrian render PDF penuh"
+        while future is None:
+            try:
+                future = pool.submit(html)
+            except RenderQueueFull:
+                if pending:
+                    yield from collect(FIRST_COMPLETED)
+                elif time.monotonic() >= deadline:
+                    break
+                else:
+                    time.sleep(_QUEUE_FULL_BACKOFF)
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+                break
+        if future is None:
+            yield index, fields, None, error
+            continue
+        pending[future] = (index, fields, key)
+
+    while pending:
+        yield from collect(FIRST_COMPLETED)
+
+class _StreamBuffer:
+    """Target tulis ZipFile yang tidak bisa di-seek; isinya dikuras setiap selesai satu entri."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+def stream_zip(entries: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """ZIP yang dikirim sambil jalan: tiap entri langsung di-yield, tanpa menunggu entri lain."""
+    buffer = _StreamBuffer()
+    # PDF sudah terkompresi, jadi cukup STORED
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as zf:
+        for name, data in entries:
+            zf.writestr(name, data)
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    yield buffer.drain()
+
+def ier_pdf_filename(fields: Dict[str, Any]) -> str:
+    safe_code = (fields.get("person_code") or "").replace("/", "-")
+    return f"IER_{safe_code}.pdf"
+
+def iter_zip_entries(rendered: Iterable[RenderedDocument]) -> Iterator[Tuple[str, bytes]]:
+    seen: Dict[str, int] = {}
+    errors: List[str] = []
+    for _, fields, pdf_data, error in rendered:
+        if pdf_data is None:
+            errors.append(f"{fields.get('person_code')}: {error}")
+            continue
+        name = ier_pdf_filename(fields)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        if count:
+            name = f"{name[:-4]}_{count + 1}.pdf"
+        yield name, pdf_data
+    if errors:
+        yield "ERRORS.txt", ("\n".join(errors) + "\n").encode("utf-8")
+
+def merge_pdfs(rendered: Iterable[RenderedDocument]) -> Tuple[bytes, List[str]]:
+    """Gabungkan semua dokumen jadi satu PDF sesuai urutan input. Mengembalikan (pdf, error)."""
+    by_index: Dict[int, bytes] = {}
+    errors: List[str] = []
+    for index, fields, pdf_data, error in rendered:
+        if pdf_data is None:
+            errors.append(f"{fields.get('person_code')}: {error}")
+        else:
+            by_index[index] = pdf_data
+    writer = PdfWriter()
+    for index in sorted(by_index):
+        writer.append(BytesIO(by_index.pop(index)))
+    output = BytesIO()
+    writer.write(output)
+    return output.getvalue(), errors
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from jinja2 import Template
+
+from ..config import Config
+from ..models import CasePerson
+from .pdf_assets import LOGO_URI, read_asset, read_stylesheet
+from .pdf_cache import PdfCache
+from .pdf_render import render_pdf
+
+TEMPLATE_NAME = "ier_form.html"
+
+# Naikkan kalau cara menyusun konteks/HTML di modul ini berubah, supaya cache lama tidak terpakai
+RENDER_VERSION = 2
+
+_version_lock = threading.Lock()
+_template_version: Optional[str] = None
+
+_cache_lock = threading.Lock()
+_pdf_cache: Optional[PdfCache] = None
+
+def template_version() -> str:
+    """Hash template + CSS + logo; dihitung sekali per proses (deploy baru = proses baru)."""
+    global _template_version
+    if _template_version is not None:
+        return _template_version
+    with _version_lock:
+        if _template_version is None:
+            h = hashlib.sha256(f"render-v{RENDER_VERSION}".encode())
+            source, _, _ = current_app.jinja_env.loader.get_source(current_app.jinja_env, TEMPLATE_NAME)
+            h.update(source.encode("utf-8"))
+            h.update(read_stylesheet().encode("utf-8"))
+            h.update(read_asset("logo") or b"no-logo")
+            _template_version = h.hexdigest()
+    return _template_version
+
+@lru_cache(maxsize=None)
+def _compiled_template(jinja_env) -> Template:
+    # Dikompilasi sekali; render_template akan get_template + cek mtime di setiap request
+    return jinja_env.get_template(TEMPLATE_NAME)
+
+def ier_document_fields(person: CasePerson) -> Dict[str, Any]:
+    """Hanya field yang benar-benar dipakai ier_form.html; sekaligus jadi bahan key cache."""
+    case = person.case
+    return {
+        "person_code": person.person_code,
+        "keputusan_ier": person.keputusan_ier,
+        "judul_ier": case.judul_ier,
+        "kronologi": case.kronologi,
+        "tanggal_proses_ier": case.tanggal_proses_ier.strftime("%d-%m-%Y") if case.tanggal_proses_ier else "",
+    }
+
+def ier_document_key(fields: Dict[str, Any]) -> str:
+    payload = json.dumps([template_version(), fields], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def _nl2br(s: Optional[str]) -> str:
+    if not s:
+        return ""
+    return s.replace("\n", "<br/>")
+
+def render_ier_html(fields: Dict[str, Any]) -> str:
+    return _compiled_template(current_app.jinja_env).render(
+        person={
+            "person_code": fields["person_code"],
+            "keputusan_ier_html": _nl2br(fields["keputusan_ier"]),
+        },
+        case={
+            "judul_ier": fields["judul_ier"],
+            "kronologi_html": _nl2br(fields["kronologi"]),
+            "tanggal_proses_ier_str": fields["tanggal_proses_ier"],
+        },
+        # Logo dilayani dari memori oleh url_fetcher di pdf_assets
+        logo_uri=LOGO_URI if read_asset("logo") else "",
+    )
+
+def render_ier_pdf(fields: Dict[str, Any]) -> bytes:
+    # HTML dirender di sini (butuh app context), WeasyPrint di process pool
+    return render_pdf(render_ier_html(fields))
+
+def get_pdf_cache() -> PdfCache:
+    global _pdf_cache
+    if _pdf_cache is None:
+        with _cache_lock:
+            if _pdf_cache is None:
+                directory = Config.pdf_cache_dir() or os.path.join(current_app.instance_path, "pdf_cache")
+                _pdf_cache = PdfCache(directory, Config.pdf_cache_max_bytes())
+    return _pdf_cache
+
+def get_ier_pdf(fields: Dict[str, Any], key: Optional[str] = None) -> bytes:
+    """PDF dari cache disk kalau isi dokumen tidak berubah; render lalu simpan kalau belum ada."""
+    key = key or ier_document_key(fields)
+    cache = get_pdf_cache()
+    pdf_data = cache.get(key)
+    if pdf_data is None:
+        pdf_data = render_ier_pdf(fields)
+        cache.put(key, pdf_data)
+    return pdf_data
@@ -0,0 +1,119 @@
+import hashlib
+import logging
+import threading
+from io import BytesIO
+from typing import Dict, Optional, Set, Tuple
+
+from PIL import Image, ImageOps
+
+from ..config import Config
+
+EXIF_ORIENTATION = 0x0112
+# Format yang bisa dikirim ke LLM apa adanya kalau tidak perlu diubah
+PASSTHROUGH_FORMATS = {"JPEG": "image/jpeg", "PNG": "image/png"}
+
+class _ImageStats:
+    """Akumulasi per proses: berapa byte gambar masuk vs yang benar-benar dikirim ke LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.images = 0
+        self.duplicates = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def record(self, bytes_in: int, bytes_out: int, duplicate: bool) -> None:
+        with self._lock:
+            self.images += 1
+            self.bytes_in += bytes_in
+            if duplicate:
+                self.duplicates += 1
+            else:
+                self.bytes_out += bytes_out
+
+    def as_dict(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "images": self.images,
+                "duplicates_dropped": self.duplicates,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+            }
+
+image_stats = _ImageStats()
+
+def _flatten(img: Image.Image) -> Image.Image:
+    # JPEG tidak punya alpha; latar transparan dijadikan putih, bukan hitam
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    if img.mode not in ("RGB", "L"):
+        return img.convert("RGB")
+    return img
+
+class ImagePreprocessor:
+    """Normalisasi gambar sebelum OCR: orientasi EXIF, sisi terpanjang maks OCR_MAX_LONG_EDGE,
+    JPEG kualitas OCR_JPEG_QUALITY, dan buang halaman duplikat (hash isi piksel) dalam satu upload.
+
+    Satu instance per upload, karena himpunan hash duplikat berlaku per upload.
+    """
+
+    def __init__(self):
+        self.max_long_edge = Config.ocr_max_long_edge()
+        self.quality = Config.ocr_jpeg_quality()
+        self.dedupe = Config.ocr_dedupe_pages()
+        self._seen: Set[str] = set()
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.duplicates = 0
+
+    def prepare(self, raw_bytes: bytes, mimetype: str, recompress: bool = True) -> Optional[Tuple[bytes, str]]:
+        """(bytes, mimetype) siap kirim, atau None kalau halaman ini duplikat.
+
+        recompress=False untuk JPEG yang sudah dibuat dengan OCR_JPEG_QUALITY (halaman PDF hasil
+        rasterisasi): hanya di-encode ulang kalau perlu diputar atau diperkecil.
+        """
+        self.bytes_in += len(raw_bytes)
+        data, mime, digest = self._normalize(raw_bytes, mimetype, recompress)
+        duplicate = self.dedupe and digest in self._seen
+        image_stats.record(len(raw_bytes), len(data), duplicate)
+        if duplicate:
+            self.duplicates += 1
+            return None
+        self._seen.add(digest)
+        self.bytes_out += len(data)
+        return data, mime
+
+    def _normalize(self, raw_bytes: bytes, mimetype: str, recompress: bool) -> Tuple[bytes, str, str]:
+        try:
+            with Image.open(BytesIO(raw_bytes)) as opened:
+                source_format = opened.format
+                # exif_transpose selalu mengembalikan salinan; baca tag orientasi untuk tahu perlu atau tidak
+                transposed = opened.getexif().get(EXIF_ORIENTATION, 1) not in (0, 1)
+                img = ImageOps.exif_transpose(opened) if transposed else opened
+                resized = False
+                if self.max_long_edge > 0 and max(img.size) > self.max_long_edge:
+                    img.thumbnail((self.max_long_edge, self.max_long_edge), Image.LANCZOS)
+                    resized = True
+                img = _flatten(img)
+                digest = hashlib.sha256(
+                    f"{img.mode}{img.size}".encode() + img.tobytes()
+                ).hexdigest()
+                changed = transposed or resized
+                passthrough = PASSTHROUGH_FORMATS.get(source_format)
+                if passthrough and not changed and not recompress:
+                    return raw_bytes, passthrough, digest
+                out = BytesIO()
+                img.save(out, format="JPEG", quality=self.quality, optimize=True)
+        except Exception as exc:
+            # Bukan gambar yang bisa dibaca Pillow: kirim apa adanya, dedupe dari isi file
+            logging.warning("Image preprocessing skipped: %s", exc)
+            return raw_bytes, mimetype or "image/jpeg", hashlib.sha256(raw_bytes).hexdigest()
+
+        data = out.getvalue()
+        if passthrough and not changed and len(raw_bytes) <= len(data):
+            # File asli sudah lebih kecil dan orientasi/ukurannya sudah benar; pakai apa adanya
+            return raw_bytes, passthrough, digest
+        return data, "image/jpeg", digest
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from ..config import Config
+from ..extensions import db
+from ..models import LLMCacheEntry
+
+# Pembersihan (expired + kelebihan entri) dijalankan setiap N penulisan, bukan setiap kali
+PRUNE_EVERY = 100
+
+# Batas tunggu request yang ikut menumpang panggilan identik yang sedang berjalan
+FOLLOWER_TIMEOUT = 300.0
+
+class LLMCache:
+    """Cache hasil LLM/OCR di tabel t_llm_cache, dengan TTL, batas jumlah entri dan single-flight.
+
+    Single-flight berlaku per proses: request identik yang datang saat panggilan pertama
+    masih berjalan menunggu hasil yang sama, bukan memanggil backend LLM lagi.
+    Kegagalan DB tidak pernah menggagalkan request; cache dianggap miss.
+    Cache memakai session sendiri: commit/rollback cache tidak menyentuh state di db.session
+    (mis. job OCR yang sedang diproses).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.stores = 0
+        self.errors = 0
+
+    @staticmethod
+    def make_key(operation: str, *parts: Any) -> str:
+        raw = json.dumps([operation, *parts], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _session() -> Session:
+        return Session(db.engine)
+
+    def _load(self, key: str) -> Optional[Any]:
+        now = datetime.utcnow()
+        session = self._session()
+        try:
+            value = session.scalar(
+                select(LLMCacheEntry.value).where(LLMCacheEntry.key == key, LLMCacheEntry.expires_at > now)
+            )
+            if value is None:
+                return None
+            session.execute(
+                update(LLMCacheEntry)
+                .where(LLMCacheEntry.key == key)
+                .values(hit_count=LLMCacheEntry.hit_count + 1, last_hit_at=now)
+            )
+            session.commit()
+            return json.loads(value)
+        except Exception as exc:
+            session.rollback()
+            self.errors += 1
+            logging.warning("LLM cache read failed: %s", exc)
+            return None
+        finally:
+            session.close()
+
+    def _store(self, key: str, operation: str, value: Any, ttl: float) -> None:
+        now = datetime.utcnow()
+        stmt = pg_insert(LLMCacheEntry).values(
+            key=key,
+            operation=operation,
+            value=json.dumps(value, ensure_ascii=False),
+            created_at=now,
+            expires_at=now + timedelta(seconds=ttl),
+            hit_count=0,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LLMCacheEntry.key],
+            set_={"value": stmt.excluded.value, "created_at": now, "expires_at": stmt.excluded.expires_at},
+        )
+        session = self._session()
+        try:
+            session.execute(stmt)
+            session.commit()
+            self.stores += 1
+        except Exception as exc:
+            session.rollback()
+            self.errors += 1
+            logging.warning("LLM cache write failed: %s", exc)
+            return
+        finally:
+            session.close()
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % PRUNE_EVERY == 0
+        if prune:
+            self.prune()
+
+    def prune(self) -> int:
+        """Hapus entri kedaluwarsa, lalu entri paling lama tidak dipakai di atas LLM_CACHE_MAX_ENTRIES."""
+        session = self._session()
+        try:
+            removed = session.execute(
+                delete(LLMCacheEntry).where(LLMCacheEntry.expires_at <= datetime.utcnow())
+            ).rowcount or 0
+            excess = (session.scalar(select(func.count()).select_from(LLMCacheEntry)) or 0) - Config.llm_cache_max_entries()
+            if excess > 0:
+                oldest = (
+                    select(LLMCacheEntry.key)
+                    .order_by(func.coalesce(LLMCacheEntry.last_hit_at, LLMCacheEntry.created_at).asc())
+                    .limit(excess)
+                    .scalar_subquery()
+                )
+                removed += session.execute(
+                    delete(LLMCacheEntry).where(LLMCacheEntry.key.in_(oldest))
+                ).rowcount or 0
+            session.commit()
+            return removed
+        except Exception as exc:
+            session.rollback()
+            self.errors += 1
+            logging.warning("LLM cache prune failed: %s", exc)
+            return 0
+        finally:
+            session.close()
+
+    def get_or_compute(self, operation: str, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Ambil dari cache, atau jalankan compute() sekali untuk semua request identik.
+
+        Hasil kosong ({} / "" / None) dianggap gagal dan tidak disimpan.
+        """
+        ttl = Config.llm_cache_ttl() if ttl is None else ttl
+        if ttl <= 0:
+            return compute()
+
+        value = self._load(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+        if not leader:
+            self.coalesced += 1
+            try:
+                return future.result(timeout=FOLLOWER_TIMEOUT)
+            except FutureTimeoutError:
+                # Panggilan pertama macet: jangan ikut menunggu selamanya, panggil backend sendiri
+                logging.warning("LLM cache follower timed out after %.0fs for %s; calling directly", FOLLOWER_TIMEOUT, operation)
+                value = compute()
+                if value:
+                    self._store(key, operation, value, ttl)
+                return value
+
+        self.misses += 1
+        try:
+            value = compute()
+            if value:
+                self._store(key, operation, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def lookup(self, key: str) -> Optional[Any]:
+        """Baca langsung tanpa single-flight (dipakai jalur streaming)."""
+        if Config.llm_cache_ttl() <= 0:
+            return None
+        value = self._load(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def store(self, key: str, operation: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = Config.llm_cache_ttl() if ttl is None else ttl
+        if ttl > 0 and value:
+            self._store(key, operation, value, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            with self._session() as session:
+                entries = session.scalar(select(func.count()).select_from(LLMCacheEntry))
+        except Exception:
+            entries = None
+        return {
+            "entries": entries,
+            "max_entries": Config.llm_cache_max_entries(),
+            "ttl": Config.llm_cache_ttl(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "stores": self.stores,
+            "errors": self.errors,
+        }
+
+llm_cache = LLMCache()
@@ -0,0 +1,297 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from ..config import Config
+
+# Batas waktu baca default per operasi (detik); bisa ditimpa LLM_TIMEOUT_<OPERASI>
+DEFAULT_TIMEOUTS = {
+    "prefill_case": 10.0,
+    "prefill_person": 10.0,
+    "suggest_decision": 20.0,
+    "ocr": 120.0,
+}
+CONNECT_TIMEOUT = 3.0
+
+# Status yang layak dicoba ulang: backend sibuk/restart, bukan request yang salah
+RETRYABLE_STATUS = {429, 502, 503, 504}
+
+class LLMError(Exception):
+    pass
+
+class LLMUnavailable(LLMError):
+    """Circuit breaker terbuka: backend dianggap mati, request langsung ditolak."""
+
+class CircuitBreaker:
+    """closed -> open setelah `failure_threshold` kegagalan beruntun; setelah `reset_timeout`
+    satu request percobaan (half-open) boleh lewat, sukses menutup lagi."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half-open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+class _OperationStats:
+    """Counter per operasi. Diperbarui dari banyak thread (request, pool batch/OCR), jadi selalu lewat lock."""
+
+    __slots__ = ("_lock", "calls", "errors", "retries", "rejected", "latency_total", "latency_max", "last_error")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.rejected = 0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_error: Optional[str] = None
+
+    def add(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def record_error(self, error: str) -> None:
+        with self._lock:
+            self.errors += 1
+            self.last_error = error
+
+    def record_latency(self, elapsed: float) -> None:
+        with self._lock:
+            self.latency_total += elapsed
+            self.latency_max = max(self.latency_max, elapsed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            ok = self.calls - self.errors
+            return {
+                "calls": self.calls,
+                "errors": self.errors,
+                "retries": self.retries,
+                "rejected": self.rejected,
+                "latency_avg_ms": round(self.latency_total / ok * 1000, 1) if ok else None,
+                "latency_max_ms": round(self.latency_max * 1000, 1),
+                "last_error": self.last_error,
+            }
+
+class LLMClient:
+    """Klien HTTP bersama untuk backend LLM (OpenAI-compatible): keep-alive pool,
+    timeout per operasi, retry terbatas dengan jitter, circuit breaker dan metrik."""
+
+    def __init__(self, url: str, pool_size: int, max_retries: int, backoff: float, breaker: CircuitBreaker):
+        self.url = url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.breaker = breaker
+        self.session = requests.Session()
+        # Retry ditangani sendiri (perlu jitter + circuit breaker), adapter tidak ikut retry
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats: Dict[str, _OperationStats] = {}
+        self._stats_lock = threading.Lock()
+
+    def _op_stats(self, operation: str) -> _OperationStats:
+        with self._stats_lock:
+            stats = self._stats.get(operation)
+            if stats is None:
+                stats = self._stats[operation] = _OperationStats()
+            return stats
+
+    def _sleep_before_retry(self, attempt: int) -> None:
+        # Full jitter: acak 0..backoff*2^attempt supaya retry dari banyak worker tidak serempak
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def _send(
+        self,
+        stats: _OperationStats,
+        payload: Dict[str, Any],
+        read_timeout: float,
+        stream: bool = False,
+        max_retries: Optional[int] = None,
+    ) -> requests.Response:
+        """POST dengan retry (max_retries, default LLM_MAX_RETRIES); kembalikan respons 200, selain itu LLMError.
+
+        Hasil setiap jalan keluar dicatat ke circuit breaker di `finally`, termasuk exception
+        yang tidak terduga, jadi probe half-open tidak pernah tertahan.
+        """
+        backend_up = False
+        error: Optional[str] = None
+        try:
+            retries = self.max_retries if max_retries is None else max_retries
+            for attempt in range(retries + 1):
+                if attempt:
+                    stats.add("retries")
+                    self._sleep_before_retry(attempt - 1)
+                try:
+                    response = self.session.post(
+                        self.url, json=payload, timeout=(CONNECT_TIMEOUT, read_timeout), stream=stream
+                    )
+                    if response.status_code in RETRYABLE_STATUS or response.status_code >= 500:
+                        error = f"HTTP {response.status_code}: {response.text[:200]}"
+                        response.close()
+                        continue
+                except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exc:
+                    error = f"{type(exc).__name__}: {exc}"
+                    continue
+                except requests.RequestException as exc:
+                    # URL salah, redirect berulang, payload tidak bisa di-encode: retry tidak menolong
+                    error = f"{type(exc).__name__}: {exc}"
+                    break
+                backend_up = True
+                if response.status_code != 200:
+                    # Request ditolak (4xx): backend hidup, jangan buka circuit breaker
+                    message = f"HTTP {response.status_code}: {response.text[:200]}"
+                    response.close()
+                    return self._fail(stats, message)
+                return response
+            return self._fail(stats, error or "LLM request failed")
+        finally:
+            if backend_up:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def post(
+        self, operation: str, payload: Dict[str, Any], timeout: Optional[float] = None, max_retries: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Kirim payload chat completion, kembalikan JSON respons. Gagal -> LLMError.
+        `max_retries` menimpa LLM_MAX_RETRIES untuk pemanggil yang mengatur retry sendiri."""
+        stats = self._op_stats(operation)
+        if not self.breaker.allow():
+            stats.add("rejected")
+            raise LLMUnavailable("Layanan AI sedang tidak tersedia (circuit breaker terbuka)")
+
+        read_timeout = timeout if timeout is not None else Config.llm_timeout(operation, DEFAULT_TIMEOUTS.get(operation, 30.0))
+        stats.add("calls")
+        start = time.monotonic()
+        response = self._send(stats, payload, read_timeout, max_retries=max_retries)
+        try:
+            data = response.json()
+        except ValueError:
+            return self._fail(stats, "Respons LLM bukan JSON")
+        elapsed = time.monotonic() - start
+        stats.record_latency(elapsed)
+        return data
+
+    def _fail(self, stats: _OperationStats, error: str):
+        stats.record_error(error)
+        raise LLMError(error)
+
+    def chat(
+        self, operation: str, payload: Dict[str, Any], timeout: Optional[float] = None, max_retries: Optional[int] = None
+    ) -> str:
+        """Seperti post(), tapi langsung mengembalikan isi pesan pertama."""
+        data = self.post(operation, payload, timeout=timeout, max_retries=max_retries)
+        try:
+            return data["choices"][0]["message"]["content"] or ""
+        except (KeyError, IndexError, TypeError):
+            logging.warning("LLM response tanpa choices: %s", str(data)[:500])
+            raise LLMError("Format respons LLM tidak dikenal")
+
+    def stream_chat(self, operation: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> Iterator[str]:
+        """Chat completion dengan `stream: true`; kembalikan iterator potongan teks (delta).
+
+        Koneksi dibuka (dengan retry) sebelum fungsi ini kembali, jadi backend mati/breaker
+        terbuka langsung jadi LLMError di pemanggil. Setelah token pertama tidak ada retry.
+        Timeout baca berlaku per potongan, bukan untuk seluruh generasi.
+        """
+        stats = self._op_stats(operation)
+        if not self.breaker.allow():
+            stats.add("rejected")
+            raise LLMUnavailable("Layanan AI sedang tidak tersedia (circuit breaker terbuka)")
+
+        read_timeout = timeout if timeout is not None else Config.llm_timeout(operation, DEFAULT_TIMEOUTS.get(operation, 30.0))
+        stats.add("calls")
+        start = time.monotonic()
+        response = self._send(stats, {**payload, "stream": True}, read_timeout, stream=True)
+        return self._iter_stream(response, stats, start)
+
+    def _iter_stream(self, response: requests.Response, stats: _OperationStats, start: float) -> Iterator[str]:
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    choice = json.loads(data)["choices"][0]
+                except (ValueError, KeyError, IndexError, TypeError):
+                    logging.warning("LLM stream chunk tidak dikenal: %s", data[:200])
+                    continue
+                # Chunk OpenAI berisi delta; sebagian backend (kobold lama) mengirim message utuh
+                delta = (choice.get("delta") or choice.get("message") or {}).get("content")
+                if delta:
+                    yield delta
+        except requests.RequestException as exc:
+            # Putus di tengah generasi (timeout antar-chunk, koneksi reset, chunk rusak)
+            self._fail(stats, f"{type(exc).__name__}: {exc}")
+        finally:
+            response.close()
+        elapsed = time.monotonic() - start
+        stats.record_latency(elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            operations = {name: s.as_dict() for name, s in self._stats.items()}
+        return {"circuit": self.breaker.state, "operations": operations}
+
+_client_lock = threading.Lock()
+_client: Optional[LLMClient] = None
+
+def get_llm_client() -> LLMClient:
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = LLMClient(
+                    Config.llm_url(),
+                    pool_size=Config.env_int("LLM_POOL_SIZE", 10),
+                    max_retries=Config.env_int("LLM_MAX_RETRIES", 2),
+                    backoff=Config.env_float("LLM_RETRY_BACKOFF", 0.5),
+                    breaker=CircuitBreaker(
+                        failure_threshold=Config.env_int("LLM_BREAKER_THRESHOLD", 5),
+                        reset_timeout=Config.env_float("LLM_BREAKER_RESET", 30.0),
+                    ),
+                )
+    return _client
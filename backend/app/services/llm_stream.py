@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Callable, Iterator
+
+from .ai_prefill import extract_json
+from .llm_cache import llm_cache
+from .llm_client import LLMError
+
+STREAM_ERROR = "Layanan AI terputus saat menghasilkan jawaban. Coba lagi."
+
+_decoder = json.JSONDecoder()
+
+
+class JsonFieldParser:
+    """Parse objek JSON top-level secara bertahap: setiap pasangan key/value yang sudah
+    lengkap dikeluarkan segera, tanpa menunggu `}` penutup. Teks sebelum `{` pertama
+    (mis. ```json dari model) diabaikan."""
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos: int | None = None  # posisi setelah pasangan terakhir yang sudah diparse
+        self.done = False
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.buffer += chunk
+        if self._pos is None:
+            start = self.buffer.find("{")
+            if start == -1:
+                return []
+            self._pos = start + 1
+
+        fields: list[tuple[str, Any]] = []
+        while not self.done:
+            pair = self._next_pair()
+            if pair is None:
+                break
+            fields.append(pair)
+        return fields
+
+    def _skip(self, pos: int, chars: str = " \t\r\n") -> int:
+        while pos < len(self.buffer) and self.buffer[pos] in chars:
+            pos += 1
+        return pos
+
+    def _next_pair(self) -> tuple[str, Any] | None:
+        buf = self.buffer
+        pos = self._skip(self._pos, " \t\r\n,")
+        if pos >= len(buf):
+            return None
+        if buf[pos] == "}":
+            self.done = True
+            return None
+        try:
+            key, pos = _decoder.raw_decode(buf, pos)
+            pos = self._skip(pos)
+            if pos >= len(buf) or buf[pos] != ":":
+                return None
+            value, end = _decoder.raw_decode(buf, self._skip(pos + 1))
+        except json.JSONDecodeError:
+            return None
+        # Angka/literal bisa terpotong ("12" dari "1234"); tunggu sampai ada pemisah sesudahnya
+        after = self._skip(end)
+        if after >= len(buf):
+            return None
+        self._pos = end
+        return str(key), value
+
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def stream_fields(
+    operation: str,
+    tokens: Iterator[str] | None,
+    build: Callable[[dict], dict],
+    echo: dict,
+    cache_key: str | None = None,
+    cached: dict | None = None,
+    initial: dict | None = None,
+    describe: Callable[[dict], dict] | None = None,
+) -> Iterator[str]:
+    """Event SSE untuk satu prefill:
+    - `field` {"name", "value"} setiap field selesai diparse (sudah melalui `build`)
+    - `done` dengan body sama persis seperti respons non-streaming
+    - `error` kalau stream putus; field yang sudah terkirim tetap berlaku
+
+    `initial`: field yang sudah pasti tanpa LLM (dikirim duluan, menang atas hasil LLM).
+    `describe(result)`: key tambahan untuk body `done`.
+    """
+    initial = initial or {}
+
+    def done_event(llm_result: dict) -> str:
+        merged = {**llm_result, **initial}
+        body = {**echo, "data": build(merged)}
+        if describe is not None:
+            body.update(describe(llm_result))
+        return sse_event("done", body)
+
+    if cached is not None:
+        for name, value in build({**cached, **initial}).items():
+            yield sse_event("field", {"name": name, "value": value})
+        yield done_event(cached)
+        return
+
+    parser = JsonFieldParser()
+    result: dict = {}
+    empty = build({})
+
+    def field_events(name: str, value: Any) -> Iterator[str]:
+        # Satu field LLM bisa jadi field respons dengan nama lain (mis. nama master -> *_id)
+        for out_name, out_value in build({name: value}).items():
+            if out_value != empty[out_name]:
+                yield sse_event("field", {"name": out_name, "value": out_value})
+
+    for name, value in initial.items():
+        yield from field_events(name, value)
+
+    try:
+        for delta in tokens or ():
+            for name, value in parser.feed(delta):
+                result[name] = value
+                if name not in initial:
+                    yield from field_events(name, value)
+    except LLMError as exc:
+        logging.warning("LLM stream %s terputus: %s", operation, exc)
+        yield sse_event("error", {"error": STREAM_ERROR, "detail": str(exc)})
+        return
+
+    if not parser.done:
+        # Model tidak menutup objek dengan rapi; coba parse ulang seluruh teks seperti jalur biasa
+        parsed = extract_json(parser.buffer) if parser.buffer else {}
+        if isinstance(parsed, dict):
+            for name, value in parsed.items():
+                if name not in result and name not in initial:
+                    yield from field_events(name, value)
+            result = {**parsed, **result}
+
+    if not result:
+        # Sama dengan 503 di jalur non-streaming: tidak ada satu field pun yang terbaca
+        yield sse_event("error", {"error": STREAM_ERROR, "detail": "Respons LLM bukan JSON"})
+        return
+    if cache_key and parser.done:
+        # Hanya objek yang ditutup lengkap yang di-cache; stream terpotong tidak
+        llm_cache.store(cache_key, operation, result)
+    yield done_event(result)
@@ -0,0 +1,95 @@
+import threading
+from typing import Dict, List, Optional
+
+from flask import g, has_app_context
+from sqlalchemy import select, update
+
+from ..extensions import db
+from ..models import (
+    DivisiCase,
+    JenisCase,
+    JenisKaryawanTerlapor,
+    MasterVersion,
+    StatusPengajuan,
+    StatusProses,
+)
+from .master_resolver import MasterResolver
+
+MASTER_MODELS = {
+    "jenis-case": JenisCase,
+    "jenis-karyawan-terlapor": JenisKaryawanTerlapor,
+    "status-proses": StatusProses,
+    "status-pengajuan": StatusPengajuan,
+    "divisi-case": DivisiCase,
+}
+
+MASTER_VERSION_ID = 1
+
+class MasterSnapshot:
+    """Salinan read-only semua master data pada satu versi."""
+
+    def __init__(self, version: int, rows: Dict[str, List[dict]]):
+        self.version = version
+        self.rows = rows
+        self.names_by_id = {kind: {r["id"]: r["name"] for r in items} for kind, items in rows.items()}
+        self.ids_by_name = {kind: {r["name"].casefold(): r["id"] for r in items} for kind, items in rows.items()}
+        # Daftar "id=name; ..." untuk prompt LLM, dirender sekali per versi
+        self.hints = {kind: "; ".join(f"{r['id']}={r['name']}" for r in items) for kind, items in rows.items()}
+        self.resolver = MasterResolver(rows)
+
+    def id_for(self, kind: str, name: str) -> Optional[int]:
+        return self.ids_by_name[kind].get((name or "").strip().casefold())
+
+    def name_for(self, kind: str, item_id: Optional[int]) -> Optional[str]:
+        return self.names_by_id[kind].get(item_id)
+
+_lock = threading.Lock()
+_snapshot: Optional[MasterSnapshot] = None
+
+def current_master_version(session=None) -> int:
+    session = session or db.session
+    return session.scalar(select(MasterVersion.version).where(MasterVersion.id == MASTER_VERSION_ID)) or 0
+
+def bump_master_version(session=None) -> None:
+    """Naikkan versi master dalam transaksi yang sama dengan perubahan master."""
+    session = session or db.session
+    result = session.execute(
+        update(MasterVersion)
+        .where(MasterVersion.id == MASTER_VERSION_ID)
+        .values(version=MasterVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        session.add(MasterVersion(id=MASTER_VERSION_ID, version=1))
+    if has_app_context():
+        g.pop("master_snapshot", None)
+
+def _load_snapshot(session, version: int) -> MasterSnapshot:
+    rows = {}
+    for kind, model in MASTER_MODELS.items():
+        items = session.query(model.id, model.name).order_by(model.id.asc()).all()
+        rows[kind] = [{"id": r.id, "name": r.name} for r in items]
+    return MasterSnapshot(version, rows)
+
+def get_master_snapshot() -> MasterSnapshot:
+    """Snapshot master yang koheren antar-proses.
+
+    Setiap request cukup membaca satu baris m_master_version; tabel master hanya
+    dimuat ulang kalau versinya berubah (oleh create/update/delete master di
+    worker mana pun).
+    """
+    global _snapshot
+    if has_app_context() and "master_snapshot" in g:
+        return g.master_snapshot
+
+    version = current_master_version()
+    snapshot = _snapshot
+    if snapshot is None or snapshot.version != version:
+        with _lock:
+            snapshot = _snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = _load_snapshot(db.session, version)
+                _snapshot = snapshot
+
+    if has_app_context():
+        g.master_snapshot = snapshot
+    return snapshot
@@ -0,0 +1,177 @@
+import difflib
+import re
+import unicodedata
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from ..config import Config
+
+# Sebutan umum di teks laporan -> nama master. Alias yang namanya tidak ada di master diabaikan.
+MASTER_ALIASES: Dict[str, Dict[str, str]] = {
+    "divisi-case": {
+        "operasional": "OPS",
+        "operation": "OPS",
+        "operations": "OPS",
+        "finance": "FAD",
+        "keuangan": "FAD",
+        "finance accounting": "FAD",
+        "human capital": "HC&CA",
+        "hrd": "HC&CA",
+        "sdm": "HC&CA",
+        "internal audit": "IA",
+        "audit internal": "IA",
+        "direksi": "BOD",
+        "board of director": "BOD",
+        "board of directors": "BOD",
+        "armada": "Fleet",
+    },
+    "jenis-case": {
+        "kontainer berlubang": "Container Berlubang",
+        "container bocor": "Container Berlubang",
+        "kontainer bocor": "Container Berlubang",
+        "salah pintu": "Salah Door",
+        "wrong door": "Salah Door",
+        "supir terlambat": "Driver Terlambat",
+        "sopir terlambat": "Driver Terlambat",
+        "keterlambatan driver": "Driver Terlambat",
+        "supir ijin pulang": "Driver Ijin Pulang",
+        "sopir izin pulang": "Driver Ijin Pulang",
+        "driver izin pulang": "Driver Ijin Pulang",
+        "inventaris hilang": "Kehilangan Inventaris",
+        "salah input data": "Kesalahan Input Data - Document",
+        "kesalahan input data": "Kesalahan Input Data - Document",
+        "kesalahan input dokumen": "Kesalahan Input Data - Document",
+        "salah kirim dokumen": "Kesalahan Pengiriman Document / Barang",
+        "salah kirim barang": "Kesalahan Pengiriman Document / Barang",
+        "kesalahan pengiriman": "Kesalahan Pengiriman Document / Barang",
+        "pembatalan tiket": "Pembatalan Tiket dan Hotel",
+        "pembatalan hotel": "Pembatalan Tiket dan Hotel",
+        "invoice outstanding": "Outstanding Invoice",
+        "tagihan tidak tertagih": "Tidak Tertagih ke Customer",
+        "vendor melarikan diri": "Vendor Kabur",
+        "bencana alam": "Force Majeure",
+    },
+    "status-proses": {
+        "paier": "Proses PAIER",
+        "atasan": "Atasan (Terlapor)",
+        "atasan terlapor": "Atasan (Terlapor)",
+        "senior manager": "Atasan (Terlapor) Senior Manager ke atas",
+        "gm hc&ca": "Approval GM HC&CA",
+        "gm hcca": "Approval GM HC&CA",
+        "gm fad": "Approval GM FAD",
+    },
+    "status-pengajuan": {
+        "buka": "Open",
+        "terbuka": "Open",
+        "baru": "Open",
+        "proses": "Ongoing",
+        "diproses": "Ongoing",
+        "sedang diproses": "Ongoing",
+        "on going": "Ongoing",
+        "berjalan": "Ongoing",
+        "close": "Closed",
+        "tutup": "Closed",
+        "ditutup": "Closed",
+        "selesai": "Closed",
+    },
+    "jenis-karyawan-terlapor": {
+        "outsourcing": "Outsource",
+        "os": "Outsource",
+        "tetap": "Regular",
+        "karyawan tetap": "Regular",
+        "reguler": "Regular",
+        "permanen": "Regular",
+        "supir kemitraan": "Driver Kemitraan",
+        "sopir kemitraan": "Driver Kemitraan",
+        "abk": "Crew Kapal",
+        "anak buah kapal": "Crew Kapal",
+        "harian lepas": "Freelance",
+    },
+}
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+def normalize_name(value: Any) -> str:
+    """'  HC&CA ' -> 'hc ca', 'Resign ( OS )' -> 'resign os', 'Kerusakan APD.' -> 'kerusakan apd'."""
+    text = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode("ascii")
+    return _NON_ALNUM.sub(" ", text.casefold()).strip()
+
+class MasterMatch(NamedTuple):
+    id: int
+    name: str
+    method: str  # id | exact | alias | prefix | fuzzy
+    score: float
+
+class MasterResolver:
+    """Petakan nama bebas dari LLM ke ID master: ID langsung, nama ternormalisasi,
+    alias, awalan nama master, lalu fuzzy (difflib) dengan ambang MASTER_MATCH_THRESHOLD."""
+
+    def __init__(self, rows: Dict[str, List[dict]], aliases: Optional[Dict[str, Dict[str, str]]] = None):
+        aliases = MASTER_ALIASES if aliases is None else aliases
+        self._by_id: Dict[str, Dict[int, str]] = {}
+        self._exact: Dict[str, Dict[str, int]] = {}
+        self._alias: Dict[str, Dict[str, int]] = {}
+        for kind, items in rows.items():
+            self._by_id[kind] = {r["id"]: r["name"] for r in items}
+            exact = self._exact[kind] = {}
+            for r in items:
+                exact.setdefault(normalize_name(r["name"]), r["id"])
+            alias_map = self._alias[kind] = {}
+            for alias, target in aliases.get(kind, {}).items():
+                target_id = exact.get(normalize_name(target))
+                if target_id is not None:
+                    alias_map[normalize_name(alias)] = target_id
+
+    def resolve(self, kind: str, value: Any, threshold: Optional[float] = None) -> Optional[MasterMatch]:
+        if value is None or kind not in self._exact:
+            return None
+        names = self._by_id[kind]
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+            item_id = int(value)
+            return MasterMatch(item_id, names[item_id], "id", 1.0) if item_id in names else None
+
+        key = normalize_name(value)
+        if not key:
+            return None
+        item_id = self._exact[kind].get(key)
+        if item_id is not None:
+            return MasterMatch(item_id, names[item_id], "exact", 1.0)
+        item_id = self._alias[kind].get(key)
+        if item_id is not None:
+            return MasterMatch(item_id, names[item_id], "alias", 1.0)
+
+        candidates = {**self._exact[kind], **self._alias[kind]}
+        # "salah muat barang" -> "Salah Muat": nama master terpanjang yang jadi awalan teks
+        prefixes = [name for name in candidates if key.startswith(name + " ")]
+        if prefixes:
+            best_prefix = max(prefixes, key=len)
+            item_id = candidates[best_prefix]
+            return MasterMatch(item_id, names[item_id], "prefix", round(len(best_prefix) / len(key), 3))
+
+        threshold = Config.master_match_threshold() if threshold is None else threshold
+        # get_close_matches memangkas kandidat dengan quick_ratio sebelum ratio penuh
+        best = difflib.get_close_matches(key, candidates.keys(), n=1, cutoff=threshold)
+        if not best:
+            return None
+        item_id = candidates[best[0]]
+        score = difflib.SequenceMatcher(None, key, best[0]).ratio()
+        return MasterMatch(item_id, names[item_id], "fuzzy", round(score, 3))
+
+    def find_in_text(self, kind: str, text: str, min_words: int = 2) -> Optional[MasterMatch]:
+        """Nama/alias master (minimal `min_words` kata) yang muncul utuh di teks bebas.
+        Kalau yang muncul menunjuk ke lebih dari satu ID, hasilnya ambigu -> None."""
+        if kind not in self._exact:
+            return None
+        haystack = f" {normalize_name(text)} "
+        found = {}
+        for source, table in (("exact", self._exact[kind]), ("alias", self._alias[kind])):
+            for name, item_id in table.items():
+                if len(name.split()) >= min_words and f" {name} " in haystack:
+                    found.setdefault(item_id, (len(name), source))
+        if len(found) != 1:
+            return None
+        item_id, (_, source) = found.popitem()
+        return MasterMatch(item_id, self._by_id[kind][item_id], source, 1.0)
+
+    def resolve_id(self, kind: str, value: Any) -> Optional[int]:
+        match = self.resolve(kind, value)
+        return match.id if match else None
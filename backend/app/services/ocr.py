@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Iterator
+
+from pypdf import PdfReader
+
+from ..config import Config
+from .image_prep import ImagePreprocessor
+from .llm_cache import llm_cache
+from .llm_client import LLMError, get_llm_client
+
+
+# (gambar base64, mimetype)
+ImagePayload = tuple[str, str]
+
+# Halaman PDF dirasterisasi per potongan ini, jadi file JPEG di disk dibaca satu per satu
+RASTER_CHUNK_PAGES = 4
+
+
+def _ocr_with_llm_multi(image_payloads: list[ImagePayload]) -> str | None:
+    """Teks hasil OCR, atau None kalau panggilan LLM gagal."""
+    if not image_payloads:
+        return ""
+
+    prompt = (
+        "Perform Optical Character Recognition (OCR) on ALL images provided. "
+        "Extract all visible text, ensuring accuracy and maintaining the original reading order (left-to-right, top-to-bottom) per image. "
+        "Gabungkan hasil semua gambar secara berurutan. "
+        "Ignore any non-textual elements or graphics. "
+        "Provide ONLY the extracted text, without any introductory phrases, explanations, or additional commentary."
+    )
+
+    content_blocks = [{"type": "text", "text": prompt}]
+    for base64_image, mime in image_payloads:
+        content_blocks.append({
+            "type": "image_url",
+            "image_url": {"url": f"data:{mime};base64,{base64_image}"}
+        })
+
+    payload = {
+        "messages": [{
+            "role": "user",
+            "content": content_blocks
+        }],
+        "mode": "instruct",
+        "temperature": 0,
+    }
+
+    try:
+        # Satu-satunya lapis retry untuk batch OCR: OCR_BATCH_RETRIES menggantikan LLM_MAX_RETRIES
+        return get_llm_client().chat("ocr", payload, max_retries=Config.ocr_batch_retries())
+    except LLMError as exc:
+        logging.info("Kobold LLM OCR request failed: %s", exc)
+        return None
+
+
+class _OcrBatches:
+    """Batch OCR_BATCH_PAGES gambar dikirim begitu terkumpul, paralel maks OCR_CONCURRENCY,
+    sementara halaman berikutnya masih dirasterisasi. Hasil digabung sesuai urutan masuk.
+
+    `submit` menunggu sampai ada worker bebas, jadi paling banyak OCR_CONCURRENCY batch
+    (gambar base64) tertahan di memori berapa pun jumlah halamannya.
+    """
+
+    def __init__(self, pool: ThreadPoolExecutor, batch_size: int, concurrency: int):
+        self.pool = pool
+        self.batch_size = batch_size
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self.failed = threading.Event()
+        self._batch: list[ImagePayload] = []
+        # Teks text layer (str) dan batch OCR (Future) sesuai urutan dokumen
+        self._parts: list[str | Future] = []
+
+    def _run(self, images: list[ImagePayload]) -> str | None:
+        try:
+            text = _ocr_with_llm_multi(images)
+            if text is None:
+                # Satu batch gagal total: halaman berikutnya tidak perlu dirasterisasi/dikirim
+                self.failed.set()
+            return text
+        finally:
+            self._slots.release()
+
+    def flush(self) -> None:
+        if not self._batch or self.failed.is_set():
+            return
+        self._slots.acquire()
+        self._parts.append(self.pool.submit(self._run, self._batch))
+        self._batch = []
+
+    def add_image(self, payload: ImagePayload) -> None:
+        self._batch.append(payload)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def add_text(self, text: str) -> None:
+        self.flush()
+        self._parts.append(text)
+
+    def result(self) -> str | None:
+        """Teks gabungan, atau None kalau ada batch yang gagal."""
+        self.flush()
+        texts: list[str] = []
+        for part in self._parts:
+            text = part if isinstance(part, str) else part.result()
+            if text is None:
+                for pending in self._parts:
+                    if isinstance(pending, Future):
+                        pending.cancel()
+                return None
+            texts.append(text)
+        return "\n\n".join(t for t in texts if t)
+
+
+# (isi file, nama file lowercase, mimetype lowercase)
+Upload = tuple[bytes, str, str]
+
+
+def read_uploads(file_list) -> list[Upload]:
+    return [
+        (file_storage.read(), (file_storage.filename or "").lower(), (file_storage.mimetype or "").lower())
+        for file_storage in file_list
+    ]
+
+
+def extract_text(uploads: list[Upload]) -> str:
+    # Key dari isi file (bukan nama): upload ulang scan yang sama langsung kena cache
+    digests = [hashlib.sha256(raw_bytes).hexdigest() for raw_bytes, _, _ in uploads]
+    key = llm_cache.make_key("ocr", digests, Config.llm_url())
+    return llm_cache.get_or_compute("ocr", key, lambda: _extract_text(uploads))
+
+
+def llm_extract_text(file_list) -> str:
+    return extract_text(read_uploads(file_list))
+
+
+def _pdf_text_layer(reader: PdfReader) -> str | None:
+    """Teks dari text layer kalau setiap halaman cukup berisi (PDF digital, bukan hasil scan)."""
+    min_chars = Config.ocr_text_layer_min_chars()
+    if min_chars <= 0 or not reader.pages:
+        return None
+    pages = []
+    for page in reader.pages:
+        text = (page.extract_text() or "").strip()
+        if len(text) < min_chars:
+            return None
+        pages.append(text)
+    return "\n\n".join(pages)
+
+
+def _pdf_page_count(raw_bytes: bytes) -> int | None:
+    """Jumlah halaman menurut poppler (pdfinfo), untuk PDF yang tidak bisa dibaca pypdf."""
+    from pdf2image import pdfinfo_from_bytes
+
+    try:
+        return int(pdfinfo_from_bytes(raw_bytes)["Pages"])
+    except Exception as exc:
+        logging.warning("Failed to read PDF page count: %s", exc)
+        return None
+
+
+def _rasterize_pdf(raw_bytes: bytes, page_count: int | None) -> Iterator[bytes]:
+    """JPEG per halaman. pdftoppm menulis ke folder sementara; tidak ada PIL image di memori.
+    page_count None: semua halaman dirasterisasi sekaligus (tanpa rentang halaman)."""
+    from pdf2image import convert_from_bytes
+
+    if page_count is None:
+        ranges = [(None, None)]
+    else:
+        ranges = [
+            (first, min(first + RASTER_CHUNK_PAGES - 1, page_count))
+            for first in range(1, page_count + 1, RASTER_CHUNK_PAGES)
+        ]
+    with tempfile.TemporaryDirectory(prefix="ocr-") as tmp:
+        for first_page, last_page in ranges:
+            paths = convert_from_bytes(
+                raw_bytes,
+                dpi=Config.ocr_pdf_dpi(),
+                grayscale=Config.ocr_pdf_grayscale(),
+                thread_count=Config.ocr_pdf_thread_count(),
+                first_page=first_page,
+                last_page=last_page,
+                output_folder=tmp,
+                fmt="jpeg",
+                jpegopt={"quality": Config.ocr_jpeg_quality(), "optimize": True},
+                paths_only=True,
+            )
+            for path in sorted(paths):
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.unlink(path)
+                yield data
+
+
+def _pdf_segments(raw_bytes: bytes) -> Iterator[str | bytes]:
+    """Teks text layer (str), atau JPEG per halaman (bytes) yang dirasterisasi satu per satu."""
+    page_count = None
+    try:
+        reader = PdfReader(BytesIO(raw_bytes))
+        page_count = len(reader.pages)
+        text = _pdf_text_layer(reader)
+    except Exception as exc:
+        # PDF terenkripsi/xref aneh sering tetap bisa dirender poppler: tetap rasterisasi
+        logging.warning("Failed to read PDF text layer, rasterising instead: %s", exc)
+        text = None
+    if text:
+        yield text
+        return
+    if page_count is None:
+        page_count = _pdf_page_count(raw_bytes)
+
+    try:
+        yield from _rasterize_pdf(raw_bytes, page_count)
+    except Exception as exc:
+        logging.warning("Failed to convert PDF to images: %s", exc)
+
+
+def _extract_text(uploads: list[Upload]) -> str:
+    # Urutan file dipertahankan: teks dari text layer dan gambar yang perlu OCR diselang-seling
+    prep = ImagePreprocessor()
+    concurrency = Config.ocr_concurrency()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ocr") as pool:
+        batches = _OcrBatches(pool, Config.ocr_batch_pages(), concurrency)
+
+        def add_image(raw_image: bytes, mime: str, recompress: bool = True) -> None:
+            # Resize/recompress; halaman duplikat (isi piksel sama) dalam upload ini dibuang
+            prepared = prep.prepare(raw_image, mime, recompress)
+            if prepared is not None:
+                data, out_mime = prepared
+                batches.add_image((base64.b64encode(data).decode("utf-8"), out_mime))
+
+        for raw_bytes, filename, mimetype in uploads:
+            if batches.failed.is_set():
+                break
+            is_pdf = filename.endswith(".pdf") or "pdf" in mimetype
+            if not is_pdf:
+                add_image(raw_bytes, mimetype if mimetype else "image/jpeg")
+                continue
+            for part in _pdf_segments(raw_bytes):
+                if batches.failed.is_set():
+                    break
+                if isinstance(part, str):
+                    batches.add_text(part)
+                else:
+                    # pdftoppm sudah menulis JPEG dengan OCR_JPEG_QUALITY; jangan encode dua kali
+                    add_image(part, "image/jpeg", recompress=False)
+
+        text = batches.result()
+
+    if prep.bytes_in:
+        logging.info(
+            "OCR images: %d -> %d bytes, %d duplicate page(s) dropped",
+            prep.bytes_in, prep.bytes_out, prep.duplicates,
+        )
+    # Jangan kembalikan teks sepotong; biarkan pemanggil menganggap OCR gagal
+    return "" if text is None else text
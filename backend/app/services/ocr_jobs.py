@@ -0,0 +1,229 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+
+from ..config import Config
+from ..extensions import db
+from ..models import OcrJob, OcrJobFile
+from .ai_prefill import build_case_suggestion, call_llm
+from .ocr import Upload, extract_text
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+NO_TEXT_ERROR = (
+    "Tidak ada teks terbaca dari berkas yang diunggah. "
+    "Pastikan file jelas dibaca (PDF akan diubah ke gambar sebelum OCR)."
+)
+AI_UNAVAILABLE_ERROR = "Layanan AI sedang tidak tersedia. Coba lagi nanti."
+
+# Pemeliharaan (job macet + job lama) cukup sesekali, bukan setiap polling
+MAINTENANCE_INTERVAL = 60.0
+
+class JobFailed(Exception):
+    def __init__(self, message: str, retryable: bool):
+        super().__init__(message)
+        self.retryable = retryable
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def enqueue_ocr_job(uploads: List[Upload], owner: str) -> OcrJob:
+    job = OcrJob(status=JOB_QUEUED, attempts=0, owner=owner)
+    job.files = [
+        OcrJobFile(position=i, filename=filename or "upload", mimetype=mimetype or "", content=raw_bytes)
+        for i, (raw_bytes, filename, mimetype) in enumerate(uploads)
+    ]
+    db.session.add(job)
+    db.session.commit()
+    return job
+
+def claim_next_job(worker_id: str) -> Optional[int]:
+    """Ambil satu job siap jalan. SKIP LOCKED: worker lain melewati baris yang sedang diklaim."""
+    job = db.session.execute(
+        select(OcrJob)
+        .where(OcrJob.status == JOB_QUEUED, OcrJob.run_after <= func.now())
+        .order_by(OcrJob.run_after.asc(), OcrJob.id.asc())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if job is None:
+        db.session.rollback()
+        return None
+    job.status = JOB_RUNNING
+    job.started_at = job.heartbeat_at = func.now()
+    job.attempts = OcrJob.attempts + 1
+    job.worker = worker_id
+    job_id = job.id
+    db.session.commit()
+    return job_id
+
+def _process(uploads: List[Upload]) -> Tuple[str, Dict[str, Any]]:
+    # Tidak menyentuh objek job: field job baru diisi setelah semua panggilan OCR/LLM selesai
+    text = extract_text(uploads)
+    if text == "":
+        # Berkas memang tidak terbaca: OCR ulang hanya memberi hasil yang sama
+        raise JobFailed(NO_TEXT_ERROR, retryable=False)
+    llm_result = call_llm(text)
+    if not llm_result:
+        raise JobFailed(AI_UNAVAILABLE_ERROR, retryable=True)
+    return text, build_case_suggestion(llm_result)
+
+class _Heartbeat:
+    """Thread yang memperbarui heartbeat_at selama job diproses, lewat koneksi sendiri.
+
+    Deteksi job macet (requeue_stale_jobs) membaca heartbeat ini, jadi OCR multi-batch
+    yang lama tetapi masih hidup tidak diambil worker lain.
+    """
+
+    def __init__(self, job_id: int, interval: float):
+        self.job_id = job_id
+        self.interval = interval
+        self.engine = db.engine
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"ocr-heartbeat-{job_id}", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                with self.engine.begin() as conn:
+                    conn.execute(
+                        update(OcrJob)
+                        .where(OcrJob.id == self.job_id, OcrJob.status == JOB_RUNNING)
+                        .values(heartbeat_at=func.now())
+                    )
+            except Exception:
+                logging.exception("Heartbeat OCR job %s gagal", self.job_id)
+
+    def __enter__(self) -> "_Heartbeat":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+def run_job(job_id: int) -> str:
+    """Jalankan job yang sudah diklaim; kembalikan status akhirnya."""
+    job = db.session.get(OcrJob, job_id)
+    if job is None or job.status != JOB_RUNNING:
+        db.session.rollback()
+        return job.status if job is not None else JOB_FAILED
+
+    uploads: List[Upload] = [(f.content, f.filename.lower(), f.mimetype.lower()) for f in job.files]
+    # Jangan tahan transaksi terbuka selama OCR/LLM yang bisa puluhan detik
+    db.session.commit()
+
+    try:
+        with _Heartbeat(job_id, Config.ocr_job_heartbeat_interval()):
+            text, suggestion = _process(uploads)
+    except Exception as exc:
+        retryable = getattr(exc, "retryable", True)
+        message = str(exc) or type(exc).__name__
+        if not isinstance(exc, JobFailed):
+            logging.exception("OCR job %s gagal", job_id)
+        if retryable and job.attempts < Config.ocr_job_max_attempts():
+            # Backoff linear: OCR_JOB_RETRY_DELAY x jumlah percobaan
+            job.status = JOB_QUEUED
+            job.run_after = func.now() + timedelta(seconds=Config.ocr_job_retry_delay() * job.attempts)
+            job.worker = None
+        else:
+            job.status = JOB_FAILED
+            job.finished_at = func.now()
+            job.files = []
+        job.error = message
+        db.session.commit()
+        return job.status
+
+    job.status = JOB_DONE
+    job.text = text
+    job.result = json.dumps(suggestion, ensure_ascii=False, default=str)
+    job.error = None
+    job.finished_at = func.now()
+    # File upload tidak dibutuhkan lagi; hasil sudah tersimpan di job
+    job.files = []
+    db.session.commit()
+    return job.status
+
+def requeue_stale_jobs() -> int:
+    """Job 'running' yang worker-nya mati (tanpa heartbeat melewati OCR_JOB_STALE_AFTER)
+    dikembalikan ke antrian."""
+    stale_before = func.now() - timedelta(seconds=Config.ocr_job_stale_after())
+    # Job dari sebelum kolom heartbeat ada: pakai started_at
+    last_seen = func.coalesce(OcrJob.heartbeat_at, OcrJob.started_at)
+    running_stale = (OcrJob.status == JOB_RUNNING, last_seen < stale_before)
+    failed = db.session.execute(
+        update(OcrJob)
+        .where(*running_stale, OcrJob.attempts >= Config.ocr_job_max_attempts())
+        .values(status=JOB_FAILED, finished_at=func.now(), error="Worker berhenti saat memproses job")
+    ).rowcount or 0
+    requeued = db.session.execute(
+        update(OcrJob)
+        .where(*running_stale)
+        .values(status=JOB_QUEUED, run_after=func.now(), worker=None)
+    ).rowcount or 0
+    db.session.commit()
+    return failed + requeued
+
+def purge_finished_jobs() -> int:
+    cutoff = func.now() - timedelta(days=Config.ocr_job_retention_days())
+    removed = db.session.execute(
+        delete(OcrJob).where(OcrJob.status.in_((JOB_DONE, JOB_FAILED)), OcrJob.finished_at < cutoff)
+    ).rowcount or 0
+    db.session.commit()
+    return removed
+
+def run_worker(worker_id: str, poll_interval: float, once: bool = False) -> int:
+    """Loop worker: ambil job, proses, ulangi. once=True berhenti saat antrian kosong."""
+    processed = 0
+    last_maintenance = 0.0
+    while True:
+        if time.monotonic() - last_maintenance >= MAINTENANCE_INTERVAL:
+            last_maintenance = time.monotonic()
+            try:
+                requeue_stale_jobs()
+                purge_finished_jobs()
+            except Exception:
+                db.session.rollback()
+                logging.exception("Pemeliharaan antrian OCR gagal")
+
+        job_id = claim_next_job(worker_id)
+        if job_id is None:
+            if once:
+                return processed
+            db.session.remove()
+            time.sleep(poll_interval)
+            continue
+
+        status = run_job(job_id)
+        processed += 1
+        logging.info("OCR job %s selesai dengan status %s", job_id, status)
+        db.session.remove()
+
+def find_job(public_id: str, owner: str) -> Optional[OcrJob]:
+    """Job milik `owner`; job orang lain diperlakukan sama dengan job yang tidak ada."""
+    return db.session.execute(
+        select(OcrJob).where(OcrJob.public_id == public_id, OcrJob.owner == owner)
+    ).scalar_one_or_none()
+
+def job_status(job: OcrJob) -> Dict[str, Any]:
+    data: Dict[str, Any] = {
+        "job_id": job.public_id,
+        "status": job.status,
+        "attempts": job.attempts,
+    }
+    if job.status == JOB_DONE:
+        data["text"] = job.text or ""
+        data["data"] = json.loads(job.result) if job.result else {}
+    elif job.error:
+        data["error"] = job.error
+    return data
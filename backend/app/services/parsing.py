@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from datetime import datetime, date
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Any, Optional
+
+DATE_INPUT_FORMATS = (
+    "%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d",
+    "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y",
+    "%m/%d/%Y", "%m-%d-%Y", "%m.%d.%Y",
+    "%Y%m%d", "%d%m%Y",
+)
+
+class ValidationError(Exception):
+    pass
+
+def none_if_empty(v: Any) -> Any:
+    if v is None:
+        return None
+    if isinstance(v, str) and v.strip() == "":
+        return None
+    return v
+
+def _strip_time_component(raw: str) -> str:
+    for sep in ("T", " "):
+        if sep in raw:
+            return raw.split(sep, 1)[0]
+    return raw
+
+def parse_date(v: Any) -> Optional[date]:
+    v = none_if_empty(v)
+    if v is None:
+        return None
+    if isinstance(v, date) and not isinstance(v, datetime):
+        return v
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, str):
+        base = _strip_time_component(v.strip())
+        if not base:
+            return None
+        normalized = base.replace(".", "/")
+        candidates = {normalized, normalized.replace("/", "-")}
+        digits_only = "".join(ch for ch in normalized if ch.isdigit())
+        if len(digits_only) == 8:
+            candidates.add(digits_only)
+        for candidate in list(candidates):
+            for fmt in DATE_INPUT_FORMATS:
+                try:
+                    return datetime.strptime(candidate, fmt).date()
+                except ValueError:
+                    continue
+    raise ValueError(f"Invalid date: {v!r}")
+
+def parse_decimal_money(v: Any, scale: str = "0.01") -> Optional[Decimal]:
+    v = none_if_empty(v)
+    if v is None:
+        return None
+    try:
+        if isinstance(v, Decimal):
+            d = v
+        elif isinstance(v, int):
+            d = Decimal(v)
+        elif isinstance(v, float):
+            d = Decimal(str(v))
+        elif isinstance(v, str):
+            s = v.strip().replace(" ", "")
+            if "," in s:
+                s = s.replace(".", "")
+                s = s.replace(",", ".")
+            else:
+                if "." in s:
+                    parts = s.split(".")
+                    if all(p.isdigit() and len(p) == 3 for p in parts[1:]):
+                        s = s.replace(".", "")
+            d = Decimal(s)
+        else:
+            d = Decimal(str(v))
+        return d.quantize(Decimal(scale), rounding=ROUND_HALF_UP)
+    except (InvalidOperation, ValueError) as e:
+        raise ValueError(f"Invalid money value: {v!r}") from e
+
+def clean_text_value(v: Any) -> Optional[str]:
+    v = none_if_empty(v)
+    if v is None:
+        return None
+    if not isinstance(v, str):
+        v = str(v)
+    v = v.strip()
+    return v or None
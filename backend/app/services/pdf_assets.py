@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Tidak bergantung pada Flask app: modul ini juga dipakai di worker process pool render
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+STYLESHEET_PATH = os.path.join(STATIC_DIR, "css", "ier_form.css")
+
+# Resource yang dilayani dari memori lewat url_fetcher, bukan dibaca dari disk tiap render
+ASSET_SCHEME = "ier-asset"
+ASSETS = {
+    "logo": (os.path.join(STATIC_DIR, "images", "spil.png"), "image/png"),
+}
+LOGO_URI = f"{ASSET_SCHEME}:logo"
+
+@lru_cache(maxsize=None)
+def read_asset(name: str) -> Optional[bytes]:
+    path, _ = ASSETS[name]
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        logging.warning("Asset PDF '%s' tidak ditemukan di %s", name, path)
+        return None
+
+@lru_cache(maxsize=None)
+def read_stylesheet() -> str:
+    with open(STYLESHEET_PATH, encoding="utf-8") as f:
+        return f.read()
+
+class PdfAssets:
+    """Font, stylesheet terparse, url_fetcher dan cache gambar WeasyPrint; dibuat sekali per proses."""
+
+    def __init__(self):
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+        # URLFetcher/URLFetcherResponse: WeasyPrint >= 66 (lihat requirements.txt)
+        from weasyprint.urls import URLFetcher, URLFetcherResponse
+
+        class AssetURLFetcher(URLFetcher):
+            def fetch(self, url, headers=None):
+                if url.startswith(ASSET_SCHEME + ":"):
+                    name = url[len(ASSET_SCHEME) + 1:]
+                    data = read_asset(name) if name in ASSETS else None
+                    if data is None:
+                        raise ValueError(f"Asset tidak dikenal: {url}")
+                    return URLFetcherResponse(url, data, {"Content-Type": ASSETS[name][1]})
+                return super().fetch(url, headers)
+
+        self.font_config = FontConfiguration()
+        self.url_fetcher = AssetURLFetcher()
+        self.stylesheets = [CSS(string=read_stylesheet(), font_config=self.font_config)]
+        # Gambar (logo) didecode sekali lalu dipakai ulang antar dokumen
+        self.image_cache: Dict = {}
+        # Objek WeasyPrint di atas tidak dijamin thread-safe; di worker pool lock ini tidak pernah berebut
+        self._lock = threading.Lock()
+
+    def write_pdf(self, html: str) -> bytes:
+        from weasyprint import HTML
+
+        with self._lock:
+            return HTML(string=html, url_fetcher=self.url_fetcher).write_pdf(
+                stylesheets=self.stylesheets,
+                font_config=self.font_config,
+                cache=self.image_cache,
+            )
+
+_assets_lock = threading.Lock()
+_assets: Optional[PdfAssets] = None
+
+def get_pdf_assets() -> PdfAssets:
+    global _assets
+    if _assets is None:
+        with _assets_lock:
+            if _assets is None:
+                _assets = PdfAssets()
+    return _assets
+
+def write_pdf(html: str) -> bytes:
+    return get_pdf_assets().write_pdf(html)
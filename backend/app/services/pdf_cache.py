@@ -0,0 +1,107 @@
+import os
+import tempfile
+import threading
+from typing import Optional
+
+class PdfCache:
+    """Cache PDF di disk, satu file per key (hash isi dokumen), dibatasi total ukuran.
+
+    Urutan LRU memakai mtime: setiap hit menyentuh file, eviksi membuang yang paling lama
+    tidak disentuh. Penulisan atomik (file sementara + os.replace) sehingga aman dipakai
+    bersama oleh beberapa worker/proses yang menunjuk ke direktori yang sama.
+    """
+
+    SUFFIX = ".pdf"
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        # Key berasal dari hexdigest, jadi aman dipakai langsung sebagai nama file
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # sudah dievict proses lain; isi yang terbaca tetap valid
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if self.max_bytes <= 0 or len(data) > self.max_bytes:
+            return
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        self._evict()
+
+    def _entries(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return entries
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    self.evictions += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            for _, _, path in self._entries():
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+
+    def stats(self) -> dict:
+        entries = self._entries()
+        return {
+            "files": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
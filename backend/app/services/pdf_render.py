@@ -0,0 +1,125 @@
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from ..config import Config
+from .pdf_assets import get_pdf_assets, write_pdf
+
+class RenderQueueFull(Exception):
+    """Antrian render penuh; endpoint membalas 503 + Retry-After."""
+
+class RenderTimeout(Exception):
+    pass
+
+def _warm_up() -> None:
+    # Import WeasyPrint, font dan CSS sekali per worker, bukan di job pertama
+    get_pdf_assets()
+
+def _write_pdf(html: str) -> bytes:
+    return write_pdf(html)
+
+class RenderPool:
+    """Process pool WeasyPrint dengan antrian terbatas.
+
+    Slot = worker + antrian. Kalau semua slot terpakai, submit langsung gagal (RenderQueueFull)
+    sehingga lonjakan download PDF tidak menahan thread web yang melayani endpoint lain.
+    Slot baru dilepas saat job benar-benar selesai, termasuk job yang melewati timeout.
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.submitted = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.failures = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: jangan fork proses web yang multi-thread dan memegang koneksi DB
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_up,
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is broken:
+                self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, html: str) -> Future:
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise RenderQueueFull("Antrian render PDF penuh")
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(_write_pdf, html)
+            except BrokenProcessPool:
+                self._reset_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(_write_pdf, html)
+        except BaseException:
+            self._slots.release()
+            raise
+        self.submitted += 1
+        future.add_done_callback(lambda f: self._on_done(f, executor))
+        return future
+
+    def _on_done(self, future: Future, executor: ProcessPoolExecutor) -> None:
+        self._slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            # Worker mati (OOM/segfault): pool ini dibuang, submit berikutnya membuat yang baru
+            self.failures += 1
+            self._reset_executor(executor)
+
+    def result(self, future: Future, timeout: float) -> bytes:
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            future.cancel()  # hanya berhasil kalau job belum mulai
+            self.timeouts += 1
+            raise RenderTimeout(f"Render PDF melebihi {timeout:g} detik")
+
+    def render(self, html: str, timeout: Optional[float] = None) -> bytes:
+        return self.result(self.submit(html), Config.pdf_render_timeout() if timeout is None else timeout)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "failures": self.failures,
+        }
+
+_pool_lock = threading.Lock()
+_pool: Optional[RenderPool] = None
+
+def get_render_pool() -> Optional[RenderPool]:
+    """None kalau PDF_RENDER_WORKERS=0 (render langsung di thread request, mis. untuk dev)."""
+    global _pool
+    if _pool is None:
+        workers = Config.pdf_render_workers()
+        if workers <= 0:
+            return None
+        with _pool_lock:
+            if _pool is None:
+                _pool = RenderPool(workers, Config.pdf_render_queue_size())
+    return _pool
+
+def render_pdf(html: str) -> bytes:
+    pool = get_render_pool()
+    if pool is None:
+        return _write_pdf(html)
+    return pool.render(html)
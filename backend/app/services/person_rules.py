@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from flask import current_app, g
+
+from ..config import Config
+from .ai_prefill import (
+    MONTHS,
+    PERSON_FIELDS,
+    build_person_suggestion,
+    call_llm_person,
+    preprocessing_ai_date,
+)
+from .master_cache import get_master_snapshot
+from .master_resolver import MasterResolver
+
+# Hasil aturan per field: nilai yang pasti (boleh None = "disebut tapi tanpa nilai").
+# Field yang tidak ada di dict berarti aturan tidak yakin; diserahkan ke LLM.
+RuleFields = dict[str, Any]
+
+_UNITS = {"juta": 1_000_000, "jt": 1_000_000, "ribu": 1_000, "rb": 1_000, "k": 1_000, "miliar": 1_000_000_000, "milyar": 1_000_000_000}
+_AMOUNT = re.compile(
+    r"(?P<rp>\brp\.?\s*)?(?P<num>\d{1,3}(?:\.\d{3})+(?:,\d{1,2})?|\d+(?:[.,]\d+)?)\s*(?P<unit>juta|jt|ribu|rb|k|miliar|milyar)?\b",
+    re.IGNORECASE,
+)
+_PERCENT = re.compile(r"(?P<num>\d{1,3}(?:[.,]\d+)?)\s*(?:%|persen\b)", re.IGNORECASE)
+# Kata yang menandai nominal/persentase beban karyawan (bukan total kerugian)
+_BEBAN_CUE = re.compile(r"\b(beban\w*|dibebankan|ditanggung|tanggungan|potong\w*|pemotongan|ganti\s*rugi|penggantian|mengganti|membayar)\b", re.IGNORECASE)
+_OTHER_CUE = re.compile(r"\b(kerugian|total|nilai\s+kerugian)\b", re.IGNORECASE)
+# Nominal yang disebut adalah angsuran, bukan total beban: hitungannya diserahkan ke LLM
+_INSTALMENT_CUE = re.compile(
+    r"\b(per\s*bulan|tiap\s+bulan|setiap\s+bulan|sebulan|bulanan|cicil\w*|dicicil|angsur\w*|diangsur)\b|/\s*bulan\b",
+    re.IGNORECASE,
+)
+# Nominal sesudah kata ini adalah nilai barang/total ("50% dari Rp 4.000.000", "HP seharga 3 juta"), bukan beban
+_VALUE_OF = re.compile(r"\b(?:dari|senilai|seharga)\s*$", re.IGNORECASE)
+CUE_WINDOW = 40
+
+_MONTH_NAMES = "|".join(sorted(MONTHS, key=len, reverse=True))
+_DATE = re.compile(
+    rf"\b\d{{1,2}}(?:\s+(?:{_MONTH_NAMES})\.?,?\s+|[/-](?:\d{{1,2}}|{_MONTH_NAMES})[/-])\d{{4}}\b|\b\d{{4}}-\d{{2}}-\d{{2}}\b",
+    re.IGNORECASE,
+)
+_APPROVAL = re.compile(r"\b(persetujuan|disetujui|menyetujui|approval|approved?|acc)\b", re.IGNORECASE)
+_APPROVERS = (
+    ("approval_gm_hcca", re.compile(r"\bhc\s*&\s*ca\b|\bhcca\b|\bhc\s+ca\b", re.IGNORECASE)),
+    ("approval_gm_fad", re.compile(r"\bfad\b", re.IGNORECASE)),
+)
+# Penghubung di antara dua approver yang berbagi satu tanggal ("GM HC&CA dan GM FAD tanggal ...")
+_APPROVER_JOIN = re.compile(r"^(?:\s|,|&|/|\bdan\b|\bserta\b|\bgm\b)*$", re.IGNORECASE)
+_CLAUSE_SPLIT = re.compile(r"(?<=[.;!?])\s+|\n+")
+_KARYAWAN_CUE = re.compile(r"\b(?:karyawan|pekerja|tenaga|sebagai)\s*[:\s]\s*((?:[\w&()]+\s*){1,3})", re.IGNORECASE)
+
+
+def _to_number(num: str, unit: str | None) -> float | None:
+    if unit:
+        # Dengan satuan, satu pemisah + 1-2 digit adalah desimal: "9,5 juta", "1.5 jt"
+        if re.fullmatch(r"\d+[.,]\d{1,2}", num):
+            num = num.replace(",", ".")
+        else:
+            num = num.replace(".", "").replace(",", "")
+    else:
+        # Format rupiah: titik ribuan, koma desimal
+        num = num.replace(".", "").replace(",", ".")
+    try:
+        value = float(num)
+    except ValueError:
+        return None
+    return value * _UNITS[unit.lower()] if unit else value
+
+
+def _as_int_if_whole(value: float) -> int | float:
+    return int(value) if float(value).is_integer() else round(value, 2)
+
+
+def _cued(text: str, start: int) -> bool:
+    """Ada kata 'beban' dsb. sebelum angka, tanpa kata 'kerugian' di antaranya."""
+    window = text[max(0, start - CUE_WINDOW):start]
+    cues = list(_BEBAN_CUE.finditer(window))
+    if not cues:
+        return False
+    return not _OTHER_CUE.search(window[cues[-1].end():])
+
+
+def _pick(candidates: list[tuple[int, Any]], text: str) -> Any:
+    """Satu-satunya nilai yang ditandai kata beban. Tanpa kata beban, atau lebih dari satu nilai
+    ("ganti rugi 2 juta dan 3 juta"), hasilnya ragu -> None, diserahkan ke LLM."""
+    cued = {value for start, value in candidates if _cued(text, start)}
+    return cued.pop() if len(cued) == 1 else None
+
+
+def _clause(text: str, pos: int) -> str:
+    start, end = 0, len(text)
+    for m in _CLAUSE_SPLIT.finditer(text):
+        if m.end() <= pos:
+            start = m.end()
+        elif m.start() >= pos:
+            end = m.start()
+            break
+    return text[start:end]
+
+
+def extract_amount(text: str) -> int | float | None:
+    if _INSTALMENT_CUE.search(text):
+        return None
+    date_spans = [m.span() for m in _DATE.finditer(text)]
+    percent_spans = [m.span() for m in _PERCENT.finditer(text)]
+    candidates = []
+    for m in _AMOUNT.finditer(text):
+        if any(s <= m.start() < e for s, e in date_spans + percent_spans):
+            continue
+        # Angka tanpa "Rp", satuan, atau pemisah ribuan (mis. "SP 1", "3 hari") bukan nominal
+        if not (m.group("rp") or m.group("unit") or "." in m.group("num") and len(m.group("num")) > 4):
+            continue
+        value = _to_number(m.group("num"), m.group("unit"))
+        if value:
+            candidates.append((m.start(), _as_int_if_whole(value)))
+    for start, _ in candidates:
+        # Beban dihitung dari persentase atau nominal adalah nilai barang: hitungannya diserahkan ke LLM
+        if _cued(text, start) and (_VALUE_OF.search(text[:start]) or _PERCENT.search(_clause(text, start))):
+            return None
+    return _pick(candidates, text)
+
+
+def extract_percentage(text: str) -> int | float | None:
+    candidates = []
+    for m in _PERCENT.finditer(text):
+        value = float(m.group("num").replace(",", "."))
+        if 0 < value <= 100:
+            candidates.append((m.start(), _as_int_if_whole(value)))
+    return _pick(candidates, text)
+
+
+def extract_approvals(text: str) -> RuleFields:
+    """Tanggal approval GM HC&CA / GM FAD dari kalimat yang menyebut persetujuan.
+    Approver disebut tanpa tanggal -> None (pasti kosong, sama seperti aturan prompt LLM)."""
+    found: RuleFields = {}
+    for clause in _CLAUSE_SPLIT.split(text):
+        if not _APPROVAL.search(clause):
+            continue
+        mentions = sorted(
+            (m.start(), m.end(), field) for field, pattern in _APPROVERS for m in pattern.finditer(clause)
+        )
+        if not mentions:
+            continue
+        # Approver berurutan yang hanya dipisah "dan"/"," berbagi tanggal yang sama
+        groups: list[list[tuple[int, int, str]]] = []
+        for mention in mentions:
+            if groups and _APPROVER_JOIN.match(clause[groups[-1][-1][1]:mention[0]]):
+                groups[-1].append(mention)
+            else:
+                groups.append([mention])
+
+        dates = [(m.start(), preprocessing_ai_date(m.group(0))) for m in _DATE.finditer(clause)]
+        for index, group in enumerate(groups):
+            group_end = group[-1][1]
+            next_start = groups[index + 1][0][0] if index + 1 < len(groups) else len(clause)
+            # Tanggal sesudah approver (sebelum approver berikutnya), kalau tidak ada: tanggal sebelumnya
+            after = [d for pos, d in dates if group_end <= pos < next_start and d]
+            before = [d for pos, d in dates if pos < group[0][0] and d]
+            date = after[0] if after else (before[-1] if before and index == 0 else None)
+            for _, _, field in group:
+                if found.get(field) is None:
+                    found[field] = date
+    return found
+
+
+def extract_jenis_karyawan(text: str, resolver: MasterResolver) -> int | None:
+    kind = "jenis-karyawan-terlapor"
+    # "karyawan outsource", "karyawan: Regular", "sebagai freelance"
+    ids = set()
+    for m in _KARYAWAN_CUE.finditer(text):
+        match = resolver.resolve(kind, m.group(1), threshold=1.0)
+        if match:
+            ids.add(match.id)
+    if len(ids) == 1:
+        return ids.pop()
+    if ids:
+        return None
+    match = resolver.find_in_text(kind, text)
+    return match.id if match else None
+
+
+def extract_person_fields(text: str, resolver: MasterResolver) -> RuleFields:
+    """Field prefill-person yang bisa dipastikan tanpa LLM."""
+    if not text:
+        return {}
+    fields: RuleFields = {}
+    amount = extract_amount(text)
+    if amount is not None:
+        fields["nominal_beban_karyawan"] = amount
+    percentage = extract_percentage(text)
+    if percentage is not None:
+        fields["persentase_beban_karyawan"] = percentage
+    fields.update(extract_approvals(text))
+    jenis_id = extract_jenis_karyawan(text, resolver)
+    if jenis_id is not None:
+        fields["jenis_karyawan_terlapor_id"] = jenis_id
+    return fields
+
+
+SOURCE_RULES = "rules"
+SOURCE_MODEL = "model"
+SOURCE_NONE = "none"
+
+AI_UNAVAILABLE_ERROR = "Layanan AI sedang tidak tersedia. Coba lagi nanti."
+
+
+def plan_person_prefill(prompt: str, rewrite: bool = True) -> tuple[RuleFields, list[str]]:
+    """(field dari aturan, field yang masih perlu LLM).
+
+    LLM hanya dipanggil kalau rewrite keputusan diminta; field yang tidak dipastikan aturan
+    ikut diminta di panggilan yang sama. Tanpa rewrite, field itu dibiarkan kosong.
+    """
+    rules = extract_person_fields(prompt, get_master_snapshot().resolver) if Config.person_rules_enabled() else {}
+    if not rewrite:
+        return rules, []
+    return rules, [f for f in PERSON_FIELDS if f not in rules]
+
+
+def person_sources(rules: RuleFields, llm_fields: list[str], data: dict) -> dict[str, str]:
+    return {
+        field: SOURCE_RULES if field in rules
+        else SOURCE_MODEL if field in llm_fields and data.get(field) not in (None, "")
+        else SOURCE_NONE
+        for field in PERSON_FIELDS
+    }
+
+
+def person_prefill(prompt: str, rewrite: bool = True) -> tuple[dict, dict[str, str]] | None:
+    """(data, sumber per field) untuk prefill-person; None kalau LLM dibutuhkan tapi gagal."""
+    rules, llm_fields = plan_person_prefill(prompt, rewrite) if prompt else ({}, [])
+    llm_result: dict = {}
+    if llm_fields:
+        llm_result = call_llm_person(prompt, fields=llm_fields)
+        if not llm_result:
+            return None
+    data = build_person_suggestion({**llm_result, **rules})
+    return data, person_sources(rules, llm_fields, data)
+
+
+def person_prefill_batch(prompts: list[Any], rewrite: bool, concurrency: int) -> list[dict[str, Any]]:
+    """person_prefill untuk banyak terlapor, paralel maks `concurrency`; hasil sesuai urutan input.
+
+    Kegagalan satu item tidak menggagalkan batch: item itu berisi "error" sendiri.
+    """
+    app = current_app._get_current_object()
+    masters = get_master_snapshot()
+
+    def run(index: int, prompt: Any) -> dict[str, Any]:
+        item: dict[str, Any] = {"index": index, "prompt": prompt}
+        if not isinstance(prompt, str):
+            return {**item, "error": "Teks keputusan harus berupa string."}
+        # Thread pool tidak mewarisi app context request; session DB per thread
+        with app.app_context():
+            g.master_snapshot = masters
+            try:
+                result = person_prefill(prompt, rewrite)
+            except Exception as exc:
+                logging.exception("Batch prefill-person item %s gagal", index)
+                return {**item, "error": "Gagal memproses teks keputusan.", "detail": str(exc)}
+        if result is None:
+            return {**item, "error": AI_UNAVAILABLE_ERROR}
+        data, sources = result
+        return {**item, "data": data, "sources": sources}
+
+    workers = min(concurrency, len(prompts))
+    if workers <= 1:
+        return [run(i, p) for i, p in enumerate(prompts)]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefill-person") as pool:
+        return list(pool.map(run, range(len(prompts)), prompts))
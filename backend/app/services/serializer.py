@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from decimal import Decimal
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import Date, DateTime, Numeric
+
+JAKARTA = ZoneInfo("Asia/Jakarta")
+
+def format_date_ddmmyyyy(d: date) -> str:
+    # Setara d.strftime("%d-%m-%Y"), tanpa overhead strftime
+    return f"{d.day:02d}-{d.month:02d}-{d.year:04d}"
+
+def format_datetime_ddmmyyyy(dt: datetime) -> str:
+    # Datetime naive dianggap sudah waktu Jakarta
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(JAKARTA)
+    return f"{dt.day:02d}-{dt.month:02d}-{dt.year:04d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+
+def decimal_to_json(v: Decimal) -> Any:
+    i = int(v)
+    if v == i:
+        return i
+    return float(v)
+
+def json_safe(v: Any) -> Any:
+    # Fallback generik untuk nilai yang tipenya tidak diketahui dari kolom
+    if isinstance(v, datetime):
+        return format_datetime_ddmmyyyy(v)
+    if isinstance(v, date):
+        return format_date_ddmmyyyy(v)
+    if isinstance(v, Decimal):
+        return decimal_to_json(v)
+    return v
+
+def _converter_for(column_type: Any) -> Optional[Callable[[Any], Any]]:
+    # DateTime dicek sebelum Date; None = nilai dipakai apa adanya
+    if isinstance(column_type, DateTime):
+        return format_datetime_ddmmyyyy
+    if isinstance(column_type, Date):
+        return format_date_ddmmyyyy
+    if isinstance(column_type, Numeric):
+        return decimal_to_json
+    return None
+
+class Serializer:
+    """Serializer yang dikompilasi sekali dari daftar kolom.
+
+    Konverter per kolom ditentukan di awal dari tipe kolomnya, sehingga saat
+    serialisasi tidak ada lagi refleksi __table__ maupun rantai isinstance.
+    """
+
+    def __init__(self, columns: Iterable[Any]):
+        columns = list(columns)
+        self.names: Tuple[str, ...] = tuple(c.key for c in columns)
+        self.converted: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+            (c.key, conv) for c in columns if (conv := _converter_for(c.type)) is not None
+        )
+        if len(self.names) > 1:
+            self._attr_getter = attrgetter(*self.names)
+            self._item_getter = itemgetter(*self.names)
+        else:
+            attr, item = attrgetter(*self.names), itemgetter(*self.names)
+            self._attr_getter = lambda obj: (attr(obj),)
+            self._item_getter = lambda d: (item(d),)
+
+    def _convert(self, d: Dict[str, Any]) -> Dict[str, Any]:
+        for name, conv in self.converted:
+            v = d[name]
+            if v is not None:
+                d[name] = conv(v)
+        return d
+
+    def instance(self, obj: Any) -> Dict[str, Any]:
+        try:
+            # Jalur cepat: semua kolom sudah ter-load di __dict__ instance
+            values = self._item_getter(obj.__dict__)
+        except KeyError:
+            # Ada kolom expired/deferred: biarkan ORM me-load lewat descriptor
+            values = self._attr_getter(obj)
+        return self._convert(dict(zip(self.names, values)))
+
+    def row(self, row: Any) -> Dict[str, Any]:
+        # Row hasil select() dengan urutan kolom yang sama seperti saat kompilasi
+        return self._convert(dict(zip(self.names, row)))
+
+    def many(self, objs: Iterable[Any]) -> List[Dict[str, Any]]:
+        return [self.instance(o) for o in objs]
+
+_MODEL_SERIALIZERS: Dict[type, Serializer] = {}
+
+def serializer_for(model: type) -> Serializer:
+    serializer = _MODEL_SERIALIZERS.get(model)
+    if serializer is None:
+        serializer = Serializer(model.__table__.columns)
+        _MODEL_SERIALIZERS[model] = serializer
+    return serializer
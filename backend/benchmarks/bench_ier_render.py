@@ -0,0 +1,71 @@
+"""Benchmark render form IER per dokumen: cara lama vs aset WeasyPrint yang dipakai ulang.
+
+Jalankan dari folder backend (butuh WeasyPrint + pango terpasang):
+    python -m benchmarks.bench_ier_render [jumlah_dokumen]
+
+Cara lama: CSS inline di <style> diparse ulang, logo dibaca dari file://, font
+dikonfigurasi ulang setiap dokumen. Cara baru: services/pdf_assets.py.
+"""
+import sys
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.services.ier_pdf import TEMPLATE_NAME, _nl2br
+from app.services.pdf_assets import ASSETS, LOGO_URI, PdfAssets, read_stylesheet
+
+TEMPLATES_DIR = "app/templates"
+
+
+def make_context(i: int, logo_uri: str):
+    return dict(
+        person={
+            "person_code": f"01/01/2026/{i}/1",
+            "keputusan_ier_html": _nl2br("Surat Peringatan 1\nBeban karyawan 50%"),
+        },
+        case={
+            "judul_ier": f"Kehilangan kontainer #{i}",
+            "kronologi_html": _nl2br("Kronologi kejadian baris pertama.\n" * 20),
+            "tanggal_proses_ier_str": "01-01-2026",
+        },
+        logo_uri=logo_uri,
+    )
+
+
+def legacy_render(env: Environment, i: int) -> bytes:
+    from weasyprint import HTML
+
+    html = env.get_template(TEMPLATE_NAME).render(**make_context(i, "file://" + ASSETS["logo"][0]))
+    # Template lama membawa CSS inline di <head>
+    html = html.replace("</head>", f"<style>{read_stylesheet()}</style></head>", 1)
+    return HTML(string=html).write_pdf()
+
+
+def reused_render(template, assets: PdfAssets, i: int) -> bytes:
+    return assets.write_pdf(template.render(**make_context(i, LOGO_URI)))
+
+
+def bench(label: str, fn, n: int) -> float:
+    fn(0)  # pemanasan: import, font cache fontconfig
+    start = time.perf_counter()
+    for i in range(n):
+        fn(i + 1)
+    per_doc = (time.perf_counter() - start) / n * 1000
+    print(f"{label:<24} {per_doc:8.1f} ms/dokumen")
+    return per_doc
+
+
+def main() -> None:
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), autoescape=True)
+    template = env.get_template(TEMPLATE_NAME)
+    assets = PdfAssets()
+
+    print(f"{n} dokumen")
+    old = bench("lama (per request)", lambda i: legacy_render(env, i), n)
+    new = bench("aset dipakai ulang", lambda i: reused_render(template, assets, i), n)
+    print(f"speedup: {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
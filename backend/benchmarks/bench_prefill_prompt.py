@@ -0,0 +1,132 @@
+"""Benchmark prompt prefill-case: prompt penuh (daftar id=nama master) vs prompt ringkas
+(LLM menulis nama, ID dicari lokal oleh services/master_resolver.py).
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_prefill_prompt            # offline: ukuran prompt + akurasi resolver
+    python -m benchmarks.bench_prefill_prompt --live     # panggil LLM_URL untuk kedua mode
+
+Master diambil dari app/seed.py dengan ID berurutan seperti database yang baru di-seed.
+Tanpa --live, jumlah token adalah perkiraan (kata + tanda baca), dan akurasi dihitung dari
+`compact_output` di fixture (contoh jawaban nama bebas dari model).
+Dengan --live, token memakai `usage.prompt_tokens` dari backend kalau tersedia.
+"""
+import json
+import os
+import re
+import sys
+import time
+
+from app.seed import SEED_DATA
+from app.services.ai_prefill import build_case_suggestion, case_request, extract_json
+from app.services.master_cache import MASTER_MODELS, MasterSnapshot
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "prefill_case.json")
+FIELDS = {
+    "divisi_case": "divisi-case",
+    "jenis_case": "jenis-case",
+    "status_proses": "status-proses",
+    "status_pengajuan": "status-pengajuan",
+}
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    return len(_TOKEN.findall(text))
+
+
+def seed_snapshot() -> MasterSnapshot:
+    rows = {
+        kind: [{"id": i + 1, "name": name} for i, name in enumerate(SEED_DATA[model])]
+        for kind, model in MASTER_MODELS.items()
+    }
+    return MasterSnapshot(0, rows)
+
+
+def expected_ids(masters: MasterSnapshot, expected: dict) -> dict:
+    return {field: masters.id_for(kind, expected[field]) if expected[field] else None for field, kind in FIELDS.items()}
+
+
+def resolve_ids(masters: MasterSnapshot, output: dict) -> dict:
+    return {field: masters.resolver.resolve_id(kind, output.get(field)) for field, kind in FIELDS.items()}
+
+
+def score(rows) -> str:
+    total = sum(len(FIELDS) for _ in rows)
+    correct = sum(got[f] == want[f] for got, want in rows for f in FIELDS)
+    return f"{correct}/{total} ({correct / total:.0%})" if total else "-"
+
+
+def bench_prompts(masters: MasterSnapshot, fixtures) -> None:
+    full = [estimate_tokens(case_request(f["text"], masters, compact=False)[0]["messages"][0]["content"]) for f in fixtures]
+    compact = [estimate_tokens(case_request(f["text"], masters, compact=True)[0]["messages"][0]["content"]) for f in fixtures]
+    avg_full, avg_compact = sum(full) / len(full), sum(compact) / len(compact)
+    print("Perkiraan token prompt per request")
+    print(f"  penuh   {avg_full:8.0f}")
+    print(f"  ringkas {avg_compact:8.0f}  (-{avg_full - avg_compact:.0f}, {1 - avg_compact / avg_full:.0%} lebih kecil)")
+
+
+def bench_resolver(masters: MasterSnapshot, fixtures) -> None:
+    rows, methods, misses = [], {}, []
+    start = time.perf_counter()
+    for f in fixtures:
+        got = resolve_ids(masters, f["compact_output"])
+        want = expected_ids(masters, f["expected"])
+        rows.append((got, want))
+        for field, kind in FIELDS.items():
+            match = masters.resolver.resolve(kind, f["compact_output"].get(field))
+            method = match.method if match else "none"
+            methods[method] = methods.get(method, 0) + 1
+            if got[field] != want[field]:
+                misses.append((field, f["compact_output"].get(field), f["expected"][field], match))
+    elapsed = (time.perf_counter() - start) / (len(fixtures) * len(FIELDS)) * 1e6
+    print(f"\nAkurasi resolver (compact_output fixture): {score(rows)}, {elapsed:.0f} us/field")
+    print("  metode: " + ", ".join(f"{m}={n}" for m, n in sorted(methods.items())))
+    for field, raw, want, match in misses:
+        print(f"  miss {field}: {raw!r} -> {match.name if match else None!r}, harusnya {want!r}")
+
+
+def bench_live(masters: MasterSnapshot, fixtures) -> None:
+    from app.services.llm_client import get_llm_client
+
+    client = get_llm_client()
+    print(f"\nLive: {client.url}")
+    for compact in (False, True):
+        rows, tokens, latency = [], [], 0.0
+        for f in fixtures:
+            payload, _ = case_request(f["text"], masters, compact=compact)
+            start = time.perf_counter()
+            data = client.post("prefill_case", payload)
+            latency += time.perf_counter() - start
+            usage = data.get("usage") or {}
+            tokens.append(usage.get("prompt_tokens") or estimate_tokens(payload["messages"][0]["content"]))
+            parsed = extract_json(data["choices"][0]["message"]["content"] or "")
+            # build_case_suggestion melakukan resolusi nama (mode ringkas) persis seperti endpoint
+            suggestion = build_case_suggestion(parsed if isinstance(parsed, dict) else {})
+            got = {field: suggestion.get(f"{field}_id") for field in FIELDS}
+            rows.append((got, expected_ids(masters, f["expected"])))
+        label = "ringkas" if compact else "penuh"
+        print(
+            f"  {label:<8} token prompt rata-rata {sum(tokens) / len(tokens):7.0f}"
+            f"  akurasi {score(rows)}  {latency / len(fixtures) * 1000:6.0f} ms/request"
+        )
+
+
+def main() -> None:
+    with open(FIXTURES, encoding="utf-8") as fh:
+        fixtures = json.load(fh)
+    masters = seed_snapshot()
+    print(f"{len(fixtures)} kasus fixture")
+    bench_prompts(masters, fixtures)
+    bench_resolver(masters, fixtures)
+    if "--live" in sys.argv[1:]:
+        from app import create_app
+        from flask import g
+
+        # build_case_suggestion memanggil get_master_snapshot(); pakai master seed, bukan DB
+        with create_app().app_context():
+            g.master_snapshot = masters
+            bench_live(masters, fixtures)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Microbenchmark: model_to_dict (refleksi) vs Serializer yang dikompilasi.
+
+Jalankan dari folder backend:
+    python -m benchmarks.bench_serializer [jumlah_case]
+
+Tidak butuh koneksi database; objek Case/CasePerson dibuat transient di memori.
+"""
+import sys
+import timeit
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict
+
+from app.models import Case, CasePerson
+from app.services.serializer import json_safe, serializer_for
+
+
+def legacy_model_to_dict(model_instance: Any, relationships: Dict[str, Any] = {}) -> Dict[str, Any]:
+    # Salinan implementasi lama di routes/cases.py sebagai baseline
+    d = {}
+    for column in model_instance.__table__.columns:
+        value = getattr(model_instance, column.name)
+        d[column.name] = json_safe(value)
+    for rel_name, rel_data in relationships.items():
+        rel_value = getattr(model_instance, rel_name)
+        if rel_value:
+            if isinstance(rel_value, list):
+                d[rel_name] = [legacy_model_to_dict(item, rel_data.get("relationships", {})) for item in rel_value]
+            else:
+                d[rel_name] = legacy_model_to_dict(rel_value, rel_data.get("relationships", {}))
+    return d
+
+
+def _as_loaded(obj):
+    # Instance hasil query punya semua kolom di __dict__; tiru kondisi itu
+    for column in obj.__table__.columns:
+        if column.name not in obj.__dict__:
+            setattr(obj, column.name, None)
+    return obj
+
+
+def make_cases(n: int):
+    cases = []
+    for i in range(n):
+        case = Case(
+            id=i + 1,
+            case_code=f"01/01/2026/{i + 1}",
+            created_at=datetime(2026, 1, 1, 8, 30, 0),
+            divisi_case_id=1 + i % 10,
+            tanggal_lapor=date(2026, 1, 1 + i % 28),
+            tanggal_kejadian=date(2025, 12, 1 + i % 28),
+            lokasi_kejadian="Depo Surabaya",
+            jenis_case_id=1 + i % 38,
+            judul_ier="Kerusakan inventaris saat bongkar muat",
+            kerugian=Decimal("1250000.00"),
+            kronologi="Kronologi kejadian " * 10,
+            status_proses_id=1,
+            status_pengajuan_id=1,
+        )
+        case.persons = [
+            _as_loaded(CasePerson(
+                id=i * 2 + j + 1,
+                case_id=i + 1,
+                person_seq=j + 1,
+                person_code=f"{case.case_code}/{j + 1}",
+                nama=f"Terlapor {j + 1}",
+                persentase_beban_karyawan=Decimal("12.500"),
+                nominal_beban_karyawan=Decimal("156250.00"),
+                approval_gm_hcca=date(2026, 1, 10),
+                created_at=datetime(2026, 1, 1, 8, 30, 0),
+            ))
+            for j in range(2)
+        ]
+        cases.append(_as_loaded(case))
+    return cases
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    cases = make_cases(n)
+    case_serializer = serializer_for(Case)
+    person_serializer = serializer_for(CasePerson)
+
+    def legacy():
+        out = []
+        for c in cases:
+            d = legacy_model_to_dict(c)
+            d["persons"] = [legacy_model_to_dict(p) for p in c.persons]
+            out.append(d)
+        return out
+
+    def compiled():
+        out = []
+        for c in cases:
+            d = case_serializer.instance(c)
+            d["persons"] = person_serializer.many(c.persons)
+            out.append(d)
+        return out
+
+    assert legacy() == compiled(), "output serializer berbeda dari model_to_dict"
+
+    repeat = 5
+    t_legacy = min(timeit.repeat(legacy, number=1, repeat=repeat))
+    t_compiled = min(timeit.repeat(compiled, number=1, repeat=repeat))
+    print(f"{n} case x 2 person (best of {repeat})")
+    print(f"  model_to_dict : {t_legacy * 1000:8.1f} ms")
+    print(f"  Serializer    : {t_compiled * 1000:8.1f} ms")
+    print(f"  speedup       : {t_legacy / t_compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from sqlalchemy import text
 from app import create_app
 from app.extensions import db
 from app.seed import seed_all
+from app.services.case_code import backfill_case_code_counters
+from app.services.case_stats import reconcile_case_stats
 
 app = create_app()
 RESET = "--reset" in sys.argv
@@ -31,6 +33,9 @@ with app.app_context():
 
     db.create_all()
     report = seed_all()
+    if db.engine.dialect.name == "postgresql":
+        backfill_case_code_counters(db.session)
+    reconcile_case_stats(db.session)
 
     print("✅ DB initialized & seeded:")
     for k, v in report.items():
@@ -0,0 +1,41 @@
+"""add ocr job public id and owner
+
+Revision ID: 7c4f1b8e2d90
+Revises: 5d7e2a9c4b16
+Create Date: 2026-02-24 09:41:12.604381
+
+"""
+import uuid
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c4f1b8e2d90'
+down_revision = '5d7e2a9c4b16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('t_ocr_job', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('public_id', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('owner', sa.String(length=64), nullable=True))
+
+    # Job lama (tanpa owner) tetap diberi public_id, tapi tidak bisa dibaca siapa pun lagi
+    conn = op.get_bind()
+    ocr_job = sa.table('t_ocr_job', sa.column('id', sa.Integer), sa.column('public_id', sa.String))
+    for (job_id,) in conn.execute(sa.select(ocr_job.c.id)).all():
+        conn.execute(ocr_job.update().where(ocr_job.c.id == job_id).values(public_id=uuid.uuid4().hex))
+
+    with op.batch_alter_table('t_ocr_job', schema=None) as batch_op:
+        batch_op.alter_column('public_id', existing_type=sa.String(length=32), nullable=False)
+        batch_op.create_unique_constraint('uq_t_ocr_job_public_id', ['public_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('t_ocr_job', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_t_ocr_job_public_id', type_='unique')
+        batch_op.drop_column('owner')
+        batch_op.drop_column('public_id')
@@ -0,0 +1,28 @@
+"""drop case stats total row
+
+Revision ID: 9e2b6d4a1f38
+Revises: 7c4f1b8e2d90
+Create Date: 2026-02-24 15:22:08.117540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e2b6d4a1f38'
+down_revision = '7c4f1b8e2d90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Total sekarang dijumlah dari baris dimensi status_pengajuan
+    op.execute(sa.text("DELETE FROM t_case_stats WHERE dimension = 'total'"))
+
+
+def downgrade():
+    op.execute(sa.text('''
+        INSERT INTO t_case_stats (dimension, key_id, count)
+        SELECT 'total', 0, count(*) FROM t_case
+    '''))
@@ -0,0 +1,114 @@
+"""Jumlah statement SQL list_cases dan import bulk tetap, berapa pun jumlah case/terlapor;
+import yang gagal di tengah tidak meninggalkan case."""
+import io
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Case, CasePerson, DivisiCase, JenisCase, StatusPengajuan, StatusProses
+from app.services.master_cache import get_master_snapshot
+
+
+def _first_id(session, model):
+    return session.scalar(select(model.id).order_by(model.id).limit(1))
+
+
+def _add_cases(session, count, start=1, persons_per_case=2):
+    masters = {
+        "divisi_case_id": _first_id(session, DivisiCase),
+        "jenis_case_id": _first_id(session, JenisCase),
+        "status_proses_id": _first_id(session, StatusProses),
+        "status_pengajuan_id": _first_id(session, StatusPengajuan),
+    }
+    for seq in range(start, start + count):
+        case = Case(case_code=f"01/01/2026/{seq}", lokasi_kejadian=f"Depo {seq}", **masters)
+        session.add(case)
+        session.flush()
+        for person_seq in range(1, persons_per_case + 1):
+            session.add(CasePerson(
+                case_id=case.id,
+                person_seq=person_seq,
+                person_code=f"{case.case_code}/{person_seq}",
+                nama=f"Terlapor {seq}-{person_seq}",
+            ))
+    session.commit()
+
+
+def _list_cases(client, auth_headers, count_statements, query="limit=200"):
+    with count_statements() as statements:
+        response = client.get(f"/api/cases?{query}", headers=auth_headers)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(statements)
+
+
+def test_list_cases_statement_count_is_constant(db_session, client, auth_headers, count_statements):
+    _add_cases(db_session, 3)
+    few, few_statements = _list_cases(client, auth_headers, count_statements)
+
+    _add_cases(db_session, 60, start=4)
+    many, many_statements = _list_cases(client, auth_headers, count_statements)
+
+    assert (few["Count"], many["Count"]) == (3, 63)
+    assert all(len(case["persons"]) == 2 and case["divisi_case_name"] for case in many["value"])
+    # Query case (+ nama master), query persons IN, versi master
+    assert few_statements == many_statements == 3
+
+
+def test_list_cases_total_adds_one_statement(db_session, client, auth_headers, count_statements):
+    _add_cases(db_session, 5)
+    body, statements = _list_cases(client, auth_headers, count_statements, "limit=2&with_total=1")
+    assert body["total"] == 5
+    assert statements == 4
+
+
+def _import_csv(rows):
+    masters = get_master_snapshot().rows
+    divisi = masters["divisi-case"][0]["name"]
+    jenis = masters["jenis-case"][0]["name"]
+    lines = ["ID Case;Divisi Case;Jenis Case;Nama Terlapor"]
+    for i in range(rows):
+        # Dua terlapor per case: baris a/b dengan ID Case yang sama
+        lines.append(f"{1000 + i // 2}{'ab'[i % 2]};{divisi};{jenis};Terlapor {i}")
+    return io.BytesIO(("\n".join(lines) + "\n").encode("utf-8"))
+
+
+def _import(client, auth_headers, count_statements, rows):
+    data = {"file": (_import_csv(rows), "cases.csv")}
+    with count_statements() as statements:
+        response = client.post("/api/cases/import", data=data, headers=auth_headers, content_type="multipart/form-data")
+    assert response.status_code == 200, response.get_json()
+    return response.get_json(), len(statements)
+
+
+def test_import_statement_count_is_constant(require_postgres, db_session, client, auth_headers, count_statements):
+    # Snapshot master dimuat sekali per proses; jangan ikut terhitung di import pertama
+    get_master_snapshot()
+
+    small, small_statements = _import(client, auth_headers, count_statements, 4)
+    large, large_statements = _import(client, auth_headers, count_statements, 200)
+
+    assert (small["imported_cases"], small["imported_persons"]) == (2, 4)
+    assert (large["imported_cases"], large["imported_persons"]) == (100, 200)
+    assert small["error_count"] == large["error_count"] == 0
+    assert small_statements == large_statements
+
+
+def test_import_failure_in_later_batch_writes_nothing(db_session, monkeypatch):
+    from app.services import case_import
+
+    flushes = []
+    original_flush = case_import.CaseImporter.flush
+
+    def failing_flush(self):
+        flushes.append(len(self._pending))
+        if len(flushes) == 2:
+            raise RuntimeError("DB error di batch kedua")
+        original_flush(self)
+
+    monkeypatch.setattr(case_import.CaseImporter, "flush", failing_flush)
+    get_master_snapshot()
+    with pytest.raises(RuntimeError):
+        case_import.import_cases(_import_csv(8), "cases.csv", batch_size=2)
+
+    assert len(flushes) == 2
+    assert db_session.scalar(select(func.count(Case.id))) == 0
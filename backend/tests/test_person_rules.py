@@ -0,0 +1,59 @@
+"""Ekstraksi rule prefill-person: nilai yang ragu harus None (diserahkan ke LLM), bukan tebakan."""
+import pytest
+
+from app.services.person_rules import extract_amount, extract_approvals, extract_percentage
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("dibebankan ganti rugi 9 juta", 9_000_000),
+    ("Kerugian Rp 10.000.000, dibebankan ke karyawan Rp 2.500.000", 2_500_000),
+    ("ganti rugi 2 juta dari total kerugian 10 juta", 2_000_000),
+    ("Karyawan membayar Rp1,5 jt", 1_500_000),
+])
+def test_amount_cued(text, expected):
+    assert extract_amount(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    # Angsuran: nominal per bulan bukan total beban
+    "Potong gaji 1,5 jt per bulan selama 6 bulan",
+    "potong gaji Rp 500.000/bulan",
+    "beban 2 juta dicicil 4 kali",
+    "ganti rugi diangsur Rp 300.000 setiap bulan",
+    # Lebih dari satu nominal bertanda beban
+    "ganti rugi 2 juta dan 3 juta",
+    # Beban dihitung dari persentase
+    "Diberikan SP 1 dan dibebankan 50% dari Rp 4.000.000",
+    # Nilai barang, bukan beban karyawan
+    "merusak barang senilai Rp 5.000.000, diberikan SP 1",
+    "menghilangkan HP seharga 3 juta",
+    "dibebankan mengganti HP seharga 3 juta",
+    # Tanpa kata beban
+    "Total kerugian 10 juta",
+    "Rp 750.000",
+    "SP 1 selama 3 hari",
+])
+def test_amount_ambiguous(text):
+    assert extract_amount(text) is None
+
+
+def test_amount_same_value_repeated():
+    assert extract_amount("dibebankan 2 juta (ganti rugi 2 juta)") == 2_000_000
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("dibebankan 40% dari kerugian", 40),
+    ("beban karyawan 12,5 persen", 12.5),
+    ("beban 50% dan 30%", None),
+    ("kerugian 150%", None),
+    ("SP 1, 50%", None),
+])
+def test_percentage(text, expected):
+    assert extract_percentage(text) == expected
+
+
+def test_approvals():
+    assert extract_approvals("Disetujui GM HC&CA pada 19 desember 2025 dan GM FAD 22/12/2025") == {
+        "approval_gm_hcca": "19-12-2025",
+        "approval_gm_fad": "22-12-2025",
+    }
@@ -102,13 +102,45 @@ export interface CaseRow {
   persons: CasePersonRow[];
 }
 
+export interface CaseListPage {
+  value: CaseRow[];
+  Count: number;
+  next_cursor: string | null;
+  total?: number;
+}
+
 // --- FUNGSI API ---
 
+export type CaseListFilters = {
+  lokasi?: string;
+  divisiCaseId?: string;
+  statusPengajuanId?: string;
+  tanggalKejadianFrom?: string | null;
+  tanggalKejadianTo?: string | null;
+  sort?: string;
+};
+
+type CaseListParams = CaseListFilters & { limit?: number; after?: string | null; withTotal?: boolean };
+
+async function fetchCasePage(params: CaseListParams = {}): Promise<CaseListPage> {
+  const qs = new URLSearchParams();
+  if (params.limit) qs.set("limit", String(params.limit));
+  if (params.after) qs.set("after", params.after);
+  if (params.withTotal) qs.set("with_total", "1");
+  if (params.lokasi) qs.set("lokasi", params.lokasi);
+  if (params.divisiCaseId) qs.set("divisi_case_id", params.divisiCaseId);
+  if (params.statusPengajuanId) qs.set("status_pengajuan_id", params.statusPengajuanId);
+  if (params.tanggalKejadianFrom) qs.set("tanggal_kejadian_from", params.tanggalKejadianFrom);
+  if (params.tanggalKejadianTo) qs.set("tanggal_kejadian_to", params.tanggalKejadianTo);
+  if (params.sort) qs.set("sort", params.sort);
+  const query = qs.toString();
+  return client.get<CaseListPage>(`/cases${query ? `?${query}` : ""}`);
+}
+
 export const casesApi = {
-  list: async () => {
-    const res = await client.get<{ value: CaseRow[] }>("/cases");
-    return res.value;
-  },
+  // Satu halaman (keyset): halaman berikutnya diminta dengan after = next_cursor
+  listPage: fetchCasePage,
+
   create: async (payload: CaseCreatePayload) => {
     const res = await client.post<CaseRow>("/cases", payload);
     return res;
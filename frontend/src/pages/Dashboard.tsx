@@ -1,6 +1,6 @@
-import { useEffect, useState, useMemo } from "react";
+import { useEffect, useRef, useState, useMemo } from "react";
 import { casesApi, CaseRow, CasePersonRow } from "../api/cases";
-import { displayDateOrDash } from "../utils/date";
+import { displayDateOrDash, formatDDMMYYYY } from "../utils/date";
 import { masterApi, MasterItem } from "../api/master";
 import { client } from "../api/client";
 import { pushToast } from "../components/ToastHost";
@@ -54,6 +54,13 @@ function parseDateString(dateString: string | null | undefined): Date | null {
   return null;
 }
 
+function toFilterDate(d: Date | null): string | null {
+  return d ? formatDDMMYYYY(d.getDate(), d.getMonth() + 1, d.getFullYear()) : null;
+}
+
+const CASE_PAGE_SIZE = 50;
+const LOKASI_DEBOUNCE_MS = 300;
+
 type CaseStats = {
   total: number;
   details: Record<string, number>;
@@ -627,6 +634,13 @@ export default function Dashboard() {
     divisiCase: [],
   });
   const [stats, setStats] = useState<CaseStats | null>(null);
+  // Keyset pagination: after untuk setiap halaman yang sudah dibuka, elemen terakhir = halaman aktif
+  const [pageCursors, setPageCursors] = useState<(string | null)[]>([null]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [filteredTotal, setFilteredTotal] = useState<number | null>(null);
+  // filters.lokasi yang sudah di-debounce; hanya nilai ini yang dikirim ke API
+  const [lokasiQuery, setLokasiQuery] = useState("");
+  const casesRequestId = useRef(0);
   const [filters, setFilters] = useState<{ lokasi: string; divisiCaseId: string; statusPengajuanId: string; startDate: Date | null; endDate: Date | null }>({
     lokasi: "",
     divisiCaseId: "",
@@ -635,45 +649,44 @@ export default function Dashboard() {
     endDate: null,
   });
 
-  const filteredRows = useMemo(() => {
-    return rows.filter((r) => {
-      const lokasiMatch = filters.lokasi ? (r.lokasi_kejadian || "").toLowerCase().includes(filters.lokasi.toLowerCase()) : true;
-      const divisiMatch = filters.divisiCaseId ? String(r.divisi_case_id ?? "") === filters.divisiCaseId : true;
-      const statusPengajuanMatch = filters.statusPengajuanId ? String(r.status_pengajuan_id ?? "") === filters.statusPengajuanId : true;
-      const kejadianDate = parseDateString(r.tanggal_kejadian);
-      const startOk = filters.startDate ? !!kejadianDate && kejadianDate >= filters.startDate : true;
-      const endOk = filters.endDate ? !!kejadianDate && kejadianDate <= filters.endDate : true;
-      return lokasiMatch && divisiMatch && statusPengajuanMatch && startOk && endOk;
-    });
-  }, [rows, filters]);
-
-  const rowsToRender = filteredRows;
+  // Filter dijalankan di server (WHERE), rows sudah berisi hasil yang cocok
+  const rowsToRender = rows;
   const hasFilter = useMemo(() => Boolean(filters.lokasi || filters.divisiCaseId || filters.statusPengajuanId || filters.startDate || filters.endDate), [filters]);
 
+  // Hanya satu halaman yang dimuat: tanpa filter, ringkasan status diambil dari /cases/stats (semua case)
+  const statusFromStats = !hasFilter && stats !== null;
+
   const statusBuckets = useMemo(() => {
     const buckets = { open: 0, ongoing: 0, closed: 0, total: rowsToRender.length };
     const closedWords = ["selesai", "closed", "finish", "done", "complete"];
     const ongoingWords = ["ongoing", "proses", "progress", "jalan"];
     const openWords = ["open", "baru", "new"];
 
-    rowsToRender.forEach((r) => {
-      const proses = (r.status_proses_name || r.status_proses?.name || "").toLowerCase();
-      const pengajuan = (r.status_pengajuan_name || r.status_pengajuan?.name || "").toLowerCase();
-      const statusText = `${proses} ${pengajuan}`.trim();
+    const add = (statusText: string, count: number) => {
       if (!statusText) return;
       if (closedWords.some((w) => statusText.includes(w))) {
-        buckets.closed += 1;
+        buckets.closed += count;
       } else if (ongoingWords.some((w) => statusText.includes(w))) {
-        buckets.ongoing += 1;
+        buckets.ongoing += count;
       } else if (openWords.some((w) => statusText.includes(w))) {
-        buckets.open += 1;
+        buckets.open += count;
       }
+    };
+
+    if (statusFromStats) {
+      Object.entries(stats?.details ?? {}).forEach(([name, count]) => add(name.toLowerCase(), count));
+      return buckets;
+    }
+    rowsToRender.forEach((r) => {
+      const proses = (r.status_proses_name || r.status_proses?.name || "").toLowerCase();
+      const pengajuan = (r.status_pengajuan_name || r.status_pengajuan?.name || "").toLowerCase();
+      add(`${proses} ${pengajuan}`.trim(), 1);
     });
     return buckets;
-  }, [rowsToRender]);
+  }, [rowsToRender, statusFromStats, stats]);
 
   const statusBreakdown = useMemo(() => {
-    if (rowsToRender.length) {
+    if (!statusFromStats && rowsToRender.length) {
       const counts: Record<string, number> = {};
       rowsToRender.forEach((r) => {
         const key = r.status_pengajuan_name || r.status_pengajuan?.name || r.status_proses_name || r.status_proses?.name || "Open";
@@ -682,7 +695,7 @@ export default function Dashboard() {
       return counts;
     }
     return stats?.details ?? {};
-  }, [rowsToRender, stats]);
+  }, [rowsToRender, statusFromStats, stats]);
 
   const displayStatusBreakdown = useMemo(() => {
     const openWords = ["open", "baru", "new"];
@@ -697,35 +710,81 @@ export default function Dashboard() {
     });
   }, [statusBreakdown]);
 
-  const totalCases = useMemo(() => (hasFilter ? rowsToRender.length : stats?.total ?? rows.length), [hasFilter, rowsToRender.length, stats, rows.length]);
+  const totalCases = filteredTotal ?? (hasFilter ? rowsToRender.length : stats?.total ?? rows.length);
+  const pageNumber = pageCursors.length;
+  // Dengan filter, kartu status hanya menghitung halaman yang sedang tampil
+  const statusScope = !statusFromStats && (pageNumber > 1 || nextCursor) ? " (halaman ini)" : "";
+
+  function changeFilters(next: typeof filters) {
+    // Filter baru: mulai lagi dari halaman pertama. Lokasi yang sedang diketik ikut dikirim
+    // sekarang (tanpa menunggu debounce); ketikan lokasi sendiri lewat debounce di bawah
+    setFilters(next);
+    setLokasiQuery(next.lokasi.trim());
+    setPageCursors([null]);
+  }
 
-  async function load() {
+  async function loadCases() {
+    // Respons yang datang setelah request yang lebih baru (filter/halaman sudah berubah) dibuang
+    const requestId = ++casesRequestId.current;
     try {
       setErr(null);
       setLoading(true);
-      const [data, statusProses, statusPengajuan, divisiCase, statsData] = await Promise.all([
-        casesApi.list(),
-        masterApi.list("status-proses"),
-        masterApi.list("status-pengajuan"),
-        masterApi.list("divisi-case"),
-        fetch("/api/cases/stats")
-          .then((res) => (res.ok ? res.json() : null))
-          .catch(() => null),
-      ]);
-      setRows(data);
-      setMasters({ statusProses, statusPengajuan, divisiCase });
-      if (statsData) setStats(statsData);
+      const after = pageCursors[pageCursors.length - 1] ?? null;
+      const page = await casesApi.listPage({
+        lokasi: lokasiQuery,
+        divisiCaseId: filters.divisiCaseId,
+        statusPengajuanId: filters.statusPengajuanId,
+        tanggalKejadianFrom: toFilterDate(filters.startDate),
+        tanggalKejadianTo: toFilterDate(filters.endDate),
+        limit: CASE_PAGE_SIZE,
+        after,
+        // Total hasil filter cukup dihitung sekali, di halaman pertama
+        withTotal: after === null,
+      });
+      if (requestId !== casesRequestId.current) return;
+      setRows(page.value);
+      setNextCursor(page.next_cursor);
+      if (after === null) setFilteredTotal(page.total ?? null);
     } catch (e: any) {
-      setErr(e?.message || "Network Error");
+      if (requestId === casesRequestId.current) setErr(e?.message || "Network Error");
     } finally {
-      setLoading(false);
+      if (requestId === casesRequestId.current) setLoading(false);
     }
   }
 
+  async function loadStats() {
+    const statsData = await client.get<CaseStats>("/cases/stats").catch(() => null);
+    if (statsData) setStats(statsData);
+  }
+
+  // Master dan ringkasan tidak bergantung pada filter: cukup sekali saat halaman dibuka
   useEffect(() => {
-    load();
+    Promise.all([masterApi.list("status-proses"), masterApi.list("status-pengajuan"), masterApi.list("divisi-case")])
+      .then(([statusProses, statusPengajuan, divisiCase]) => setMasters({ statusProses, statusPengajuan, divisiCase }))
+      .catch((e: any) => setErr(e?.message || "Network Error"));
+    loadStats();
   }, []);
 
+  // Ketikan lokasi baru dikirim setelah berhenti mengetik LOKASI_DEBOUNCE_MS
+  useEffect(() => {
+    const lokasi = filters.lokasi.trim();
+    if (lokasi === lokasiQuery) return;
+    const timer = setTimeout(() => {
+      setLokasiQuery(lokasi);
+      setPageCursors([null]);
+    }, LOKASI_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [filters.lokasi, lokasiQuery]);
+
+  useEffect(() => {
+    loadCases();
+  }, [lokasiQuery, filters.divisiCaseId, filters.statusPengajuanId, filters.startDate, filters.endDate, pageCursors]);
+
+  function reloadAfterWrite() {
+    loadCases();
+    loadStats();
+  }
+
   async function handleViewDetail(caseId: number) {
     try {
       const caseData = await casesApi.getCase(caseId);
@@ -737,7 +796,7 @@ export default function Dashboard() {
 
   function handleSaveCase(updatedCase: CaseRow) {
     setRows(rows.map((r) => (r.id === updatedCase.id ? updatedCase : r)));
-    load();
+    reloadAfterWrite();
   }
 
   function handleSavePerson(updatedPerson: CasePersonRow) {
@@ -752,12 +811,12 @@ export default function Dashboard() {
         return r;
       })
     );
-    load();
+    reloadAfterWrite();
   }
 
   function handleDeleteCase(deletedCaseId: number) {
     setRows(rows.filter((r) => r.id !== deletedCaseId));
-    load();
+    reloadAfterWrite();
   }
 
   async function handleDownloadPdf(personId: number, personCode: string) {
@@ -823,7 +882,7 @@ export default function Dashboard() {
           </div>
           <div>
             <div className="field__label">Divisi Case</div>
-            <select className="input" value={filters.divisiCaseId} onChange={(e) => setFilters({ ...filters, divisiCaseId: e.target.value })}>
+            <select className="input" value={filters.divisiCaseId} onChange={(e) => changeFilters({ ...filters, divisiCaseId: e.target.value })}>
               <option value="">-- pilih --</option>
               {masters.divisiCase.map((d) => (
                 <option key={d.id} value={d.id}>
@@ -834,7 +893,7 @@ export default function Dashboard() {
           </div>
           <div>
             <div className="field__label">Status Pengajuan</div>
-            <select className="input" value={filters.statusPengajuanId} onChange={(e) => setFilters({ ...filters, statusPengajuanId: e.target.value })}>
+            <select className="input" value={filters.statusPengajuanId} onChange={(e) => changeFilters({ ...filters, statusPengajuanId: e.target.value })}>
               <option value="">-- pilih --</option>
               {masters.statusPengajuan.map((s) => (
                 <option key={s.id} value={s.id}>
@@ -845,14 +904,14 @@ export default function Dashboard() {
           </div>
           <div>
             <div className="field__label">Tanggal Kejadian Dari</div>
-            <DatePicker className="input" selected={filters.startDate} onChange={(date) => setFilters({ ...filters, startDate: date })} dateFormat="dd-MM-yyyy" placeholderText="dd-mm-yyyy" isClearable />
+            <DatePicker className="input" selected={filters.startDate} onChange={(date) => changeFilters({ ...filters, startDate: date })} dateFormat="dd-MM-yyyy" placeholderText="dd-mm-yyyy" isClearable />
           </div>
           <div>
             <div className="field__label">Tanggal Kejadian Sampai</div>
-            <DatePicker className="input" selected={filters.endDate} onChange={(date) => setFilters({ ...filters, endDate: date })} dateFormat="dd-MM-yyyy" placeholderText="dd-mm-yyyy" isClearable />
+            <DatePicker className="input" selected={filters.endDate} onChange={(date) => changeFilters({ ...filters, endDate: date })} dateFormat="dd-MM-yyyy" placeholderText="dd-mm-yyyy" isClearable />
           </div>
           <div style={{ display: "flex", gap: 8 }}>
-            <button className="btn btn--outline" style={{ width: "100%" }} onClick={() => setFilters({ lokasi: "", divisiCaseId: "", statusPengajuanId: "", startDate: null, endDate: null })}>
+            <button className="btn btn--outline" style={{ width: "100%" }} onClick={() => changeFilters({ lokasi: "", divisiCaseId: "", statusPengajuanId: "", startDate: null, endDate: null })}>
               Reset Filter
             </button>
           </div>
@@ -862,15 +921,15 @@ export default function Dashboard() {
       {(stats || rows.length > 0) && (
         <div style={{ display: "grid", gridTemplateColumns: "repeat(auto-fit, minmax(180px, 1fr))", gap: "12px", marginTop: "12px" }}>
           <div className="panel" style={{ padding: "16px", borderLeft: "4px solid #3b82f6" }}>
-            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Open</div>
+            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Open{statusScope}</div>
             <div style={{ fontSize: "24px", fontWeight: 800, marginTop: "4px" }}>{statusBuckets.open}</div>
           </div>
           <div className="panel" style={{ padding: "16px", borderLeft: "4px solid #eab308" }}>
-            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Ongoing</div>
+            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Ongoing{statusScope}</div>
             <div style={{ fontSize: "24px", fontWeight: 800, marginTop: "4px" }}>{statusBuckets.ongoing}</div>
           </div>
           <div className="panel" style={{ padding: "16px", borderLeft: "4px solid #22c55e" }}>
-            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Closed</div>
+            <div style={{ color: "#64748b", fontSize: "13px", fontWeight: 700 }}>Closed{statusScope}</div>
             <div style={{ fontSize: "24px", fontWeight: 800, marginTop: "4px" }}>{statusBuckets.closed}</div>
           </div>
           <div className="panel" style={{ padding: "16px", borderLeft: "4px solid #64748b" }}>
@@ -984,6 +1043,20 @@ export default function Dashboard() {
             </tbody>
           </table>
         </div>
+        <div style={{ display: "flex", justifyContent: "space-between", alignItems: "center", gap: 8, padding: "8px 12px" }}>
+          <span style={{ color: "#64748b", fontSize: 13 }}>
+            Halaman {pageNumber}
+            {filteredTotal !== null && ` dari ${Math.max(1, Math.ceil(filteredTotal / CASE_PAGE_SIZE))}`}
+          </span>
+          <div style={{ display: "flex", gap: 8 }}>
+            <button className="btn btn--sm btn--outline" disabled={loading || pageNumber === 1} onClick={() => setPageCursors(pageCursors.slice(0, -1))}>
+              Sebelumnya
+            </button>
+            <button className="btn btn--sm btn--outline" disabled={loading || !nextCursor} onClick={() => setPageCursors([...pageCursors, nextCursor])}>
+              Berikutnya
+            </button>
+          </div>
+        </div>
       </div>
 
       {editingCase && <EditCaseModal caseRow={editingCase} masters={masters} onClose={() => setEditingCase(null)} onSave={handleSaveCase} onDelete={handleDeleteCase} />}
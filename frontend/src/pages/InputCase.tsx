@@ -73,6 +73,31 @@ function toNumOrNull(v: string): number | null {
   return Number.isFinite(n) ? n : null;
 }
 
+type OcrJobStatus = {
+  job_id: string;
+  status: "queued" | "running" | "done" | "failed";
+  attempts?: number;
+  text?: string;
+  data?: AiCaseSuggestion;
+  error?: string;
+};
+
+const OCR_POLL_INTERVAL_MS = 1500;
+const OCR_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+async function waitForOcrJob(jobId: string): Promise<OcrJobStatus> {
+  const deadline = Date.now() + OCR_POLL_TIMEOUT_MS;
+  while (Date.now() < deadline) {
+    const job = await client.get<OcrJobStatus>(`/ai/ocr-jobs/${jobId}`);
+    if (job.status === "done") return job;
+    if (job.status === "failed") {
+      throw new Error(job.error || "Gagal memproses Berita Acara");
+    }
+    await new Promise((resolve) => setTimeout(resolve, OCR_POLL_INTERVAL_MS));
+  }
+  throw new Error("Proses OCR terlalu lama. Coba lagi nanti.");
+}
+
 export default function InputCase() {
   const [isConfirming, setIsConfirming] = useState(false);
   const [loading, setLoading] = useState(false);
@@ -261,9 +286,11 @@ export default function InputCase() {
       const formData = new FormData();
       files.forEach((f) => formData.append("file", f));
 
-      const json = await client.post<any>("/ai/upload-berita-acara", formData);
-      const data: AiCaseSuggestion = (json?.data ?? json) || {};
-      const text = (json?.text as string) || "";
+      // Backend mengantrekan OCR (202 + job_id); hasil diambil dengan polling status job
+      const job = await client.post<OcrJobStatus>("/ai/upload-berita-acara", formData);
+      const json = await waitForOcrJob(job.job_id);
+      const data: AiCaseSuggestion = json.data || {};
+      const text = json.text || "";
       openOcrModal(text, data);
     } catch (e: any) {
       setErr(e?.message || "Gagal memproses Berita Acara");